@@ -2,10 +2,12 @@
 
 import argparse
 import asyncio
+from collections.abc import Awaitable
 from contextlib import suppress
 import logging
 from pathlib import Path
 import sys
+import time
 
 from bumper.db import bot_repo, client_repo, token_repo
 from bumper.mqtt import helper_bot, server as server_mqtt
@@ -68,29 +70,45 @@ async def start_configuration() -> None:
     bumper_isc.xmpp_server = server_xmpp.XMPPServer(bumper_isc.bumper_listen, bumper_isc.XMPP_LISTEN_PORT_TLS)
 
 
-async def start_service() -> None:
-    """Start Bumper services."""
-    # Start XMPP Server
+async def start_service() -> dict[str, float]:
+    """Start Bumper services, the independent ones concurrently, and get the startup time of each in seconds."""
+    timings: dict[str, float] = {}
+    services: list[Awaitable[None]] = []
     if bumper_isc.xmpp_server is not None:
-        asyncio.Task(bumper_isc.xmpp_server.start_async_server())
-
-    # Start MQTT Server
+        services.append(_timed("XMPP Server", bumper_isc.xmpp_server.start_async_server(), timings))
     if bumper_isc.mqtt_server is not None:
-        await bumper_isc.mqtt_server.start()
-        while bumper_isc.mqtt_server.state != "started":
-            _LOGGER.info("Waiting for MQTT server to start...")
-            await asyncio.sleep(0.1)
-
-        # Start MQTT Helperbot
-        if bumper_isc.mqtt_helperbot is not None:
-            await bumper_isc.mqtt_helperbot.start()
-            while not await bumper_isc.mqtt_helperbot.is_connected:
-                _LOGGER.info("Waiting for HelperBot to connect...")
-                await asyncio.sleep(0.1)
-
-    # Start web servers
+        # The helper bot connects to the MQTT server
+        services.append(_start_mqtt_services(timings))
     if bumper_isc.web_server is not None:
-        asyncio.Task(bumper_isc.web_server.start())
+        services.append(_timed("Web Server", bumper_isc.web_server.start(), timings))
+
+    await asyncio.gather(*services)
+    _LOGGER.info(f"Services started :: {', '.join(f'{name}: {duration * 1000:.0f} ms' for name, duration in timings.items())}")
+    return timings
+
+
+async def _start_mqtt_services(timings: dict[str, float]) -> None:
+    if bumper_isc.mqtt_server is not None:
+        await _timed("MQTT Server", bumper_isc.mqtt_server.start(), timings)
+    if bumper_isc.mqtt_helperbot is not None:
+        await _timed("HelperBot", _start_helper_bot(), timings)
+
+
+async def _start_helper_bot() -> None:
+    if bumper_isc.mqtt_helperbot is not None:
+        await bumper_isc.mqtt_helperbot.start()
+        try:
+            async with asyncio.timeout(bumper_isc.SERVICE_START_TIMEOUT):
+                await bumper_isc.mqtt_helperbot.readiness.wait_ready()
+        except TimeoutError:
+            _LOGGER.warning(f"HelperBot not connected after {bumper_isc.SERVICE_START_TIMEOUT}s, still retrying")
+
+
+async def _timed(name: str, start: Awaitable[None], timings: dict[str, float]) -> None:
+    begin = time.perf_counter()
+    await start
+    timings[name] = time.perf_counter() - begin
+    _LOGGER.debug(f"{name} started in {timings[name] * 1000:.0f} ms")
 
 
 async def maintenance() -> None:
@@ -108,30 +126,36 @@ async def shutdown() -> None:
     _LOGGER.info("Shutting down...")
     bumper_isc.shutting_down = True
 
+    await asyncio.gather(_shutdown_mqtt_services(), _shutdown_web_server(), _shutdown_xmpp_server())
+
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    # Unlike gather, wait does not cancel the tasks again when a task awaiting the shutdown forwards its cancellation
+    with suppress(asyncio.CancelledError):
+        if tasks:
+            await asyncio.wait(tasks)
+
+    _LOGGER.info("Shutdown complete!")
+
+
+async def _shutdown_mqtt_services() -> None:
     if bumper_isc.mqtt_helperbot is not None:
         await bumper_isc.mqtt_helperbot.disconnect()
+    # A running start is finished before the shutdown
+    if bumper_isc.mqtt_server is not None and bumper_isc.mqtt_server.state in ["starting", "started"]:
+        await bumper_isc.mqtt_server.shutdown()
+
 
+async def _shutdown_web_server() -> None:
     if bumper_isc.web_server is not None:
         await bumper_isc.web_server.shutdown()
 
-    if bumper_isc.mqtt_server is not None:
-        while bumper_isc.mqtt_server.state in ["starting", "stopping"]:
-            _LOGGER.info("Waiting for MQTT Server to stabilize before shutdown...")
-            await asyncio.sleep(0.1)
-        if bumper_isc.mqtt_server.state == "started":
-            await bumper_isc.mqtt_server.shutdown()
 
+async def _shutdown_xmpp_server() -> None:
     if bumper_isc.xmpp_server is not None and bumper_isc.xmpp_server.server:
         await bumper_isc.xmpp_server.disconnect()
 
-    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
-    for task in tasks:
-        task.cancel()
-    with suppress(asyncio.CancelledError):
-        await asyncio.gather(*tasks)
-
-    _LOGGER.info("Shutdown complete!")
-
 
 def read_args(argv: list[str] | None) -> None:
     """Parse command-line arguments."""
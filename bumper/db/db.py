@@ -1,6 +1,13 @@
 """Initialize TinyDB connection and define table constants."""
 
+import asyncio
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import Any
+
 from tinydb import Query, TinyDB
+from tinydb.table import Table
 
 from bumper.utils.settings import config as bumper_isc
 
@@ -17,10 +24,38 @@ TABLE_CLEAN_LOGS = "clean_logs"
 # Shared Query instance for TinyDB queries
 QueryInstance = Query()
 
+# TinyDB rewrites the whole file on every change, so reads and writes from the event loop
+# and from the DB executor thread must not interleave
+_DB_LOCK = threading.RLock()
+# A single worker keeps the database operations in submission order
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bumper-db")
+
+
+class _LockedTable(Table):
+    """Table, which serializes access to the database file across threads."""
+
+    def _read_table(self) -> dict[str, Mapping[str, Any]]:
+        with _DB_LOCK:
+            return super()._read_table()
+
+    def _update_table(self, updater: Callable[[dict[int, Mapping[str, Any]]], None]) -> None:
+        with _DB_LOCK:
+            super()._update_table(updater)
+
+
+class _TinyDB(TinyDB):
+    table_class = _LockedTable
+
+
+async def run_in_db_executor[T](func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking database operation in the DB executor, so the event loop is not stalled by disk I/O."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_DB_EXECUTOR, func, *args)
+
 
 def get_db() -> TinyDB:
     """Return initialized TinyDB instance with all tables created."""
-    db = TinyDB(bumper_isc.db_file)
+    db = _TinyDB(bumper_isc.db_file)
     for name in (TABLE_USERS, TABLE_TOKENS, TABLE_CLEAN_LOGS, TABLE_CLIENTS, TABLE_BOTS):
         db.table(name, cache_size=0)
     return db
@@ -21,10 +21,10 @@ class TokenRepo(BaseRepo):
     def __init__(self) -> None:
         super().__init__(TABLE_TOKENS)
 
-    def add(self, userid: str, token_str: str) -> None:
+    def add(self, userid: str, token_str: str, device_id: str | None = None) -> None:
         """Create and insert a new Token for a user."""
         expiration = datetime.now(tz=bumper_isc.LOCAL_TIMEZONE) + timedelta(seconds=bumper_isc.TOKEN_VALIDITY_SECONDS)
-        token = Token(userid=userid, token=token_str, expiration=expiration)
+        token = Token(userid=userid, token=token_str, expiration=expiration, device_id=device_id)
         q = (QueryInstance.userid == userid) & (QueryInstance.token == token_str)
         if not self.table.contains(q):
             self.table.insert(token.to_db())
@@ -48,6 +48,33 @@ class TokenRepo(BaseRepo):
         """Verify Token existence."""
         return bool(self.table.contains((QueryInstance.userid == user_id) & (QueryInstance.token == token_str)))
 
+    def get_valid_for_device(self, user_id: str, device_id: str) -> Token | None:
+        """Get the not expired Token of a user issued to a device, the one expiring last if there are more."""
+        now_iso = datetime.now(tz=bumper_isc.LOCAL_TIMEZONE).isoformat()
+        recs = self.table.search(
+            (QueryInstance.userid == user_id) & (QueryInstance.device_id == device_id) & (where("expiration") > now_iso),
+        )
+        if not recs:
+            return None
+        return Token.from_dict(max(recs, key=lambda rec: str(rec.get("expiration", ""))))
+
+    def refresh(self, user_id: str, token_str: str) -> bool:
+        """Slide the expiration of a not expired Token, False if there is no such Token.
+
+        The expiration is only written when less than half of the validity is left, so frequent
+        checks of the same token do not rewrite the database on every call.
+        """
+        now = datetime.now(tz=bumper_isc.LOCAL_TIMEZONE)
+        rec = self._get(
+            (QueryInstance.userid == user_id) & (QueryInstance.token == token_str) & (where("expiration") > now.isoformat()),
+        )
+        if not isinstance(rec, Document):
+            return False
+        validity = timedelta(seconds=bumper_isc.TOKEN_VALIDITY_SECONDS)
+        if datetime.fromisoformat(rec["expiration"]) - now < validity / 2:
+            self.table.update({"expiration": (now + validity).isoformat()}, doc_ids=[rec.doc_id])
+        return True
+
     def add_auth_code(self, user_id: str, auth_code: str) -> bool:
         """Add auth code to existing Token."""
         rec = self._get(QueryInstance.userid == user_id)
@@ -1,9 +1,9 @@
 """Helper bot handle atr."""
 
-import json
 import logging
 
 from bumper.db import clean_log_repo
+from bumper.utils import json_codec
 from bumper.web.models import CleanLog
 
 _LOGGER = logging.getLogger(__name__)
@@ -15,7 +15,7 @@ def clean_log(did: str, rid: str, payload: str) -> None:
     type: "onStats" or "reportStats"
     """
     _LOGGER.debug(f"CLEAN_LOG :: DID: {did} :: RID: {rid} :: PAYLOAD: {payload}")
-    res = json.loads(payload)
+    res = json_codec.loads(payload)
     if not isinstance(res, dict):
         return
 
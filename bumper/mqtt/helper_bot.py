@@ -1,13 +1,15 @@
 """Helper bot module."""
 
 import asyncio
+from collections import Counter, deque
 import contextlib
-import json
+import itertools
 import logging
+import math
 import random
-import ssl
 import string
-from typing import TYPE_CHECKING, Any
+import time
+from typing import Any
 
 from aiohttp import web
 from aiohttp.web_response import Response
@@ -15,17 +17,27 @@ from aiomqtt import Client as MQTTClient, MqttError, Topic
 from cachetools import TTLCache
 
 from bumper.mqtt.handle_atr import clean_log
-from bumper.utils import utils
+from bumper.mqtt.latency import CommandLatency
+from bumper.utils import json_codec, utils
+from bumper.utils.readiness import Readiness
+from bumper.utils.settings import config as bumper_isc
+from bumper.utils.tls_context import tls_provider
 from bumper.web.response_utils import response_error_v8, response_success_v2
 
-if TYPE_CHECKING:
-    from collections.abc import MutableMapping
-
 _LOGGER = logging.getLogger(__name__)
 HELPER_BOT_CLIENT_ID = "helperbot@bumper/helperbot"
 HELPER_BOT_CLIENT_ID_MQTT = HELPER_BOT_CLIENT_ID.replace("@", "/")
 RECONNECT_INTERVAL = 5  # seconds
 
+# Request ids are a random prefix per process and a counter, so they never repeat and contain only letters and digits
+_REQUEST_ID_PREFIX = "".join(random.choices(string.ascii_letters, k=4))  # noqa: S311
+_request_counter = itertools.count(1)
+
+
+def new_request_id() -> str:
+    """Get a request id, unique in this process and valid as a level of an mqtt topic."""
+    return f"{_REQUEST_ID_PREFIX}{next(_request_counter):x}"
+
 
 class MQTTCommandModel:
     """MQTT Command Model."""
@@ -44,10 +56,12 @@ class MQTTCommandModel:
     to_type: str | None
     to_res: str | None
     td: str | None
+    timeout: float | None = None  # Overrides the deadline from the observed latency
+    answered: bool = False  # Set when the bot responded to the command
 
     def __init__(self, cmdjson: dict[str, Any], version: str = VERSION_OLD) -> None:
         """MQTT Command Model init."""
-        self.request_id = "".join(random.sample(string.ascii_letters, 4))
+        self.request_id = new_request_id()
         self.version = version
         if version == self.VERSION_OLD:
             self.from_version_1(cmdjson)
@@ -60,6 +74,17 @@ class MQTTCommandModel:
             _LOGGER.error(msg)
             raise ValueError(msg)
 
+    def set_timeout(self, value: str | float | None) -> None:
+        """Set the seconds to wait for the response, ignored if not a positive number."""
+        try:
+            timeout = float(value) if value is not None else None
+        except ValueError:
+            timeout = None
+        if timeout is not None and timeout > 0 and math.isfinite(timeout):
+            self.timeout = timeout
+        elif value is not None:
+            _LOGGER.warning(f"Ignored invalid command timeout :: {value!r}")
+
     def from_version_1(self, cmdjson: dict[str, Any]) -> None:
         """Parse command information from version 1."""
         self.payload_type = cmdjson.get("payloadType", "j")
@@ -70,7 +95,7 @@ class MQTTCommandModel:
         self.td = cmdjson.get("td")
 
         payload_j = cmdjson.get("payload")
-        self.payload = json.dumps(payload_j) if self.payload_type == "j" else str(payload_j)
+        self.payload = json_codec.dumps(payload_j) if self.payload_type == "j" else str(payload_j)
 
     def from_version_2(self, cmdjson: dict[str, Any]) -> None:
         """Parse command information from version 2."""
@@ -82,7 +107,7 @@ class MQTTCommandModel:
         self.td = cmdjson.get("ct")
 
         payload_j = cmdjson.get("payload")
-        self.payload = json.dumps(payload_j) if self.payload_type == "j" else str(payload_j)
+        self.payload = json_codec.dumps(payload_j) if self.payload_type == "j" else str(payload_j)
 
     def from_version_p2p(self, cmdjson: dict[str, Any]) -> None:
         """Parse command information from version p2p."""
@@ -112,7 +137,7 @@ class MQTTCommandModel:
         if payload_j:
             payload_j = {"body": {"data": payload_j}}
 
-        self.payload = json.dumps(payload_j) if self.payload_type == "j" else str(payload_j)
+        self.payload = json_codec.dumps(payload_j) if self.payload_type == "j" else str(payload_j)
 
     def create_topic(self) -> str:
         """Create the MQTT topic for the command."""
@@ -131,19 +156,41 @@ class MQTTHelperBot:
         self._port = port
         self._use_ssl = use_ssl
         self._timeout = timeout
-        self._is_connected = False  # Track connection state
+        self.readiness = Readiness()  # Ready while connected
         self._client: MQTTClient | None = None  # MQTT client instance
-        self._commands: MutableMapping[str, CommandDto] = TTLCache(maxsize=timeout * 60, ttl=timeout * 1.1)
+        self._limiter = CommandLimiter()
+        self.latency = CommandLatency(ceiling=timeout)
+        self._commands = _CommandCache(maxsize=self._limiter.max_in_flight or math.inf, ttl=timeout * 1.1)
+        self._counters: Counter[str] = Counter()
+        # Commands to offline bots with their expiry time, delivered when the bot subscribes again
+        self._pending: dict[str, deque[tuple[float, MQTTCommandModel]]] = {}
+        self._delivery_tasks: set[asyncio.Task[None]] = set()
         self._mqtt_task: asyncio.Task[None] | None = None  # Task for managing MQTT connection
 
     @property
     async def is_connected(self) -> bool:
-        """Return True if client is connected successfully."""
-        for _ in range(10):  # Retry for up to 1 second
-            if self._is_connected:
-                break
-            await asyncio.sleep(0.1)
-        return self._is_connected
+        """Return True if client is connected successfully, waits up to 1 second for a connection."""
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(1):
+                await self.readiness.wait_ready()
+        return self.readiness.is_ready
+
+    def stats(self) -> dict[str, int]:
+        """Get the number of commands in flight and waiting for a slot, and the command counters."""
+        return {
+            "in_flight": self._limiter.in_flight,
+            "queued": self._limiter.queued,
+            "rejected": self._limiter.rejected,
+            "completed": self._counters["completed"],
+            "timeouts": self._counters["timeouts"],
+            "evictions": self._commands.evictions,
+            "offline": self._counters["offline"],
+            "pending": sum(len(commands) for commands in self._pending.values()),
+            "delivered": self._counters["delivered"],
+            "delivery_failed": self._counters["delivery_failed"],
+            "expired": self._counters["expired"],
+            "dropped": self._counters["dropped"],
+        }
 
     async def start(self) -> None:
         """Start the helper bot and manage the MQTT connection."""
@@ -158,59 +205,116 @@ class MQTTHelperBot:
             with contextlib.suppress(asyncio.CancelledError):
                 await self._mqtt_task
             self._mqtt_task = None
+        for task in self._delivery_tasks:
+            task.cancel()
         # Explicitly set the client to None to ensure cleanup
         self._client = None
-        self._is_connected = False
+        self.readiness.set_stopped()
 
     async def _mqtt_loop(self) -> None:
         """Manage MQTT connection and reconnection in the main loop."""
         while True:
             try:
-                ssl_ctx: ssl.SSLContext | None = None
-                if self._use_ssl:
-                    ssl_ctx = ssl.create_default_context()
-                    ssl_ctx.check_hostname = False
-                    ssl_ctx.verify_mode = ssl.CERT_NONE
-
                 async with MQTTClient(
                     hostname=self._host,
                     port=self._port,
-                    tls_context=ssl_ctx,
+                    tls_context=tls_provider.client_context() if self._use_ssl else None,
                     identifier=HELPER_BOT_CLIENT_ID,
                 ) as client:
                     self._client = client
-                    self._is_connected = True
-                    _LOGGER.info("Helper Bot connected successfully.")
                     await self._subscribe_topics()
+                    self.readiness.set_ready()
+                    _LOGGER.info("Helper Bot connected successfully.")
 
                     # Listen for messages
                     async for message in client.messages:
                         await self._on_message(message.topic, message.payload)
             except MqttError as e:
-                self._is_connected = False
+                self.readiness.set_stopped()
                 _LOGGER.warning(f"MQTT connection lost: {e}. Reconnecting in {RECONNECT_INTERVAL} seconds...")
                 await asyncio.sleep(RECONNECT_INTERVAL)
             except Exception:
-                self._is_connected = False
+                self.readiness.set_stopped()
                 _LOGGER.exception("Unexpected error in MQTT loop")
                 await asyncio.sleep(RECONNECT_INTERVAL)
 
+    async def dispatch(self, cmd: MQTTCommandModel) -> Response:
+        """Send the command if its bot is connected, otherwise fail at once or keep it until the bot reconnects."""
+        did = cmd.did or ""
+        if bumper_isc.mqtt_server is None or bumper_isc.mqtt_server.is_bot_connected(did):
+            return await self.send_command(cmd)
+
+        ttl = bumper_isc.HELPERBOT_PENDING_TTL
+        if ttl <= 0:
+            self._counters["offline"] += 1
+            _LOGGER.debug(f"Bot is offline, command rejected :: did: {did} :: command: {cmd.cmd_name}")
+            return response_error_v8(cmd.request_id, "requested bot is offline")
+
+        self._drop_expired()
+        pending = self._pending.setdefault(did, deque(maxlen=bumper_isc.HELPERBOT_PENDING_SIZE or None))
+        if pending.maxlen is not None and len(pending) == pending.maxlen:
+            self._counters["dropped"] += 1
+        pending.append((time.monotonic() + ttl, cmd))
+        _LOGGER.debug(f"Bot is offline, command queued :: did: {did} :: command: {cmd.cmd_name}")
+        return response_error_v8(cmd.request_id, "requested bot is offline, command queued")
+
+    def on_bot_subscribed(self, did: str) -> None:
+        """Deliver the commands kept for the bot, which is connected again."""
+        self._drop_expired()
+        if pending := self._pending.pop(did, None):
+            task = asyncio.create_task(self._deliver(did, list(pending)), name=f"helperbot_deliver_{did}")
+            self._delivery_tasks.add(task)
+            task.add_done_callback(self._delivery_tasks.discard)
+
+    async def _deliver(self, did: str, commands: list[tuple[float, MQTTCommandModel]]) -> None:
+        _LOGGER.info(f"Delivering {len(commands)} queued commands :: did: {did}")
+        for _, cmd in commands:
+            await self.send_command(cmd)
+            self._counters["delivered" if cmd.answered else "delivery_failed"] += 1
+
+    def _drop_expired(self) -> None:
+        """Drop the expired commands of all bots, and the bots without commands left."""
+        now = time.monotonic()
+        for did, pending in list(self._pending.items()):
+            while pending and pending[0][0] <= now:
+                pending.popleft()
+                self._counters["expired"] += 1
+            if not pending:
+                del self._pending[did]
+
     async def send_command(self, cmd: MQTTCommandModel) -> Response:
-        """Send command over MQTT."""
+        """Send command over MQTT, rejected if too many commands wait for a response."""
+        did = cmd.did or ""
+        if not await self._limiter.acquire(did):
+            _LOGGER.warning(f"Too many commands in flight, rejected :: did: {did} :: command: {cmd.cmd_name}")
+            return response_error_v8(cmd.request_id, "too many commands in flight")
         try:
             if not await self.is_connected:
                 await self.start()
 
+            # A response is delivered by its request id, which must not be used by another command in flight
+            while cmd.request_id in self._commands:
+                cmd.request_id = new_request_id()
             topic = cmd.create_topic()
             command_dto = CommandDto(cmd.payload_type)
             self._commands[cmd.request_id] = command_dto
 
             _LOGGER.debug(f"Sending message :: topic={topic} :: payload={cmd.payload}")
+            class_id, cmd_name = cmd.to_type or "", cmd.cmd_name or ""
+            deadline = self.latency.deadline(class_id, cmd_name) if cmd.timeout is None else min(cmd.timeout, self._timeout)
+            sent = time.monotonic()
             await self.publish(topic, cmd.payload)
 
-            cmd_response = await self._wait_for_resp(command_dto)
-            _LOGGER.debug(f"To   Bot  Request :: {cmd.__dict__}")
-            _LOGGER.debug(f"From Bot Response :: {cmd_response}")
+            if not await self._wait_for_resp(command_dto, deadline):
+                if cmd.timeout is None:
+                    self.latency.record_timeout(class_id, cmd_name, deadline)
+                return response_error_v8(cmd.request_id, "wait for response timed out")
+            self.latency.record(class_id, cmd_name, time.monotonic() - sent)
+            self._counters["completed"] += 1
+            cmd.answered = True
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"To   Bot  Request :: {cmd.__dict__}")
+                _LOGGER.debug(f"From Bot Response :: {command_dto.raw_response!r}")
 
             # try:
             #     if cmd_response.get("header", {}).get("fwVer"):
@@ -222,16 +326,23 @@ class MQTTHelperBot:
             # except Exception:
             #     pass
 
-            if cmd_response is None:
-                return response_error_v8(cmd.request_id, "wait for response timed out")
+            # Json objects are passed on as received, without encoding them again
+            raw_json = command_dto.json_object(validate=cmd.version == cmd.VERSION_OLD)
 
-            # Calls by '/iot/devmanager.do'
+            # Calls by '/iot/devmanager.do', an invalid payload fails in parsing it
             if cmd.version == cmd.VERSION_OLD:
-                return web.json_response(
+                if raw_json is not None:
+                    envelope = json_codec.dumpb({"id": cmd.request_id, "ret": "ok", "payloadType": cmd.payload_type})
+                    return web.Response(
+                        body=b"".join((envelope[:-1], b',"resp":', raw_json, b"}")),
+                        content_type=json_codec.CONTENT_TYPE_JSON,
+                        charset="utf-8",
+                    )
+                return json_codec.json_response(
                     {
                         "id": cmd.request_id,
                         "ret": "ok",
-                        "resp": cmd_response,
+                        "resp": command_dto.parsed_response(),
                         "payloadType": cmd.payload_type,
                     },
                 )
@@ -239,7 +350,7 @@ class MQTTHelperBot:
             # Calls by 'iot/endpoint/control'
             if cmd.version == cmd.VERSION_NEW:
                 return web.Response(
-                    body=json.dumps(cmd_response, separators=(",", ":")).encode("utf-8"),
+                    body=raw_json if raw_json is not None else json_codec.dumpb(command_dto.parsed_response()),
                     content_type="application/octet-stream",
                     charset="utf-8",
                     headers={
@@ -248,6 +359,8 @@ class MQTTHelperBot:
                     },
                 )
 
+            cmd_response = command_dto.parsed_response()
+
             # Calls by 'appsvr/app.do' with 'RobotControl'
             if cmd.version == cmd.VERSION_P2P and isinstance(cmd_response, dict):
                 ret_type: dict[str, Any] | None = None
@@ -275,25 +388,29 @@ class MQTTHelperBot:
             return response_error_v8(cmd.request_id, "exception occurred please check bumper logs")
         finally:
             self._commands.pop(cmd.request_id, None)
+            await self._limiter.release(did)
 
-    async def publish(self, topic: str, payload: str) -> None:
-        """Publish message."""
+    async def publish(self, topic: str, payload: str | bytes | bytearray) -> None:
+        """Publish message, a payload in bytes is sent as is."""
         if not self._client:
             error_message = "MQTT client is not connected."
             raise MqttError(error_message)
-        await self._client.publish(topic, payload.encode())
+        await self._client.publish(topic, payload.encode() if isinstance(payload, str) else payload)
 
-    async def _wait_for_resp(self, command_dto: "CommandDto") -> str | dict[str, Any] | None:
-        """Wait for response."""
+    async def _wait_for_resp(self, command_dto: "CommandDto", deadline: float) -> bool:
+        """Wait up to the deadline in seconds for the response, get False if none was received."""
         try:
-            return await asyncio.wait_for(command_dto.wait_for_response(), timeout=self._timeout)
+            await asyncio.wait_for(command_dto.wait_for_response(), timeout=deadline)
         except TimeoutError:
+            self._counters["timeouts"] += 1
             _LOGGER.debug("wait_for_resp timeout reached")
         except asyncio.CancelledError:
             _LOGGER.debug("wait_for_resp cancelled by asyncio", exc_info=True)
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder(info="during wait for response"))
-        return None
+        else:
+            return True
+        return False
 
     async def _subscribe_topics(self) -> None:
         """Subscribe to required topics."""
@@ -306,13 +423,16 @@ class MQTTHelperBot:
     async def _on_message(self, topic: Topic, payload: Any) -> None:
         """Handle incoming messages."""
         try:
-            decoded_payload: str = payload.decode("utf-8", errors="replace")
-
-            _LOGGER.debug(f"Got message :: topic={topic.value} :: payload={decoded_payload}")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"Got message :: topic={topic.value} :: payload={payload.decode('utf-8', errors='replace')}")
             topic_split = topic.value.split("/")  # Use `topic.value` to get the string representation
             if topic_split[1] == "p2p" and topic_split[10] in self._commands:
-                self._commands[topic_split[10]].add_response(decoded_payload)
-            elif topic_split[1] == "atr" and topic_split[2] in ("onStats", "reportStats"):
+                # Kept as received, the response is only parsed if it has to be translated
+                self._commands[topic_split[10]].add_response(payload)
+                return
+
+            decoded_payload: str = payload.decode("utf-8", errors="replace")
+            if topic_split[1] == "atr" and topic_split[2] in ("onStats", "reportStats"):
                 clean_log(did=topic_split[3], rid=topic_split[5], payload=decoded_payload)
             elif topic_split[1] == "atr":
                 # pass  # NOTE: check later to use for some server side information to display
@@ -346,25 +466,127 @@ class MQTTHelperBot:
             raise
 
 
+class CommandLimiter:
+    """Limit the commands waiting for a response, in total and per bot.
+
+    A command over a limit waits up to `queue_timeout` seconds for a free slot and is rejected afterwards.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = bumper_isc.HELPERBOT_MAX_IN_FLIGHT,
+        max_per_bot: int = bumper_isc.HELPERBOT_MAX_IN_FLIGHT_PER_BOT,
+        queue_timeout: float = bumper_isc.HELPERBOT_QUEUE_TIMEOUT,
+    ) -> None:
+        """Command limiter init, a limit of 0 disables it."""
+        self.max_in_flight = max_in_flight
+        self._max_per_bot = max_per_bot
+        self._queue_timeout = queue_timeout
+        self._per_bot: Counter[str] = Counter()
+        self._released = asyncio.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+
+    async def acquire(self, did: str) -> bool:
+        """Take a slot for a command to the bot, get False if none got free within the queue timeout."""
+        if self._has_slot(did):
+            self._take(did)
+            return True
+        if self._queue_timeout > 0:
+            self.queued += 1
+            try:
+                async with asyncio.timeout(self._queue_timeout), self._released:
+                    await self._released.wait_for(lambda: self._has_slot(did))
+                    self._take(did)
+                    return True
+            except TimeoutError:
+                pass
+            finally:
+                self.queued -= 1
+        self.rejected += 1
+        return False
+
+    async def release(self, did: str) -> None:
+        """Free the slot of a command to the bot."""
+        self.in_flight -= 1
+        self._per_bot[did] -= 1
+        if self._per_bot[did] <= 0:
+            del self._per_bot[did]
+        if self.queued > 0:
+            async with self._released:
+                self._released.notify_all()
+
+    def _has_slot(self, did: str) -> bool:
+        return (self.max_in_flight <= 0 or self.in_flight < self.max_in_flight) and (
+            self._max_per_bot <= 0 or self._per_bot[did] < self._max_per_bot
+        )
+
+    def _take(self, did: str) -> None:
+        self.in_flight += 1
+        self._per_bot[did] += 1
+
+
+class _CommandCache(TTLCache[str, "CommandDto"]):
+    """Commands waiting for a response, which counts the commands evicted because the cache was full."""
+
+    evictions: int = 0
+
+    def popitem(self) -> tuple[str, "CommandDto"]:
+        """Evict the least recently used command."""
+        request_id, command = super().popitem()
+        self.evictions += 1
+        _LOGGER.warning(f"Evicted command waiting for a response :: Request id: {request_id}")
+        return request_id, command
+
+
 class CommandDto:
-    """Command DTO."""
+    """Command DTO, which keeps the response payload as received and parses it only on demand."""
 
     def __init__(self, payload_type: str) -> None:
         """Command DTO init."""
         self._payload_type = payload_type
         self._event = asyncio.Event()
-        self._response: str | bytes | None = None
+        self._response: bytes | None = None
 
-    async def wait_for_response(self) -> str | dict[str, Any] | None:
-        """Wait for the response to be received."""
+    @property
+    def raw_response(self) -> bytes | None:
+        """Get the response payload as received."""
+        return self._response
+
+    async def wait_for_response(self) -> bytes:
+        """Wait for the response to be received and get its payload as received."""
         await self._event.wait()
-        if self._payload_type == "j" and self._response is not None:
-            res = json.loads(self._response)
+        return self._response if self._response is not None else b""
+
+    def json_object(self, validate: bool = False) -> bytes | None:
+        """Get the received payload if it is a json object, which can be passed on without encoding it again.
+
+        Validate it if the payload is embedded into another json document, so an invalid one is not passed on.
+        """
+        if self._payload_type != "j" or self._response is None:
+            return None
+        payload = self._response.strip()
+        if not payload.startswith(b"{") or not payload.endswith(b"}"):
+            return None
+        if validate:
+            try:
+                json_codec.loads(payload)
+            except json_codec.JSONDecodeError:
+                return None
+        return payload
+
+    def parsed_response(self) -> str | dict[str, Any] | None:
+        """Get the response parsed to a dict for json objects, else as text."""
+        if self._response is None:
+            return None
+        if self._payload_type == "j":
+            res = json_codec.loads(self._response)
             if isinstance(res, dict):
                 return res
-        return str(self._response) if self._response is not None else None
+        return self._response.decode("utf-8", errors="replace")
 
-    def add_response(self, response: str | bytes) -> None:
+    def add_response(self, response: str | bytes | bytearray) -> None:
         """Add received response."""
-        self._response = response
+        self._response = response.encode() if isinstance(response, str) else bytes(response)
         self._event.set()
@@ -0,0 +1,99 @@
+"""Bot command latency module."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from cachetools import LRUCache
+
+from bumper.utils.settings import config as bumper_isc
+
+# Weights of a new sample in the smoothed latency and its deviation, as for the TCP retransmission timeout (RFC 6298)
+_ALPHA = 0.125
+_BETA = 0.25
+# Samples of a command needed before its deadline is derived from them
+MIN_SAMPLES = 5
+# Commands tracked, the least recently used is dropped first
+MAX_ENTRIES = 1024
+
+
+@dataclass(slots=True)
+class _LatencyEntry:
+    """Smoothed latency of a command in seconds."""
+
+    samples: int = 0
+    timeouts: int = 0
+    smoothed: float = 0.0
+    deviation: float = 0.0
+    maximum: float = 0.0
+
+    def add(self, latency: float) -> None:
+        if self.samples == 0:
+            self.smoothed = latency
+            self.deviation = latency / 2
+        else:
+            self.deviation += _BETA * (abs(latency - self.smoothed) - self.deviation)
+            self.smoothed += _ALPHA * (latency - self.smoothed)
+        self.samples += 1
+        self.maximum = max(self.maximum, latency)
+
+
+class CommandLatency:
+    """Latency of bot commands per bot class and command name, which sets the deadline of the next command.
+
+    The deadline is the smoothed latency plus four times its deviation, multiplied by `factor` and bounded by `floor`
+    and `ceiling`. Until a command has enough samples, or if not `adaptive`, the ceiling is used.
+    A timeout is recorded as a sample of the deadline, so the deadline of a command which keeps timing out grows.
+    """
+
+    def __init__(
+        self,
+        ceiling: float,
+        floor: float = bumper_isc.HELPERBOT_TIMEOUT_MIN,
+        factor: float = bumper_isc.HELPERBOT_TIMEOUT_FACTOR,
+        adaptive: bool = bumper_isc.HELPERBOT_ADAPTIVE_TIMEOUT,
+    ) -> None:
+        """Command latency init."""
+        self._ceiling = ceiling
+        self._floor = floor
+        self._factor = factor
+        self._adaptive = adaptive
+        self._entries: LRUCache[tuple[str, str], _LatencyEntry] = LRUCache(maxsize=MAX_ENTRIES)
+
+    def deadline(self, class_id: str, cmd_name: str) -> float:
+        """Get the seconds to wait for the response of the command."""
+        entry = self._entries.get((class_id, cmd_name))
+        if not self._adaptive or entry is None or entry.samples < MIN_SAMPLES:
+            return self._ceiling
+        return self._deadline(entry)
+
+    def record(self, class_id: str, cmd_name: str, latency: float) -> None:
+        """Add the seconds the bot took to respond to the command."""
+        self._entry(class_id, cmd_name).add(latency)
+
+    def record_timeout(self, class_id: str, cmd_name: str, deadline: float) -> None:
+        """Add a command which got no response within the deadline."""
+        entry = self._entry(class_id, cmd_name)
+        entry.timeouts += 1
+        entry.add(deadline)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Get the latency and the current deadline in milliseconds per `<class_id>/<cmd_name>`."""
+        return {
+            f"{class_id}/{cmd_name}": {
+                "samples": entry.samples,
+                "timeouts": entry.timeouts,
+                "smoothed_ms": round(entry.smoothed * 1000, 1),
+                "deviation_ms": round(entry.deviation * 1000, 1),
+                "max_ms": round(entry.maximum * 1000, 1),
+                "deadline_ms": round(self.deadline(class_id, cmd_name) * 1000, 1),
+            }
+            for (class_id, cmd_name), entry in list(self._entries.items())
+        }
+
+    def _entry(self, class_id: str, cmd_name: str) -> _LatencyEntry:
+        if (entry := self._entries.get((class_id, cmd_name))) is None:
+            entry = self._entries[class_id, cmd_name] = _LatencyEntry()
+        return entry
+
+    def _deadline(self, entry: _LatencyEntry) -> float:
+        return min(self._ceiling, max(self._floor, (entry.smoothed + 4 * entry.deviation) * self._factor))
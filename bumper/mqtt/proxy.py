@@ -1,7 +1,10 @@
 """Mqtt proxy module."""
 
 import asyncio
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable, MutableMapping
 import contextlib
+import itertools
 import logging
 import ssl
 import typing
@@ -14,22 +17,146 @@ from amqtt.errors import ConnectError, ProtocolHandlerError
 from amqtt.mqtt.connack import CONNECTION_ACCEPTED, SERVER_UNAVAILABLE
 from amqtt.mqtt.constants import QOS_0
 from amqtt.mqtt.protocol.client_handler import ClientProtocolHandler
+from amqtt.session import ApplicationMessage
 from cachetools import TTLCache
 import websockets
 from websockets.exceptions import InvalidHandshake, InvalidURI
 
 from bumper.utils.settings import config as bumper_isc
 
-if typing.TYPE_CHECKING:
-    from collections.abc import MutableMapping
-
 _LOGGER = logging.getLogger(__name__)
 
+# Delay bounds of the reconnects of multiplexed proxy connections
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+
+
+class ForwardQueue:
+    """Bounded queue of messages forwarded in one direction, which are sent in order by a worker task.
+
+    A producer waits while the queue is full, at most `put_timeout` seconds if given, after which the message is dropped.
+    The counters of all queues of a direction are summed up in `forward_stats`.
+    """
+
+    totals: typing.ClassVar[defaultdict[str, Counter[str]]] = defaultdict(Counter)
+
+    def __init__(
+        self,
+        direction: str,
+        send: Callable[[str, bytes | bytearray, int | None], Awaitable[None]],
+        maxsize: int = bumper_isc.PROXY_MQTT_QUEUE_SIZE,
+        put_timeout: float | None = None,
+    ) -> None:
+        """Forward queue init, the worker is started on the first message."""
+        self.direction = direction
+        self.counters: Counter[str] = Counter()
+        self._send = send
+        self._put_timeout = put_timeout
+        self._queue: asyncio.Queue[tuple[str, bytes | bytearray, int | None]] = asyncio.Queue(maxsize)
+        self._worker: asyncio.Task[None] | None = None
+
+    async def put(self, topic: str, payload: bytes | bytearray, qos: int | None = None) -> bool:
+        """Queue a message, get False if it was dropped because the queue stayed full."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name=f"mqtt_proxy_forward_{self.direction}")
+            self._worker.add_done_callback(_log_reader_exit)
+        item = (topic, payload, qos)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._count("backpressured")
+            try:
+                async with asyncio.timeout(self._put_timeout):
+                    await self._queue.put(item)
+            except TimeoutError:
+                self._count("dropped")
+                _LOGGER.warning(f"Forward queue {self.direction} is full, dropped message :: Topic: {topic}")
+                return False
+        self._count("queued")
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Get the counters and the number of waiting messages."""
+        return {"pending": self._queue.qsize(), **_forward_counters(self.counters)}
+
+    async def close(self) -> None:
+        """Stop the worker, waiting messages are discarded."""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            topic, payload, qos = await self._queue.get()
+            try:
+                await self._send(topic, payload, qos)
+            except Exception as e:
+                self._count("failed")
+                _LOGGER.warning(f"Forward queue {self.direction} :: Sending failed :: Topic: {topic} :: {e}")
+            else:
+                self._count("forwarded")
+                self._count("bytes", len(payload))
+
+    def _count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+        ForwardQueue.totals[self.direction][name] += value
+
+
+def _forward_counters(counters: Counter[str]) -> dict[str, int]:
+    return {name: counters[name] for name in ("queued", "forwarded", "bytes", "backpressured", "dropped", "failed")}
+
+
+def forward_stats() -> dict[str, dict[str, int]]:
+    """Get the counters of the forwarded messages per direction."""
+    return {direction: _forward_counters(ForwardQueue.totals[direction]) for direction in ("to_robot", "to_ecovacs")}
+
+
+async def _publish_to_robot(topic: str, payload: bytes | bytearray, _: int | None = None) -> None:
+    if bumper_isc.mqtt_helperbot is None:
+        msg = "Helper bot is not connected"
+        raise ConnectionError(msg)
+    await bumper_isc.mqtt_helperbot.publish(topic, payload)
+
+
 # iot/p2p/[command]]/[sender did]/[sender class]]/[sender resource]
 # /[receiver did]/[receiver class]]/[receiver resource]/[q|p/[request id/j
 # [q|p] q-> request p-> response
 
 
+async def _forward_to_robot(message: ApplicationMessage, request_mapper: MutableMapping[str, str], queue: ForwardQueue) -> None:
+    """Queue a message from the Ecovacs servers for the robot, with the sender replaced by the proxy helper.
+
+    Only the topic is rewritten, the payload is forwarded as received and decoded for logging only.
+    Waits while the queue is full, so the upstream connection is not read faster than the robots are served.
+    """
+    payload: bytes | bytearray = message.data if message.data is not None else b""
+    topic = message.topic
+    ttopic = topic.split("/")
+    if ttopic[1] == "p2p":
+        if ttopic[3] == "proxyhelper":
+            _LOGGER.error(f'"proxyhelper" was sender - INVALID!! Topic: {topic}')
+            return
+
+        request_mapper[ttopic[10]] = ttopic[3]
+        ttopic[3] = "proxyhelper"
+        topic = "/".join(ttopic)
+
+    if _LOGGER.isEnabledFor(logging.INFO):
+        _LOGGER.info(
+            f"Proxy Forward Message to Robot - Topic: {topic} - Original Topic: {message.topic}"
+            f" - Message: {payload.decode('utf-8', errors='replace')}",
+        )
+
+    await queue.put(topic, payload, message.qos)
+
+
+def _log_reader_exit(task: asyncio.Task[None]) -> None:
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        _LOGGER.error(f"Proxy reader {task.get_name()} stopped unexpectedly", exc_info=exc)
+
+
 class ProxyClient:
     """Mqtt client, which proxies all messages to the ecovacs servers."""
 
@@ -46,6 +173,9 @@ class ProxyClient:
         self._client: MQTTClient = _NoCertVerifyClient(client_id=client_id, config=config)
         self._host = host
         self._port = port
+        self._reader: asyncio.Task[None] | None = None
+        self._to_robot = ForwardQueue("to_robot", _publish_to_robot)
+        self._to_ecovacs = ForwardQueue("to_ecovacs", self.publish, put_timeout=bumper_isc.PROXY_MQTT_QUEUE_TIMEOUT)
 
     async def connect(self, username: str, password: str) -> None:
         """Connect."""
@@ -55,7 +185,8 @@ class ProxyClient:
             _LOGGER.exception("An exception occurred during startup")
             raise
 
-        asyncio.Task(self._handle_messages())
+        self._reader = asyncio.create_task(self._handle_messages(), name=f"mqtt_proxy_reader_{self._client.client_id}")
+        self._reader.add_done_callback(_log_reader_exit)
 
     async def _handle_messages(self) -> None:
         if self._client.session is None or bumper_isc.mqtt_helperbot is None:
@@ -66,27 +197,7 @@ class ProxyClient:
                 message = await self._client.deliver_message()
                 if message is None:
                     return
-
-                data = ""
-                if message.data is not None:
-                    data = message.data.decode("utf-8")
-
-                _LOGGER.info(f"Message Received From Ecovacs - Topic: {message.topic} - Message: {data}")
-                topic = message.topic
-                ttopic = topic.split("/")
-                if ttopic[1] == "p2p":
-                    if ttopic[3] == "proxyhelper":
-                        _LOGGER.error(f'"proxyhelper" was sender - INVALID!! Topic: {topic}')
-                        continue
-
-                    self.request_mapper[ttopic[10]] = ttopic[3]
-                    ttopic[3] = "proxyhelper"
-                    topic = "/".join(ttopic)
-                    _LOGGER.info(f"Converted Topic From {message.topic} TO {topic}")
-
-                _LOGGER.info(f"Proxy Forward Message to Robot - Topic: {topic} - Message: {data}")
-
-                await bumper_isc.mqtt_helperbot.publish(topic, data)
+                await _forward_to_robot(message, self.request_mapper, self._to_robot)
             except Exception:
                 _LOGGER.exception("An error occurred during handling a message")
 
@@ -96,13 +207,22 @@ class ProxyClient:
 
     async def disconnect(self) -> None:
         """Disconnect."""
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        await self._to_robot.close()
+        await self._to_ecovacs.close()
         with contextlib.suppress(AttributeError):
             await self._client.disconnect()
 
-    async def publish(self, topic: str, message: bytes, qos: int | None = None) -> None:
+    async def publish(self, topic: str, message: bytes | bytearray, qos: int | None = None) -> None:
         """Publish message."""
         await self._client.publish(topic, message, qos)
 
+    async def forward(self, topic: str, message: bytes | bytearray, qos: int | None = None) -> bool:
+        """Queue a message for the Ecovacs servers, get False if it was dropped because the queue stayed full."""
+        return await self._to_ecovacs.put(topic, message, qos)
+
 
 class _NoCertVerifyClient(MQTTClient):  # type:ignore[misc]
     # pylint: disable=all
@@ -217,3 +337,270 @@ class _NoCertVerifyClient(MQTTClient):  # type:ignore[misc]
             self.session.transitions.disconnect()
             # raise ConnectError(e)
             raise
+
+
+class ProxyConnection:
+    """Upstream connection to the Ecovacs servers, which carries the topic subscriptions of several bots.
+
+    A supervised reader forwards the received messages and, when the connection is lost, reconnects with exponential
+    backoff and subscribes again to the topics of all attached bots.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        uri: str,
+        request_mapper: MutableMapping[str, str],
+        config: dict[str, Any] | None = None,
+        client_factory: Callable[..., MQTTClient] = _NoCertVerifyClient,
+    ) -> None:
+        """Proxy connection init, the connection is opened by `start`."""
+        self.client_id = client_id
+        self.reconnects = 0
+        self._uri = uri
+        self._request_mapper = request_mapper
+        self._config = {**(config or {}), "auto_reconnect": False}
+        self._client_factory = client_factory
+        self._client: MQTTClient | None = None
+        self._client_topics: dict[str, dict[str, int]] = {}
+        self._supervisor: asyncio.Task[None] | None = None
+        self._to_robot = ForwardQueue("to_robot", _publish_to_robot)
+
+    @property
+    def client_ids(self) -> set[str]:
+        """Get the ids of the attached bots."""
+        return set(self._client_topics)
+
+    @property
+    def topics(self) -> dict[str, int]:
+        """Get the subscribed topics of all attached bots with the highest requested qos."""
+        topics: dict[str, int] = {}
+        for client_topics in self._client_topics.values():
+            for topic, qos in client_topics.items():
+                topics[topic] = max(qos, topics.get(topic, qos))
+        return topics
+
+    async def start(self) -> None:
+        """Connect and start the supervised reader, raises if the connection can not be opened."""
+        await self._connect()
+        self._supervisor = asyncio.create_task(self._supervise(), name=f"mqtt_proxy_connection_{self.client_id}")
+        self._supervisor.add_done_callback(_log_reader_exit)
+
+    def attach(self, client_id: str) -> None:
+        """Attach a bot to the connection."""
+        self._client_topics.setdefault(client_id, {})
+
+    async def detach(self, client_id: str) -> int:
+        """Detach a bot and unsubscribe the topics no other bot uses, get the number of still attached bots."""
+        client_topics = self._client_topics.pop(client_id, {})
+        topics = self.topics
+        if (unused := [topic for topic in client_topics if topic not in topics]) and self._client is not None:
+            try:
+                await self._client.unsubscribe(unused)
+            except Exception as e:
+                _LOGGER.warning(f"Proxy connection {self.client_id} :: Unsubscribe failed :: {e}")
+        return len(self._client_topics)
+
+    async def subscribe(self, client_id: str, topic: str, qos: int) -> None:
+        """Subscribe to a topic for a bot, already subscribed topics are not subscribed again."""
+        subscribed_qos = self.topics.get(topic)
+        self._client_topics.setdefault(client_id, {})[topic] = qos
+        if self._client is not None and (subscribed_qos is None or subscribed_qos < qos):
+            try:
+                await self._client.subscribe([(topic, qos)])
+            except Exception as e:
+                _LOGGER.warning(f"Proxy connection {self.client_id} :: Subscribe failed, retried on reconnect :: {e}")
+
+    async def publish(self, topic: str, message: bytes | bytearray, qos: int | None = None) -> None:
+        """Publish message."""
+        if self._client is None:
+            msg = f"Proxy connection {self.client_id} is not connected"
+            raise ConnectionError(msg)
+        await self._client.publish(topic, message, qos)
+
+    async def close(self) -> None:
+        """Stop the reader and disconnect."""
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._supervisor
+            self._supervisor = None
+        await self._to_robot.close()
+        await self._disconnect_client()
+
+    async def _connect(self) -> None:
+        client = self._client_factory(client_id=self.client_id, config=self._config)
+        await client.connect(self._uri)
+        self._client = client
+        if topics := self.topics:
+            await client.subscribe(list(topics.items()))
+
+    async def _disconnect_client(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            with contextlib.suppress(Exception):
+                await client.disconnect()
+
+    async def _supervise(self) -> None:
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            await self._read_messages()
+            _LOGGER.warning(f"Proxy connection {self.client_id} lost, reconnecting")
+            await self._disconnect_client()
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                except Exception as e:
+                    _LOGGER.warning(f"Proxy connection {self.client_id} :: Reconnect failed, retry in {delay}s :: {e}")
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                else:
+                    self.reconnects += 1
+                    delay = RECONNECT_MIN_DELAY
+                    break
+
+    async def _read_messages(self) -> None:
+        """Forward messages to the robots until the connection is lost."""
+        while (client := self._client) is not None:
+            try:
+                message = await client.deliver_message()
+            except asyncio.CancelledError:
+                if (task := asyncio.current_task()) is not None and task.cancelling():
+                    raise
+                return  # delivery is cancelled by the client when the connection is closed
+            except Exception:
+                _LOGGER.debug(f"Proxy connection {self.client_id} :: Delivery failed", exc_info=True)
+                return
+            if message is None:
+                return
+            try:
+                await _forward_to_robot(message, self._request_mapper, self._to_robot)
+            except Exception:
+                _LOGGER.exception("An error occurred during handling a message")
+
+
+class ProxyPool:
+    """Upstream connections to the Ecovacs servers, shared by the proxied bots with the same credentials.
+
+    A bot is attached to the connection of its credentials with the fewest bots, a new connection is opened when all
+    carry `clients_per_connection` bots. All connections share one bounded map of request ids to the original senders.
+    """
+
+    def __init__(
+        self,
+        clients_per_connection: int = bumper_isc.PROXY_MQTT_CLIENTS_PER_CONNECTION,
+        request_map_size: int = bumper_isc.PROXY_MQTT_REQUEST_MAP_SIZE,
+        timeout: float = 180,
+        client_factory: Callable[..., MQTTClient] = _NoCertVerifyClient,
+    ) -> None:
+        """Proxy pool init."""
+        self.request_mapper: MutableMapping[str, str] = TTLCache(maxsize=request_map_size, ttl=timeout * 1.1)
+        self._clients_per_connection = clients_per_connection
+        self._client_factory = client_factory
+        self._connections: dict[tuple[str, int, str, str], list[ProxyConnection]] = {}
+        self._locks: defaultdict[tuple[str, int, str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Every connection gets its own client id, as the broker drops a session when another one connects with its id
+        self._connection_ids = itertools.count(1)
+
+    async def attach(
+        self,
+        client_id: str,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        config: dict[str, Any] | None = None,
+    ) -> ProxyConnection:
+        """Attach a bot to a connection with its credentials, opened if none has capacity left."""
+        key = (host, port, username, password)
+        async with self._locks[key]:
+            connections = self._connections.get(key, [])
+            if candidates := [conn for conn in connections if len(conn.client_ids) < self._clients_per_connection]:
+                connection = min(candidates, key=lambda conn: len(conn.client_ids))
+            else:
+                connection = ProxyConnection(
+                    f"{client_id}-pool{next(self._connection_ids)}",
+                    f"mqtts://{username}:{password}@{host}:{port}",
+                    self.request_mapper,
+                    config,
+                    self._client_factory,
+                )
+                await connection.start()
+                self._connections[key] = [*connections, connection]
+            connection.attach(client_id)
+            return connection
+
+    async def detach(self, client_id: str, connection: ProxyConnection) -> None:
+        """Detach a bot, the connection is closed when it was the last bot."""
+        if await connection.detach(client_id) > 0:
+            return
+        for key, connections in list(self._connections.items()):
+            if connection in connections:
+                connections.remove(connection)
+                if not connections:
+                    del self._connections[key]
+                    self._locks.pop(key, None)
+        await connection.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Get the number of connections, attached bots, reconnects and mapped requests."""
+        connections = [conn for conns in self._connections.values() for conn in conns]
+        return {
+            "connections": len(connections),
+            "clients": sum(len(conn.client_ids) for conn in connections),
+            "topics": sum(len(conn.topics) for conn in connections),
+            "reconnects": sum(conn.reconnects for conn in connections),
+            "request_map": len(self.request_mapper),
+        }
+
+
+class MultiplexedProxyClient:
+    """Proxy client of a bot, which shares the upstream connection with other bots through the proxy pool."""
+
+    def __init__(
+        self,
+        client_id: str,
+        host: str,
+        port: int = bumper_isc.WEB_SERVER_TLS_LISTEN_PORT,
+        config: dict[str, Any] | None = None,
+        pool: ProxyPool | None = None,
+    ) -> None:
+        """Multiplexed proxy client init."""
+        self._pool = pool if pool is not None else proxy_pool
+        self.request_mapper = self._pool.request_mapper
+        self._client_id = client_id
+        self._host = host
+        self._port = port
+        self._config = config
+        self._connection: ProxyConnection | None = None
+        self._to_ecovacs = ForwardQueue("to_ecovacs", self.publish, put_timeout=bumper_isc.PROXY_MQTT_QUEUE_TIMEOUT)
+
+    async def connect(self, username: str, password: str) -> None:
+        """Connect."""
+        self._connection = await self._pool.attach(self._client_id, self._host, self._port, username, password, self._config)
+
+    async def subscribe(self, topic: str, qos: Any = QOS_0) -> None:
+        """Subscribe to topic."""
+        if self._connection is not None:
+            await self._connection.subscribe(self._client_id, topic, qos)
+
+    async def disconnect(self) -> None:
+        """Disconnect."""
+        await self._to_ecovacs.close()
+        if self._connection is not None:
+            await self._pool.detach(self._client_id, self._connection)
+            self._connection = None
+
+    async def publish(self, topic: str, message: bytes | bytearray, qos: int | None = None) -> None:
+        """Publish message."""
+        if self._connection is None:
+            msg = "Proxy client is not connected"
+            raise ConnectionError(msg)
+        await self._connection.publish(topic, message, qos)
+
+    async def forward(self, topic: str, message: bytes | bytearray, qos: int | None = None) -> bool:
+        """Queue a message for the Ecovacs servers, get False if it was dropped because the queue stayed full."""
+        return await self._to_ecovacs.put(topic, message, qos)
+
+
+proxy_pool: ProxyPool = ProxyPool()
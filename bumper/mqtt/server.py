@@ -5,6 +5,7 @@ import base64
 import dataclasses
 import logging
 from pathlib import Path
+import ssl
 from typing import Any, Literal
 
 from amqtt.broker import Broker, BrokerContext
@@ -14,7 +15,9 @@ from passlib.apps import custom_app_context as pwd_context
 from bumper.db import bot_repo, client_repo, token_repo
 from bumper.mqtt import helper_bot, proxy as mqtt_proxy
 from bumper.utils import utils
+from bumper.utils.readiness import Readiness
 from bumper.utils.settings import config as bumper_isc
+from bumper.utils.tls_context import tls_provider
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER_MESSAGES = logging.getLogger(f"{__name__}.messages")
@@ -27,6 +30,11 @@ def _log__helperbot_message(custom_log_message: str, topic: str, data: str) -> N
     _LOGGER_MESSAGES.debug(f"{custom_log_message} :: Topic: {topic} :: Message: {data}")
 
 
+def _payload_text(payload: bytes | bytearray) -> str:
+    """Decode a payload for logging."""
+    return payload.decode("utf-8", errors="replace")
+
+
 @dataclasses.dataclass(frozen=True)
 class MQTTBinding:
     """Webserver binding."""
@@ -81,7 +89,10 @@ class MQTTServer:
                 },
             }
 
-            self._broker = Broker(config=config)
+            self._broker = _BumperBroker(config=config)
+            # Serializes start and shutdown, so a call waits for a running one to finish
+            self._lifecycle_lock = asyncio.Lock()
+            self.readiness = Readiness()
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder(info="during initialize"))
             raise
@@ -96,58 +107,50 @@ class MQTTServer:
         """Get sessions."""
         return [session for (session, _) in self._broker.sessions.values()]
 
+    def is_bot_connected(self, did: str) -> bool:
+        """Return True if the bot has a connected MQTT session, its client id is <DID>@<CLASSID>/<RESOURCE>."""
+        prefix = f"{did}@"
+        return any(
+            client_id.startswith(prefix) and session.transitions.state == "connected"
+            for client_id, (session, _) in self._broker.sessions.items()
+        )
+
     async def start(self) -> None:
-        """Start MQTT server."""
+        """Start MQTT server, waits for a running start or shutdown to finish first."""
         try:
-            if self.state not in ["stopping", "starting", "started"]:
+            async with self._lifecycle_lock:
+                if self.state == "started":
+                    _LOGGER.info("MQTT Server is already running. Stop it first for a clean restart!")
+                    return
                 for binding in self._bindings:
                     _LOGGER.info(f"Starting MQTT Server at {binding.host}:{binding.port}")
                 await self._broker.start()
-            elif self.state == "stopping":
-                _LOGGER.warning("MQTT Server is stopping. Waiting for it to stop before restarting...")
-                await self.wait_for_state_change(["stopping"])
-                await self._broker.start()
-            else:
-                _LOGGER.info("MQTT Server is already running. Stop it first for a clean restart!")
+                self.readiness.set_ready()
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder(info="during startup"))
             raise
 
     async def shutdown(self) -> None:
-        """Shutdown the MQTT server."""
+        """Shutdown the MQTT server, waits for a running start or shutdown to finish first."""
         try:
-            if self.state == "started":
-                _LOGGER.info("Shutting down MQTT server...")
-                await self._broker.shutdown()
-                _LOGGER_BROKER.info("Broker closed")
-            elif self.state in ["starting"]:
-                _LOGGER.warning(f"MQTT server is in '{self.state}' state. Waiting for it to stabilize...")
-                await self.wait_for_state_change(["starting"])
+            async with self._lifecycle_lock:
                 if self.state == "started":
+                    _LOGGER.info("Shutting down MQTT server...")
                     await self._broker.shutdown()
-            else:
-                _LOGGER.warning(f"MQTT server is not in a valid state for shutdown. Current state: {self.state}")
+                    self.readiness.set_stopped()
+                    _LOGGER_BROKER.info("Broker closed")
+                else:
+                    _LOGGER.warning(f"MQTT server is not in a valid state for shutdown. Current state: {self.state}")
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder(info="during shutdown"))
             raise
 
-    async def wait_for_state_change(
-        self,
-        target_states: list[str],
-        interval: float = 1.0,
-        max_wait: int = 10,
-        reverse: bool = False,
-    ) -> None:
-        """Wait for a small interval if the state is in target states."""
-        timeout_count = 0
-        while timeout_count < max_wait:
-            _LOGGER.debug("Waiting for MQTT server state change...")
-            if not reverse and self.state not in target_states:
-                return
-            if reverse and self.state in target_states:
-                return
-            timeout_count += 1
-            await asyncio.sleep(interval)
+
+class _BumperBroker(Broker):  # type:ignore[misc]
+    """Broker, which uses the shared TLS context for its listeners instead of loading the certificates per listener."""
+
+    def _create_ssl_context(self, _: dict[str, Any]) -> ssl.SSLContext:
+        return tls_provider.server_context(ssl.CERT_OPTIONAL)
 
 
 class BumperMQTTServerPlugin:
@@ -155,7 +158,7 @@ class BumperMQTTServerPlugin:
 
     def __init__(self, context: BrokerContext) -> None:
         """MQTT Server plugin init."""
-        self._proxy_clients: dict[str, mqtt_proxy.ProxyClient] = {}
+        self._proxy_clients: dict[str, mqtt_proxy.ProxyClient | mqtt_proxy.MultiplexedProxyClient] = {}
         self.context = context
         try:
             if self.context.config is not None:
@@ -234,7 +237,11 @@ class BumperMQTTServerPlugin:
                 if bumper_isc.BUMPER_PROXY_MQTT and username is not None and password is not None:
                     mqtt_server = await utils.resolve(bumper_isc.PROXY_MQTT_DOMAIN)
                     _LOGGER_PROXY.info(f"MQTT Proxy Mode :: Using server {mqtt_server} for client {client_id}")
-                    proxy = mqtt_proxy.ProxyClient(client_id, mqtt_server, config={"check_hostname": False})
+                    proxy: mqtt_proxy.ProxyClient | mqtt_proxy.MultiplexedProxyClient
+                    if bumper_isc.BUMPER_PROXY_MQTT_MULTIPLEX:
+                        proxy = mqtt_proxy.MultiplexedProxyClient(client_id, mqtt_server, config={"check_hostname": False})
+                    else:
+                        proxy = mqtt_proxy.ProxyClient(client_id, mqtt_server, config={"check_hostname": False})
                     self._proxy_clients[client_id] = proxy
                     await proxy.connect(username, password)
 
@@ -276,59 +283,56 @@ class BumperMQTTServerPlugin:
         return users
 
     async def on_broker_message_received(self, message: IncomingApplicationMessage, client_id: str) -> None:
-        """On message received."""
+        """On message received, in proxy mode the payload is forwarded as is and only decoded for logging."""
         try:
             topic = message.topic
             topic_split = topic.split("/")
-            data_decoded = (
-                message.data.decode("utf-8", errors="replace") if isinstance(message.data, bytes | bytearray) else message.data
-            )
+            payload: bytes | bytearray = message.data if message.data is not None else b""
 
             if len(topic_split) < 7:
                 _LOGGER_PROXY.warning(f"Received message with invalid topic: {topic}")
                 return
 
-            if topic_split[6] == "helperbot":
-                # Response to command
-                _log__helperbot_message("Received Response", topic, data_decoded)
-            elif topic_split[3] == "helperbot":
-                # Helperbot sending command
-                _log__helperbot_message("Send Command", topic, data_decoded)
-            elif topic_split[1] == "atr":
-                # Broadcast message received on atr
-                _log__helperbot_message("Received Broadcast", topic, data_decoded)
-            else:
-                _log__helperbot_message("Received Message", topic, data_decoded)
+            if _LOGGER_MESSAGES.isEnabledFor(logging.DEBUG):
+                data_decoded = _payload_text(payload)
+                if topic_split[6] == "helperbot":
+                    # Response to command
+                    _log__helperbot_message("Received Response", topic, data_decoded)
+                elif topic_split[3] == "helperbot":
+                    # Helperbot sending command
+                    _log__helperbot_message("Send Command", topic, data_decoded)
+                elif topic_split[1] == "atr":
+                    # Broadcast message received on atr
+                    _log__helperbot_message("Received Broadcast", topic, data_decoded)
+                else:
+                    _log__helperbot_message("Received Message", topic, data_decoded)
 
-            if bumper_isc.BUMPER_PROXY_MQTT and client_id in self._proxy_clients:
+            if bumper_isc.BUMPER_PROXY_MQTT and (proxy := self._proxy_clients.get(client_id)) is not None:
                 if topic_split[3] == "proxyhelper":
                     # if from proxyhelper, don't send back to ecovacs...yet
                     return
 
+                ttopic_join = topic
                 if topic_split[6] == "proxyhelper":
                     ttopic = topic.split("/")
-                    ttopic[6] = self._proxy_clients[client_id].request_mapper.pop(ttopic[10], "")
+                    ttopic[6] = proxy.request_mapper.pop(ttopic[10], "")
                     if ttopic[6] == "":
                         _LOGGER_PROXY.warning(
                             "Request mapper is missing entry, probably request took to"
                             f" long... Client_id: {client_id} :: Request_id: {ttopic[10]}",
                         )
                         return
-
                     ttopic_join = "/".join(ttopic)
-                    _LOGGER_PROXY.info(f"Bot Message Converted Topic From {topic} TO {ttopic_join} with message: {data_decoded}")
-                else:
-                    ttopic_join = topic
-                    _LOGGER_PROXY.info(f"Bot Message From {ttopic_join} with message: {data_decoded}")
-
-                try:
-                    # Send back to ecovacs
-                    _LOGGER_PROXY.info(f"Proxy Forward Message to Ecovacs :: Topic: {ttopic_join} :: Message: {data_decoded}")
-                    await self._proxy_clients[client_id].publish(ttopic_join, data_decoded.encode(), message.qos)
-                except Exception as e:
-                    _LOGGER_PROXY.error(f"Forwarding to Ecovacs :: Exception :: {e}", exc_info=True)
+
+                if _LOGGER_PROXY.isEnabledFor(logging.INFO):
+                    _LOGGER_PROXY.info(
+                        f"Proxy Forward Message to Ecovacs :: Topic: {ttopic_join} :: Original Topic: {topic}"
+                        f" :: Message: {_payload_text(payload)}",
+                    )
+                # Send back to ecovacs, waits while the queue to ecovacs is full
+                await proxy.forward(ttopic_join, payload, message.qos)
         except Exception as e:
-            _LOGGER_PROXY.error(f"Received message :: Exception :: {message.data} :: {e}", exc_info=True)
+            _LOGGER_PROXY.error(f"Received message :: Exception :: {message.data!r} :: {e}", exc_info=True)
 
     async def on_broker_client_subscribed(self, client_id: str, topic: str, qos: Literal[0, 1, 2]) -> None:
         """Is called when a client subscribes on the broker."""
@@ -341,6 +345,12 @@ class BumperMQTTServerPlugin:
             elif client_id != helper_bot.HELPER_BOT_CLIENT_ID:
                 _LOGGER_PROXY.warning(f"MQTT Proxy Mode :: No proxy client found! :: Client: {client_id} :: Topic: {topic}")
 
+        # Commands kept for an offline bot are sent once it subscribed to its commands again
+        if topic.startswith("iot/p2p/") and bumper_isc.mqtt_helperbot is not None:
+            result = self._client_id_split_helper(client_id)
+            if result is not None and result[3] == "bot":
+                bumper_isc.mqtt_helperbot.on_bot_subscribed(result[0])
+
     async def on_broker_client_connected(self, client_id: str) -> None:
         """On client connected."""
         self._set_client_connected(client_id, True)
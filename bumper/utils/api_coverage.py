@@ -0,0 +1,95 @@
+"""Implemented API coverage module."""
+
+from collections import Counter
+from collections.abc import Iterable
+import logging
+from pathlib import Path
+import re
+import threading
+from typing import Any
+
+from bumper.utils import json_codec
+
+_LOGGER = logging.getLogger(__name__)
+
+IMPLEMENTED_APIS_FILE = Path(__file__).parent / "utils_implemented_apis.json"
+# Maximum number of distinct unknown paths counted, further paths are counted together
+MAX_UNKNOWN_PATHS = 1000
+
+
+class ApiCoverage:
+    """Match request paths against the implemented API patterns and count the hits.
+
+    All patterns are compiled once into a single alternation, each pattern in its own named group,
+    so one search tells whether and which pattern matched.
+    """
+
+    def __init__(self, patterns: Iterable[str], max_unknown_paths: int = MAX_UNKNOWN_PATHS) -> None:
+        """Compile the patterns into one regex."""
+        self._patterns: list[str] = list(patterns)
+        self._regex: re.Pattern[str] | None = (
+            re.compile("|".join(f"(?P<p{index}>{pattern})" for index, pattern in enumerate(self._patterns)))
+            if self._patterns
+            else None
+        )
+        self._max_unknown_paths = max_unknown_paths
+        self._lock = threading.Lock()
+        self._implemented_hits: Counter[str] = Counter()
+        self._unknown_hits: Counter[str] = Counter()
+        self._unknown_overflow: int = 0
+
+    @classmethod
+    def from_file(cls, path: Path = IMPLEMENTED_APIS_FILE) -> "ApiCoverage":
+        """Create the coverage from a json file with a list of patterns."""
+        patterns: list[str] = []
+        try:
+            with path.open(encoding="utf-8") as file:
+                data = json_codec.load(file)
+                if isinstance(data, list):
+                    patterns = [str(pattern) for pattern in data]
+        except Exception:
+            _LOGGER.warning(f"Could not find or read: '{path.name}'")
+        return cls(patterns)
+
+    def match(self, url: str | None) -> str | None:
+        """Get the implemented pattern matching the url."""
+        if not url or self._regex is None:
+            return None
+        if (match := self._regex.search(url)) is None or match.lastgroup is None:
+            return None
+        return self._patterns[int(match.lastgroup[1:])]
+
+    def check(self, url: str | None) -> bool:
+        """Check if the url is implemented and count the hit."""
+        if not url:
+            return False
+        pattern = self.match(url)
+        with self._lock:
+            if pattern is not None:
+                self._implemented_hits[pattern] += 1
+            elif url in self._unknown_hits or len(self._unknown_hits) < self._max_unknown_paths:
+                self._unknown_hits[url] += 1
+            else:
+                self._unknown_overflow += 1
+        return pattern is not None
+
+    def stats(self) -> dict[str, Any]:
+        """Get the hit counters, most requested first."""
+        with self._lock:
+            return {
+                "patterns": len(self._patterns),
+                "implemented": dict(self._implemented_hits.most_common()),
+                "unused": [pattern for pattern in self._patterns if pattern not in self._implemented_hits],
+                "unknown": dict(self._unknown_hits.most_common()),
+                "unknown_overflow": self._unknown_overflow,
+            }
+
+    def reset(self) -> None:
+        """Reset all hit counters."""
+        with self._lock:
+            self._implemented_hits.clear()
+            self._unknown_hits.clear()
+            self._unknown_overflow = 0
+
+
+api_coverage: ApiCoverage = ApiCoverage.from_file()
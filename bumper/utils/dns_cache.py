@@ -0,0 +1,166 @@
+"""Cached DNS resolver module."""
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import logging
+import socket
+import time
+from typing import Any
+
+import aiodns
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from bumper.utils.settings import config as bumper_isc
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bounds for the TTL of resolved records, so a TTL of 0 does not disable the cache and long TTLs still get refreshed
+MIN_TTL = 5.0
+MAX_TTL = 3600.0
+
+
+@dataclass(frozen=True, slots=True)
+class _DnsEntry:
+    """Result of a lookup, without addresses if it failed."""
+
+    addresses: tuple[str, ...]
+    expires: float
+    stale_until: float
+    error: str | None = None
+
+
+class CachedResolver:
+    """Resolve host names with the configured nameservers and cache the results.
+
+    Addresses are cached for the TTL of their records and failed lookups for the negative TTL.
+    Concurrent lookups of the same name share one query, and an expired address is still served for the stale TTL
+    while it is refreshed in the background, so a reconnect storm causes one lookup.
+    """
+
+    def __init__(
+        self,
+        nameservers: list[str] = bumper_isc.PROXY_NAMESERVER,
+        negative_ttl: float = bumper_isc.PROXY_DNS_NEGATIVE_TTL,
+        stale_ttl: float = bumper_isc.PROXY_DNS_STALE_TTL,
+    ) -> None:
+        """Initialize the resolver, the nameservers are queried on first use."""
+        self._nameservers = nameservers
+        self._negative_ttl = negative_ttl
+        self._stale_ttl = stale_ttl
+        self._cache: dict[str, _DnsEntry] = {}
+        self._inflight: dict[str, asyncio.Task[_DnsEntry]] = {}
+        self._resolver: aiodns.DNSResolver | None = None
+        self._resolver_loop: asyncio.AbstractEventLoop | None = None
+        self._counters: Counter[str] = Counter()
+
+    async def resolve(self, host: str) -> str:
+        """Resolve the host to its first address, raises OSError if the lookup failed."""
+        return (await self.resolve_all(host))[0]
+
+    async def resolve_all(self, host: str) -> tuple[str, ...]:
+        """Resolve the host to all its addresses, raises OSError if the lookup failed."""
+        now = time.monotonic()
+        entry = self._cache.get(host)
+        if entry is not None and now < entry.expires:
+            self._counters["negative_hits" if entry.error is not None else "hits"] += 1
+        elif entry is not None and now < entry.stale_until:
+            self._counters["stale_hits"] += 1
+            self._lookup(host)
+        else:
+            self._counters["misses"] += 1
+            entry = await asyncio.shield(self._lookup(host))
+
+        if entry.error is not None:
+            msg = f"DNS lookup of {host} failed: {entry.error}"
+            raise OSError(msg)
+        return entry.addresses
+
+    def stats(self) -> dict[str, Any]:
+        """Get the cache counters."""
+        return {
+            "entries": len(self._cache),
+            "hits": self._counters["hits"],
+            "stale_hits": self._counters["stale_hits"],
+            "negative_hits": self._counters["negative_hits"],
+            "misses": self._counters["misses"],
+            "lookups": self._counters["lookups"],
+            "coalesced": self._counters["coalesced"],
+            "failures": self._counters["failures"],
+        }
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._cache.clear()
+
+    def _lookup(self, host: str) -> asyncio.Task[_DnsEntry]:
+        """Get the running lookup of the host or start a new one."""
+        if (task := self._inflight.get(host)) is not None:
+            self._counters["coalesced"] += 1
+            return task
+        task = asyncio.create_task(self._refresh(host), name=f"dns_lookup_{host}")
+        self._inflight[host] = task
+        return task
+
+    async def _refresh(self, host: str) -> _DnsEntry:
+        self._counters["lookups"] += 1
+        try:
+            entry = await self._lookup_entry(host)
+        finally:
+            self._inflight.pop(host, None)
+        self._cache[host] = entry
+        return entry
+
+    async def _lookup_entry(self, host: str) -> _DnsEntry:
+        try:
+            addresses, ttl = await self._query(host)
+            now = time.monotonic()
+            expires = now + min(max(ttl, MIN_TTL), MAX_TTL)
+            entry = _DnsEntry(addresses, expires, expires + self._stale_ttl)
+        except Exception as e:
+            self._counters["failures"] += 1
+            _LOGGER.warning(f"DNS lookup of {host} failed :: {e}")
+            now = time.monotonic()
+            expires = now + self._negative_ttl
+            if (stale := self._cache.get(host)) is not None and stale.error is None and now < stale.stale_until:
+                # keep serving the stale addresses, retried after the negative TTL
+                entry = _DnsEntry(stale.addresses, min(expires, stale.stale_until), stale.stale_until)
+            else:
+                entry = _DnsEntry((), expires, expires, str(e))
+        return entry
+
+    async def _query(self, host: str) -> tuple[tuple[str, ...], float]:
+        """Query the A records of the host, get the addresses and the lowest TTL."""
+        loop = asyncio.get_running_loop()
+        if self._resolver is None or self._resolver_loop is not loop:
+            self._resolver = aiodns.DNSResolver(nameservers=self._nameservers, loop=loop)
+            self._resolver_loop = loop
+        records = await self._resolver.query(host, "A")
+        if not records:
+            msg = "no records"
+            raise OSError(msg)
+        return tuple(record.host for record in records), float(min(record.ttl for record in records))
+
+
+class AiohttpCachedResolver(AbstractResolver):
+    """Resolver for aiohttp connectors, which looks up hosts through the shared cached resolver."""
+
+    def __init__(self, resolver: CachedResolver | None = None) -> None:
+        """Initialize with the resolver to use, the shared one by default."""
+        self._resolver = resolver if resolver is not None else dns_resolver
+
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET) -> list[ResolveResult]:
+        """Resolve the host to its IPv4 addresses, raises OSError if the lookup failed or for other families."""
+        if family not in {socket.AF_INET, socket.AF_UNSPEC}:
+            msg = f"DNS lookup of {host} failed: only IPv4 addresses are resolved"
+            raise OSError(msg)
+        return [
+            ResolveResult(hostname=host, host=address, port=port, family=socket.AF_INET, proto=0, flags=socket.AI_NUMERICHOST)
+            for address in await self._resolver.resolve_all(host)
+        ]
+
+    async def close(self) -> None:
+        """Keep the shared resolver and its cache."""
+
+
+dns_resolver: CachedResolver = CachedResolver()
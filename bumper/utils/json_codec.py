@@ -0,0 +1,76 @@
+"""JSON codec module.
+
+Encodes and decodes JSON with `orjson` when it is installed and with the stdlib `json` module otherwise.
+Both backends produce compact UTF-8 output, so the result does not depend on the installed backend.
+"""
+
+from collections.abc import Callable, Mapping
+import json
+from typing import IO, Any
+
+from aiohttp import web
+
+try:
+    import orjson  # type:ignore[import-not-found,unused-ignore]
+except ImportError:
+    orjson = None
+
+BACKEND: str = "orjson" if orjson is not None else "json"
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError is a subclass
+CONTENT_TYPE_JSON = "application/json"
+
+_ORJSON_OPTIONS: int = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _stdlib_dumps(obj: Any, default: Callable[[Any], Any] | None) -> str:
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumpb(obj: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+    """Encode an object to JSON bytes."""
+    if orjson is not None:
+        try:
+            result: bytes = orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass  # types orjson does not support, like integers above 64 bit
+        else:
+            return result
+    return _stdlib_dumps(obj, default).encode("utf-8")
+
+
+def dumps(obj: Any, default: Callable[[Any], Any] | None = None) -> str:
+    """Encode an object to a JSON string."""
+    if orjson is not None:
+        return dumpb(obj, default).decode("utf-8")
+    return _stdlib_dumps(obj, default)
+
+
+def loads(data: str | bytes | bytearray | memoryview) -> Any:
+    """Decode a JSON document, raises JSONDecodeError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def load(file: IO[str] | IO[bytes]) -> Any:
+    """Decode a JSON document from a file."""
+    return loads(file.read())
+
+
+def json_response(
+    data: Any = None,
+    *,
+    status: int = 200,
+    reason: str | None = None,
+    headers: Mapping[str, str] | None = None,
+    content_type: str = CONTENT_TYPE_JSON,
+) -> web.Response:
+    """Create a response with the data encoded straight to bytes, without an intermediate string."""
+    return web.Response(
+        body=dumpb(data),
+        status=status,
+        reason=reason,
+        headers=headers,
+        content_type=content_type,
+        charset="utf-8",
+    )
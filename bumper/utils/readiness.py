@@ -0,0 +1,41 @@
+"""Service readiness module."""
+
+import asyncio
+
+
+class Readiness:
+    """Ready and stopped events of a service, so its start and shutdown can be awaited instead of polled."""
+
+    def __init__(self) -> None:
+        """Initialize as stopped."""
+        self._ready = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._stopped.set()
+
+    @property
+    def is_ready(self) -> bool:
+        """Return True if the service is ready."""
+        return self._ready.is_set()
+
+    @property
+    def is_stopped(self) -> bool:
+        """Return True if the service is stopped."""
+        return self._stopped.is_set()
+
+    def set_ready(self) -> None:
+        """Mark the service as ready and wake up all waiters."""
+        self._stopped.clear()
+        self._ready.set()
+
+    def set_stopped(self) -> None:
+        """Mark the service as stopped and wake up all waiters."""
+        self._ready.clear()
+        self._stopped.set()
+
+    async def wait_ready(self) -> None:
+        """Wait until the service is ready, use `asyncio.timeout` to limit the wait."""
+        await self._ready.wait()
+
+    async def wait_stopped(self) -> None:
+        """Wait until the service is stopped, use `asyncio.timeout` to limit the wait."""
+        await self._stopped.wait()
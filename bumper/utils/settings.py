@@ -47,6 +47,7 @@ class Config:
 
     # Data Files
     db_file = str(Path(os.environ.get("DB_FILE") or data_dir / "bumper.db"))
+    route_manifest_file = Path(os.environ.get("WEB_ROUTE_MANIFEST_FILE") or data_dir / "web_routes.json")
 
     # Listeners
     bumper_listen: str | None = os.environ.get("BUMPER_LISTEN", socket.gethostbyname(socket.gethostname()))
@@ -61,6 +62,8 @@ class Config:
     DEBUG_LOGGING_XMPP_REQUEST_REFACTORED: bool = str_to_bool(os.environ.get("DEBUG_LOGGING_XMPP_REQUEST_REFACTOR")) or False
     DEBUG_LOGGING_XMPP_RESPONSE: bool = str_to_bool(os.environ.get("DEBUG_LOGGING_XMPP_RESPONSE")) or False
     DEBUG_LOGGING_SA_RESULT: bool = str_to_bool(os.environ.get("DEBUG_LOGGING_SA_RESULT")) or False
+    WEB_LOG_SAMPLE_RATE: float = float(os.environ.get("WEB_LOG_SAMPLE_RATE") or 1.0)
+    WEB_LOG_SLOW_REQUEST_MS: int = int(os.environ.get("WEB_LOG_SLOW_REQUEST_MS") or 1000)
 
     # Other
     USE_AUTH: bool = False
@@ -68,10 +71,25 @@ class Config:
     TOKEN_JWT_ALG: str = os.environ.get("TOKEN_JWT_ALG") or "ES256"
     BUMPER_PROXY_MQTT: bool = str_to_bool(os.environ.get("BUMPER_PROXY_MQTT")) or False
     BUMPER_PROXY_WEB: bool = str_to_bool(os.environ.get("BUMPER_PROXY_WEB")) or False
+    WEB_COMPRESSION_MIN_SIZE: int = int(os.environ.get("WEB_COMPRESSION_MIN_SIZE") or 1024)
+    WEB_ROUTE_MANIFEST: bool = str_to_bool(os.environ.get("WEB_ROUTE_MANIFEST") or True)
+    WEB_FLAT_ROUTES: bool = str_to_bool(os.environ.get("WEB_FLAT_ROUTES") or True)
+    SERVICE_START_TIMEOUT: float = float(os.environ.get("SERVICE_START_TIMEOUT") or 30.0)
 
     # Proxy
     PROXY_NAMESERVER: list[str] = ["1.1.1.1", "8.8.8.8"]
     PROXY_MQTT_DOMAIN: str = "mq-ww.ecouser.net"
+    BUMPER_PROXY_MQTT_MULTIPLEX: bool = str_to_bool(os.environ.get("BUMPER_PROXY_MQTT_MULTIPLEX")) or False
+    PROXY_MQTT_CLIENTS_PER_CONNECTION: int = int(os.environ.get("PROXY_MQTT_CLIENTS_PER_CONNECTION") or 16)
+    PROXY_MQTT_REQUEST_MAP_SIZE: int = int(os.environ.get("PROXY_MQTT_REQUEST_MAP_SIZE") or 4096)
+    PROXY_MQTT_QUEUE_SIZE: int = int(os.environ.get("PROXY_MQTT_QUEUE_SIZE") or 256)
+    PROXY_MQTT_QUEUE_TIMEOUT: float = float(os.environ.get("PROXY_MQTT_QUEUE_TIMEOUT") or 5.0)
+    PROXY_DNS_NEGATIVE_TTL: float = float(os.environ.get("PROXY_DNS_NEGATIVE_TTL") or 30.0)
+    PROXY_DNS_STALE_TTL: float = float(os.environ.get("PROXY_DNS_STALE_TTL") or 300.0)
+    PROXY_WEB_POOL_LIMIT: int = int(os.environ.get("PROXY_WEB_POOL_LIMIT") or 32)
+    PROXY_WEB_POOL_LIMIT_PER_HOST: int = int(os.environ.get("PROXY_WEB_POOL_LIMIT_PER_HOST") or 8)
+    PROXY_WEB_KEEPALIVE_TIMEOUT: float = float(os.environ.get("PROXY_WEB_KEEPALIVE_TIMEOUT") or 30.0)
+    PROXY_WEB_LOG_BODY_BYTES: int = int(os.environ.get("PROXY_WEB_LOG_BODY_BYTES") or 2048)
 
     # Domains
     DOMAIN_ALI: str = "globalapp-eu.oss-eu-central-1.aliyuncs.com"
@@ -98,6 +116,24 @@ class Config:
     XMPP_LISTEN_PORT: int = int(os.environ.get("XMPP_LISTEN_PORT") or 1223)
     XMPP_LISTEN_PORT_TLS: int = int(os.environ.get("XMPP_LISTEN_PORT_TLS") or 5223)
 
+    # XMPP connections (0 disables the limit)
+    XMPP_MAX_CONNECTIONS: int = int(os.environ.get("XMPP_MAX_CONNECTIONS") or 0)
+    XMPP_MAX_CONNECTIONS_PER_IP: int = int(os.environ.get("XMPP_MAX_CONNECTIONS_PER_IP") or 0)
+    XMPP_IDLE_TIMEOUT: int = int(os.environ.get("XMPP_IDLE_TIMEOUT") or 120)
+    XMPP_PING_INTERVAL: int = int(os.environ.get("XMPP_PING_INTERVAL") or 30)
+
+    # Helper bot commands in flight (0 disables the limit)
+    HELPERBOT_MAX_IN_FLIGHT: int = int(os.environ.get("HELPERBOT_MAX_IN_FLIGHT") or 256)
+    HELPERBOT_MAX_IN_FLIGHT_PER_BOT: int = int(os.environ.get("HELPERBOT_MAX_IN_FLIGHT_PER_BOT") or 16)
+    HELPERBOT_QUEUE_TIMEOUT: float = float(os.environ.get("HELPERBOT_QUEUE_TIMEOUT") or 5.0)
+    # Commands to offline bots, kept until the bot reconnects (a TTL of 0 fails them at once)
+    HELPERBOT_PENDING_TTL: float = float(os.environ.get("HELPERBOT_PENDING_TTL") or 0.0)
+    HELPERBOT_PENDING_SIZE: int = int(os.environ.get("HELPERBOT_PENDING_SIZE") or 16)
+    # Deadline of a command from its observed latency, between the minimum and the helper bot timeout
+    HELPERBOT_ADAPTIVE_TIMEOUT: bool = str_to_bool(os.environ.get("HELPERBOT_ADAPTIVE_TIMEOUT") or True)
+    HELPERBOT_TIMEOUT_MIN: float = float(os.environ.get("HELPERBOT_TIMEOUT_MIN") or 5.0)
+    HELPERBOT_TIMEOUT_FACTOR: float = float(os.environ.get("HELPERBOT_TIMEOUT_FACTOR") or 2.0)
+
     # Servers
     mqtt_server: "MQTTServer | None" = None
     mqtt_helperbot: "MQTTHelperBot | None" = None
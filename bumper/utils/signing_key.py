@@ -0,0 +1,129 @@
+"""JWT signing key module."""
+
+import asyncio
+import logging
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+from cachetools import TTLCache
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+import jwt
+
+from bumper.utils.settings import config as bumper_isc
+
+_LOGGER = logging.getLogger(__name__)
+
+# Minimum seconds between two checks of the key file
+RELOAD_CHECK_INTERVAL = 5.0
+VERIFIED_TOKEN_CACHE_SIZE = 256
+VERIFIED_TOKEN_CACHE_TTL = 300.0
+
+type SigningKey = ec.EllipticCurvePrivateKey | rsa.RSAPrivateKey | ed25519.Ed25519PrivateKey | ed448.Ed448PrivateKey
+type VerifyingKey = ec.EllipticCurvePublicKey | rsa.RSAPublicKey | ed25519.Ed25519PublicKey | ed448.Ed448PublicKey
+
+
+class SigningKeyManager:
+    """Keep the parsed JWT signing key in memory, reloaded when the key file changes.
+
+    Tokens are signed in a worker thread, so the signature does not block the event loop, and verified tokens are
+    cached, as apps send the same bearer token with every request.
+    """
+
+    def __init__(
+        self,
+        reload_check_interval: float = RELOAD_CHECK_INTERVAL,
+        cache_size: int = VERIFIED_TOKEN_CACHE_SIZE,
+        cache_ttl: float = VERIFIED_TOKEN_CACHE_TTL,
+    ) -> None:
+        """Signing key manager init."""
+        self._reload_check_interval = reload_check_interval
+        self._lock = threading.Lock()
+        self._keys: tuple[SigningKey, VerifyingKey] | None = None
+        self._signature: tuple[int, int] | None = None
+        self._last_check: float = 0.0
+        self._verified: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def keys(self) -> tuple[SigningKey, VerifyingKey]:
+        """Get the private and public key, loaded from the key file on first use or after it changed."""
+        with self._lock:
+            self._check_reload()
+            if self._keys is None:
+                private_key = self._load_key()
+                self._keys = (private_key, private_key.public_key())
+            return self._keys
+
+    async def sign(self, payload: dict[str, Any], algorithm: str, headers: dict[str, Any] | None = None) -> str:
+        """Sign the payload as JWT in a worker thread."""
+        return await asyncio.to_thread(self._sign, payload, algorithm, headers)
+
+    def verify(self, token: str, algorithm: str) -> dict[str, Any] | None:
+        """Get the payload of a token signed with the current key, None if invalid.
+
+        The expiry is not checked, as access tokens are issued already expired. The payload is shared and must not
+        be modified.
+        """
+        public_key = self.keys()[1]  # drops the verified tokens, when the key changed
+        with self._lock:
+            if (cached := self._verified.get(token)) is not None:
+                return cached
+
+        try:
+            payload: dict[str, Any] = jwt.decode(token, public_key, algorithms=[algorithm], options={"verify_exp": False})
+        except jwt.InvalidTokenError:
+            _LOGGER.debug("Token could not be verified")
+            return None
+
+        with self._lock:
+            self._verified[token] = payload
+        return payload
+
+    def invalidate(self) -> None:
+        """Drop the loaded key and the verified tokens, the key will be loaded again on next use."""
+        with self._lock:
+            self._keys = None
+            self._signature = None
+            self._last_check = 0.0
+            self._verified.clear()
+
+    def _sign(self, payload: dict[str, Any], algorithm: str, headers: dict[str, Any] | None) -> str:
+        return jwt.encode(payload, self.keys()[0], algorithm=algorithm, headers=headers)
+
+    def _check_reload(self) -> None:
+        """Drop the loaded key and the verified tokens when the key file changed."""
+        now = time.monotonic()
+        if self._keys is not None and now - self._last_check < self._reload_check_interval:
+            return
+        self._last_check = now
+
+        signature = self._file_signature()
+        if self._signature is not None and signature != self._signature and self._keys is not None:
+            _LOGGER.info("Signing key file changed, reloading key")
+            self._keys = None
+            self._verified.clear()
+        self._signature = signature
+
+    @staticmethod
+    def _load_key() -> SigningKey:
+        _LOGGER.debug(f"Loading signing key from {bumper_isc.server_key}")
+        private_key = load_pem_private_key(Path(bumper_isc.server_key).read_bytes(), password=None)
+        if not isinstance(
+            private_key,
+            ec.EllipticCurvePrivateKey | rsa.RSAPrivateKey | ed25519.Ed25519PrivateKey | ed448.Ed448PrivateKey,
+        ):
+            msg = f"Unsupported signing key type: {type(private_key).__name__}"
+            raise TypeError(msg)
+        return private_key
+
+    @staticmethod
+    def _file_signature() -> tuple[int, int]:
+        try:
+            stat = Path(bumper_isc.server_key).stat()
+        except OSError:
+            return (-1, -1)
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+signing_keys: SigningKeyManager = SigningKeyManager()
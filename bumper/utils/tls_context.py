@@ -0,0 +1,108 @@
+"""TLS context module."""
+
+import logging
+from pathlib import Path
+import ssl
+import threading
+import time
+
+from bumper.utils.settings import config as bumper_isc
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of TLS 1.3 session tickets handed out per full handshake
+SESSION_TICKETS = 2
+# Minimum seconds between two checks of the certificate files
+RELOAD_CHECK_INTERVAL = 5.0
+
+_FileSignature = tuple[tuple[str, int, int], ...]
+
+
+class TLSContextProvider:
+    """Provide shared TLS contexts for all listeners, loaded once and reloaded when the certificates change.
+
+    Reusing one context per purpose keeps the OpenSSL session cache and ticket keys alive across
+    connections, so reconnecting bots and apps can resume their sessions instead of doing a full handshake.
+    """
+
+    def __init__(self, reload_check_interval: float = RELOAD_CHECK_INTERVAL) -> None:
+        """TLS context provider init."""
+        self._reload_check_interval = reload_check_interval
+        self._lock = threading.Lock()
+        self._server_contexts: dict[ssl.VerifyMode, ssl.SSLContext] = {}
+        self._client_context: ssl.SSLContext | None = None
+        self._signature: _FileSignature | None = None
+        self._last_check: float = 0.0
+
+    def server_context(self, verify_mode: ssl.VerifyMode = ssl.CERT_NONE) -> ssl.SSLContext:
+        """Get the server side context, which uses the bumper certificates."""
+        with self._lock:
+            self._check_reload()
+            if (ssl_ctx := self._server_contexts.get(verify_mode)) is None:
+                ssl_ctx = self._create_server_context(verify_mode)
+                self._server_contexts[verify_mode] = ssl_ctx
+            return ssl_ctx
+
+    def client_context(self) -> ssl.SSLContext:
+        """Get the client side context, which does not verify the server certificate."""
+        with self._lock:
+            if self._client_context is None:
+                ssl_ctx = ssl.create_default_context()
+                ssl_ctx.check_hostname = False
+                ssl_ctx.verify_mode = ssl.CERT_NONE
+                self._client_context = ssl_ctx
+            return self._client_context
+
+    def invalidate(self) -> None:
+        """Drop all cached server contexts, they will be recreated on next use."""
+        with self._lock:
+            self._server_contexts.clear()
+            self._signature = None
+            self._last_check = 0.0
+
+    def _check_reload(self) -> None:
+        """Drop cached server contexts when the certificate files changed."""
+        now = time.monotonic()
+        if self._server_contexts and now - self._last_check < self._reload_check_interval:
+            return
+        self._last_check = now
+
+        signature = self._files_signature()
+        if self._signature is not None and signature != self._signature and self._server_contexts:
+            _LOGGER.info("Certificate files changed, reloading TLS contexts")
+            self._server_contexts.clear()
+        self._signature = signature
+
+    def _create_server_context(self, verify_mode: ssl.VerifyMode) -> ssl.SSLContext:
+        _LOGGER.debug(f"Loading TLS server context from {bumper_isc.server_cert}")
+        ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_ctx.load_cert_chain(bumper_isc.server_cert, bumper_isc.server_key)
+        ssl_ctx.load_verify_locations(cafile=bumper_isc.ca_cert)
+        ssl_ctx.verify_mode = verify_mode
+        ssl_ctx.options &= ~ssl.OP_NO_TICKET
+        ssl_ctx.num_tickets = SESSION_TICKETS
+        # Listeners keep the context they were started with, switch new handshakes over to the current one
+        ssl_ctx.sni_callback = self._select_current_context
+        return ssl_ctx
+
+    def _select_current_context(self, ssl_obj: ssl.SSLObject | ssl.SSLSocket, _: str | None, ssl_ctx: ssl.SSLContext) -> None:
+        try:
+            current = self.server_context(ssl_ctx.verify_mode)
+            if current is not ssl_ctx:
+                ssl_obj.context = current
+        except Exception:
+            _LOGGER.exception("Failed to switch to reloaded TLS context")
+
+    @staticmethod
+    def _files_signature() -> _FileSignature:
+        signature: list[tuple[str, int, int]] = []
+        for file in (bumper_isc.ca_cert, bumper_isc.server_cert, bumper_isc.server_key):
+            try:
+                stat = Path(file).stat()
+                signature.append((str(file), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((str(file), -1, -1))
+        return tuple(signature)
+
+
+tls_provider: TLSContextProvider = TLSContextProvider()
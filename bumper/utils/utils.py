@@ -1,14 +1,15 @@
 """Utils module."""
 
 import datetime
-import json
 import logging
 from pathlib import Path
-import re
 
 from aiohttp import AsyncResolver
 import validators
 
+from bumper.utils import json_codec
+from bumper.utils.api_coverage import api_coverage
+from bumper.utils.dns_cache import dns_resolver
 from bumper.utils.settings import config as bumper_isc
 
 _LOGGER = logging.getLogger(__name__)
@@ -60,9 +61,8 @@ def get_resolver_with_public_nameserver() -> AsyncResolver:
 
 
 async def resolve(host: str) -> str:
-    """Resolve host."""
-    hosts = await get_resolver_with_public_nameserver().resolve(host)
-    return str(hosts[0]["host"])
+    """Resolve host, cached by the shared resolver."""
+    return await dns_resolver.resolve(host)
 
 
 # ******************************************************************************
@@ -91,7 +91,7 @@ def get_area_code_map() -> dict[str, str]:
     config_path = Path(__file__).parent / "utils_area_code_mapping.json"
     try:
         with config_path.open(encoding="utf-8") as file:
-            patterns = json.load(file)
+            patterns = json_codec.load(file)
             if isinstance(patterns, dict):
                 return patterns
     except Exception:
@@ -99,14 +99,6 @@ def get_area_code_map() -> dict[str, str]:
     return {}
 
 
-def check_url_not_used(url: str) -> bool:
-    """Check if a url is not in the know api list, used in the middleware for debug."""
-    config_path = Path(__file__).parent / "utils_implemented_apis.json"
-    try:
-        with config_path.open(encoding="utf-8") as file:
-            patterns = json.load(file)
-            if isinstance(patterns, list):
-                return any(re.search(pattern, url) for pattern in patterns)
-    except Exception:
-        _LOGGER.warning(f"Could not find or read: '{config_path.name}'")
-    return False
+def check_url_not_used(url: str | None) -> bool:
+    """Check if a url is in the know api list and count the hit, used in the middleware for debug."""
+    return api_coverage.check(url)
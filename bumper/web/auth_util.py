@@ -1,21 +1,20 @@
 """Auth util module."""
 
+import asyncio
 import datetime
 import hashlib
-import json
 import logging
 from typing import Any
 import uuid
 
-import aiofiles
 from aiohttp.web_exceptions import HTTPInternalServerError
 from aiohttp.web_request import Request
 from aiohttp.web_response import Response
-import jwt
 
 from bumper.db import bot_repo, client_repo, token_repo, user_repo
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
+from bumper.utils.signing_key import signing_keys
 from bumper.web import models
 from bumper.web.response_utils import (
     ERR_TOKEN_INVALID,
@@ -76,7 +75,8 @@ async def login(request: Request) -> Response:
                         return _check_token(app_type, country_code, user, request.query.get("accessToken", ""))[1]
                     # Deactivate old tokens and authcodes
                     token_repo.revoke_user_expired(user.userid)
-                    return response_success_v1(_get_login_details(app_type, country_code, user, _generate_token(user.userid)))
+                    token = _get_or_generate_token(user.userid, device_id)
+                    return response_success_v1(_get_login_details(app_type, country_code, user, token))
             return response_error_v1(msg="Parameter error. Please try again later.", code=ERR_TOKEN_INVALID)
 
         if device_id is not None and app_type is not None:
@@ -101,14 +101,14 @@ def _auth_any(
     user: models.BumperUser | None = user_repo.get_by_id(uid)
 
     # anyway if it is a 'login' or only 'checkLogin'
-    # we will create a user if not exists and generated always a token, to be always authenticated
+    # we will create a user if not exists and return always a token, to be always authenticated
     if user is None:
         user_repo.add(uid)
         user = user_repo.get_by_id(uid)
 
     if user is not None:
         _auth_any_user_extends(user, device_id)
-        token = _generate_token(user.userid)
+        token = _get_or_generate_token(user.userid, device_id, token_str if check is True else None)
         body = response_success_v1(_get_login_details(app_type, country_code, user, token))
 
         # If request was 'checkLogin'
@@ -200,7 +200,7 @@ def _generate_it_token(user_id: str) -> str | None:
 async def get_new_auth(request: Request) -> Response:
     """Get new auth do."""
     try:
-        post_body = json.loads(await request.text())
+        post_body = json_codec.loads(await request.read())
         it_token: str | None = post_body.get("itToken")  # NOTE: created with `/v1/global/auth/getAuthCode`
 
         if it_token is None:
@@ -230,7 +230,7 @@ async def get_new_auth(request: Request) -> Response:
 async def get_auth_code_v2(request: Request) -> Response:
     """Get auth code v2."""
     try:
-        post_body = json.loads(await request.text())
+        post_body = json_codec.loads(await request.read())
         user_id = post_body.get("auth", {}).get("userid")
         # access_token = post_body.get("auth", {}).get("token")
 
@@ -271,23 +271,15 @@ async def oauth_callback(request: Request) -> Response:
         client_id = client.userid if client is not None else None
         client_resource = client.resource if client is not None else None
 
-        access_token, _ = await generate_jwt_helper(
-            data={
-                "c": client_id,
-                "u": token.userid,
-                "r": client_resource,
-                "ac": auth_code,
-            },
-            t="a",
-        )
-        refresh_token, expire_at = await generate_jwt_helper(
-            data={
-                "c": client_id,
-                "u": token.userid,
-                "r": client_resource,
-                "ac": auth_code,
-            },
-            t="r",
+        data = {
+            "c": client_id,
+            "u": token.userid,
+            "r": client_resource,
+            "ac": auth_code,
+        }
+        (access_token, _), (refresh_token, expire_at) = await asyncio.gather(
+            generate_jwt_helper(data=data, t="a"),
+            generate_jwt_helper(data=data, t="r"),
         )
         return response_success_v3(
             data={
@@ -311,7 +303,7 @@ async def oauth_callback(request: Request) -> Response:
 
 
 def _check_token(apptype: str, country_code: str, user: models.BumperUser, token_str: str) -> tuple[bool, Response]:
-    if token_repo.verify(user.userid, token_str):
+    if token_repo.refresh(user.userid, token_str):
         return (True, response_success_v1(_get_login_details(apptype, country_code, user, token_str)))
     return (False, response_error_v1(msg="Parameter error. Please try again later.", code=ERR_TOKEN_INVALID))
 
@@ -345,13 +337,23 @@ def _generate_uid(account: str | None) -> str:
     return hash_object.hexdigest()[:20]
 
 
-def _generate_token(user_id: str) -> str:
+def _generate_token(user_id: str, device_id: str | None = None) -> str:
     """Generate new token and add to DB."""
     token = uuid.uuid4().hex
-    token_repo.add(user_id, token)
+    token_repo.add(user_id, token, device_id)
     return token
 
 
+def _get_or_generate_token(user_id: str, device_id: str, token_str: str | None = None) -> str:
+    """Get a still valid token, the given one or the one of the device, and generate a new token only if there is none."""
+    if token_str and token_repo.refresh(user_id, token_str):
+        return token_str
+    token = token_repo.get_valid_for_device(user_id, device_id)
+    if token is not None and token_repo.refresh(user_id, token.token):
+        return token.token
+    return _generate_token(user_id, device_id)
+
+
 def _generate_auth_code(user_id: str) -> str | None:
     """Generate auth code."""
     # Generate new auth_code and update to existing token entry
@@ -386,36 +388,23 @@ async def generate_jwt_helper(
     if data:
         payload.update(data)
 
-    async with aiofiles.open(bumper_isc.server_key) as cert_file:
-        private_key = await cert_file.read()
-
-    return (
-        jwt.encode(
-            payload,
-            private_key,
-            algorithm=algorithm,
-            headers=headers,
-        ),
-        int(exp_dt.timestamp()),
-    )
+    return (await signing_keys.sign(payload, algorithm, headers), int(exp_dt.timestamp()))
 
 
 def get_jwt_details(auth_header: str | None) -> dict[str, Any] | None:
-    """Extract JWT helper."""
+    """Extract JWT helper, None if the token was not signed with the server key."""
     if not auth_header or not auth_header.lower().startswith("bearer "):
         return None
 
     token = auth_header.split(" ")[1]
 
-    try:
-        payload = jwt.decode(token, options={"verify_signature": False})
-        return {
-            "issued_at": payload.get("iat"),
-            "expires_at": payload.get("exp"),
-            "client_id": payload.get("c"),
-            "user_id": payload.get("u"),
-            "client_resource": payload.get("r"),
-            "auth_code": payload.get("ac"),
-        }
-    except jwt.DecodeError:
+    if (payload := signing_keys.verify(token, bumper_isc.TOKEN_JWT_ALG)) is None:
         return None
+    return {
+        "issued_at": payload.get("iat"),
+        "expires_at": payload.get("exp"),
+        "client_id": payload.get("c"),
+        "user_id": payload.get("u"),
+        "client_resource": payload.get("r"),
+        "auth_code": payload.get("ac"),
+    }
@@ -1,29 +1,32 @@
 """Web server middleware module."""
 
-import json
+from dataclasses import dataclass
 import logging
+import queue
+import random
+import threading
+import time
 from typing import Any
 
-from aiohttp import web
+from aiohttp import hdrs, web
 from aiohttp.typedefs import Handler
 from aiohttp.web_exceptions import HTTPNoContent
 from aiohttp.web_request import Request
-from aiohttp.web_response import Response, StreamResponse
+from aiohttp.web_response import ContentCoding, Response, StreamResponse
 
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
+from bumper.web.static_responses import ENCODING_DEFLATE, ENCODING_GZIP, ENCODING_IDENTITY, select_encoding
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class CustomEncoder(json.JSONEncoder):
-    """Custom json encoder, which supports set."""
-
-    def default(self, o: Any) -> Any:
-        """Convert objects, which are not supported by the default JSONEncoder."""
-        if isinstance(o, set):
-            return list(o)
-        return json.JSONEncoder.default(self, o)
+def _json_default(o: Any) -> Any:
+    """Convert objects, which are not supported by the json codec, like set."""
+    if isinstance(o, set):
+        return list(o)
+    msg = f"Object of type {type(o).__name__} is not JSON serializable"
+    raise TypeError(msg)
 
 
 _EXCLUDE_FROM_LOGGING = [
@@ -37,90 +40,153 @@ _EXCLUDE_FROM_LOGGING = [
     "/client/remove/{resource}",
     "/users",
     "/user/remove/{userid}",
+    "/api-coverage",
+    "/proxy-stats",
+    "/helperbot-stats",
 ]
 
 
+@dataclass(frozen=True, slots=True)
+class RequestLogRecord:
+    """Summary of a handled request, formatted only by the log writer."""
+
+    method: str
+    path: str
+    route: str
+    status: int
+    duration: float
+
+    def __str__(self) -> str:
+        """Format the record as log message."""
+        return f"{self.method} {self.path} ({self.route}) -> {self.status} in {self.duration * 1000:.1f} ms"
+
+
+class RequestLogWriter:
+    """Write request log records in a background thread, so formatting and handler I/O stay off the event loop."""
+
+    def __init__(self, maxsize: int = 1000) -> None:
+        """Request log writer init."""
+        self._queue: queue.Queue[tuple[int, object] | None] = queue.Queue(maxsize)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped: int = 0
+
+    def submit(self, level: int, record: object) -> None:
+        """Queue a record, it is dropped when the writer can not keep up."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((level, record))
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Write the queued records and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bumper-request-log", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            level, record = item
+            try:
+                _LOGGER.log(level, str(record))
+            except Exception:
+                _LOGGER.exception(utils.default_exception_str_builder(info="during writing the request log"))
+
+
+request_log_writer: RequestLogWriter = RequestLogWriter()
+
+
 @web.middleware
 async def log_all_requests(request: Request, handler: Handler) -> StreamResponse:
-    """Middleware to log all requests."""
+    """Middleware to log requests, only collecting what the configured log level will emit.
+
+    Slow requests are logged as warning, all others are sampled at debug level.
+    """
+    route = request.match_info.route.resource.canonical if request.match_info.route.resource is not None else None
     try:
+        # Every api request counts for the api coverage, whatever is logged
+        is_known = route in _EXCLUDE_FROM_LOGGING or utils.check_url_not_used(request.path)
         # DEBUG logger by env set to see all requests taken
         # or to print requests which are not know (lists needs to be manually updated)
         if (bumper_isc.DEBUG_LOGGING_API_REQUEST is True) or (
-            bumper_isc.DEBUG_LOGGING_API_REQUEST_MISSING is True and utils.check_url_not_used(request.path) is False
+            bumper_isc.DEBUG_LOGGING_API_REQUEST_MISSING is True and is_known is False
         ):
-            _LOGGER.info(
-                json.dumps(
+            request_log_writer.submit(
+                logging.INFO,
+                json_codec.dumps(
                     {
                         "warning": "Requested API is not implemented!",
                         "method": request.method,
                         "url": str(request.url),
-                        # "host": next((value for key, value in set(request.headers.items()) if key.lower() == "host"), ""),
-                        # "path": request.path,
-                        # "query_string": request.query_string,
                         "body": await request.text(),
                     },
-                    cls=CustomEncoder,
+                    default=_json_default,
                 ),
             )
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder(info="during logging the debug request"))
 
-    if request.match_info.route.resource is None or request.match_info.route.resource.canonical in _EXCLUDE_FROM_LOGGING:
+    if route is None or route in _EXCLUDE_FROM_LOGGING:
         return await handler(request)
 
-    to_log = {
-        "request": {
-            "method": request.method,
-            "url": str(request.url),
-            "path": request.path,
-            "query_string": request.query_string,
-            "headers": set(request.headers.items()),
-            "route_resource": request.match_info.route.resource.canonical,
-        },
-    }
-
+    start = time.perf_counter()
+    status = 500
     try:
-        try:
-            if request.content_length:
-                if request.content_type == "application/json":
-                    to_log["request"]["body"] = await request.json()
-                else:
-                    to_log["request"]["body"] = set(await request.post())
-        except Exception:
-            _LOGGER.exception(utils.default_exception_str_builder(info="during logging the request"))
-            raise
-
         response: StreamResponse | None = await handler(request)
-
-        try:
-            if response is None:
-                _LOGGER.warning("Response was null!")
-                _LOGGER.warning(json.dumps(to_log, cls=CustomEncoder))
-                raise HTTPNoContent
-
-            to_log["response"] = {
-                "status": f"{response.status}",
-                "headers": set(response.headers.items()),
-            }
-
-            if isinstance(response, Response) and response.body:
-                if response.text is None:
-                    msg = "Response text is not provided."
-                    raise ValueError(msg)
-
-                if response.content_type == "application/json":
-                    to_log["response"]["body"] = json.loads(response.text)
-                elif response.content_type.startswith("text"):
-                    to_log["response"]["body"] = response.text
-
-            return response
-        except Exception:
-            _LOGGER.exception(utils.default_exception_str_builder(info="during logging the response"))
-            raise
-
-    except web.HTTPNotFound:
-        _LOGGER.debug(f"Request path {request.raw_path} not found")
+        if response is None:
+            _LOGGER.warning(f"Response was null! ({request.method} {request.path})")
+            raise HTTPNoContent
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        if isinstance(e, web.HTTPNotFound):
+            _LOGGER.debug(f"Request path {request.raw_path} not found")
         raise
-    # finally:
-    #     _LOGGER.debug(json.dumps(to_log, cls=CustomEncoder))
+    finally:
+        duration = time.perf_counter() - start
+        level: int | None = None
+        if 0 < bumper_isc.WEB_LOG_SLOW_REQUEST_MS <= duration * 1000:
+            level = logging.WARNING
+        elif _LOGGER.isEnabledFor(logging.DEBUG) and random.random() < bumper_isc.WEB_LOG_SAMPLE_RATE:  # noqa: S311
+            level = logging.DEBUG
+        if level is not None and _LOGGER.isEnabledFor(level):
+            request_log_writer.submit(level, RequestLogRecord(request.method, request.path, route, status, duration))
+
+
+@web.middleware
+async def compress_response(request: Request, handler: Handler) -> StreamResponse:
+    """Compress responses above the size threshold with an encoding accepted by the client.
+
+    Responses with a content encoding, like the pre-compressed static responses, and binary command responses are passed as is.
+    """
+    response = await handler(request)
+    if (
+        not isinstance(response, Response)
+        or not isinstance(response.body, bytes)
+        or len(response.body) < bumper_isc.WEB_COMPRESSION_MIN_SIZE
+        or hdrs.CONTENT_ENCODING in response.headers
+        or response.content_type == "application/octet-stream"
+    ):
+        return response
+
+    vary = response.headers.get(hdrs.VARY)
+    if vary is None:
+        response.headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+    elif hdrs.ACCEPT_ENCODING.lower() not in vary.lower():
+        response.headers[hdrs.VARY] = f"{vary}, {hdrs.ACCEPT_ENCODING}"
+
+    encoding = select_encoding(request.headers.get(hdrs.ACCEPT_ENCODING, ""), (ENCODING_GZIP, ENCODING_DEFLATE))
+    if encoding != ENCODING_IDENTITY:
+        response.enable_compression(ContentCoding(encoding))
+    return response
@@ -134,12 +134,14 @@ class Token:
         expiration: datetime,
         auth_code: str | None = None,
         it_token: str | None = None,
+        device_id: str | None = None,
     ) -> None:
         self.userid = userid
         self.token = token
         self.expiration = expiration
         self.auth_code = auth_code
         self.it_token = it_token
+        self.device_id = device_id
 
     def to_db(self) -> dict[str, Any]:
         """Convert Token to a TinyDB-compatible dict."""
@@ -149,6 +151,7 @@ class Token:
             "expiration": self.expiration.isoformat(),
             "auth_code": self.auth_code,
             "it_token": self.it_token,
+            "device_id": self.device_id,
         }
 
     def as_dict(self) -> dict[str, Any]:
@@ -168,6 +171,7 @@ class Token:
             expiration=expiration,
             auth_code=data.get("auth_code"),
             it_token=data.get("it_token"),
+            device_id=data.get("device_id"),
         )
 
 
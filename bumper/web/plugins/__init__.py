@@ -2,17 +2,30 @@
 
 from abc import abstractmethod
 from collections.abc import Iterable
+from dataclasses import dataclass
+import hashlib
+import importlib
 import inspect
 import logging
 from pathlib import Path
 import sys
+import time
 from types import ModuleType
+from typing import Any
 
 from aiohttp import web
-from aiohttp.web_routedef import AbstractRouteDef
+from aiohttp.typedefs import Handler
+from aiohttp.web_request import Request
+from aiohttp.web_response import StreamResponse
+from aiohttp.web_routedef import AbstractRouteDef, RouteDef, StaticDef
+
+from bumper.utils import json_codec
+from bumper.utils.settings import config as bumper_isc
 
 _LOGGER = logging.getLogger(__name__)
 
+ROUTE_MANIFEST_VERSION = 1
+
 
 class WebserverPlugin:
     """Abstract webserver plugin."""
@@ -24,31 +37,83 @@ class WebserverPlugin:
         raise NotImplementedError
 
 
-def _add_routes(app: web.Application, module: ModuleType, plugin_module_name: str) -> None:
-    """Add routes from a module and its sub-modules to the web application."""
+@dataclass(frozen=True, slots=True)
+class PluginRoute:
+    """Route of a plugin with the names of the plugin packages, in which sub-applications it is served."""
+
+    app_path: tuple[str, ...]
+    route: AbstractRouteDef
+
+
+def _collect_routes(module: ModuleType, plugin_module_name: str, app_path: tuple[str, ...]) -> list[PluginRoute]:
+    """Collect routes from a module and its sub-modules."""
     if not module.__name__.startswith(plugin_module_name):
-        return
+        return []
 
     if module.__file__ is None:
         msg = "Module file is not available."
         raise ValueError(msg)
 
     module_path = Path(module.__file__)
-    sub_app = web.Application() if module_path.name == "__init__.py" else app
+    if module_path.name == "__init__.py":
+        app_path = (*app_path, module_path.parent.name)
 
+    routes: list[PluginRoute] = []
     for _, clazz in inspect.getmembers(module, inspect.isclass):
         if issubclass(clazz, WebserverPlugin) and clazz != WebserverPlugin:
             web_obj: WebserverPlugin = clazz()
-            sub_app.add_routes(web_obj.routes)
+            routes.extend(PluginRoute(app_path, route) for route in web_obj.routes)
             _LOGGER.debug(f"Added routes from {clazz.__name__}")
 
     for _, obj in inspect.getmembers(module, inspect.ismodule):
-        _add_routes(sub_app, obj, plugin_module_name)
+        routes.extend(_collect_routes(obj, plugin_module_name, app_path))
+    return routes
+
+
+def _add_routes(app: web.Application, routes: Iterable[PluginRoute], flat: bool = False) -> None:
+    """Add routes to the web application.
+
+    Each plugin package is mounted as sub-application, or with `flat` all routes are added with the package prefixes to
+    the router of the application, which resolves the same paths without walking nested prefix resources.
+    """
+    if flat is True:
+        app.add_routes(_flat_route(plugin_route) for plugin_route in routes)
+        return
+
+    items: dict[tuple[str, ...], list[AbstractRouteDef | tuple[str, ...]]] = {(): []}
+    for plugin_route in routes:
+        for depth in range(1, len(plugin_route.app_path) + 1):
+            if (app_path := plugin_route.app_path[:depth]) not in items:
+                items[app_path] = []
+                items[app_path[:-1]].append(app_path)
+        items[plugin_route.app_path].append(plugin_route.route)
+    _fill_app(app, (), items)
+
+
+def _flat_route(plugin_route: PluginRoute) -> AbstractRouteDef:
+    """Get the route with the prefixes of its plugin packages."""
+    prefix = "".join(f"/{name}" for name in plugin_route.app_path)
+    route = plugin_route.route
+    if isinstance(route, RouteDef):
+        return RouteDef(route.method, f"{prefix}{route.path}", route.handler, route.kwargs)
+    if isinstance(route, StaticDef):
+        return StaticDef(f"{prefix}{route.prefix}", route.path, route.kwargs)
+    msg = f"Route can not be flattened: {route}"
+    raise TypeError(msg)
 
-    if module_path.name == "__init__.py":
-        prefix = module_path.parent.as_posix()
-        prefix = f"/{prefix[prefix.rfind('/') + 1 :]}/"
-        app.add_subapp(prefix, sub_app)
+
+def _fill_app(
+    app: web.Application,
+    app_path: tuple[str, ...],
+    items: dict[tuple[str, ...], list[AbstractRouteDef | tuple[str, ...]]],
+) -> None:
+    for item in items[app_path]:
+        if isinstance(item, tuple):
+            sub_app = web.Application()
+            _fill_app(sub_app, item, items)
+            app.add_subapp(f"/{item[-1]}/", sub_app)
+        else:
+            app.add_routes([item])
 
 
 def _import_plugins(module: ModuleType) -> None:
@@ -71,12 +136,140 @@ def _import_plugins(module: ModuleType) -> None:
             _LOGGER.exception(f"Failed to import plugin module {plugin_name}")
 
 
-def add_plugins(app: web.Application) -> None:
-    """Discover and add all plugins to the web application."""
+def discover_routes() -> list[PluginRoute]:
+    """Import all plugin modules and collect the routes of their plugins."""
     module = sys.modules[__name__]
     _import_plugins(module)
 
     plugin_module_name = module.__name__
+    routes: list[PluginRoute] = []
     for _, obj in inspect.getmembers(module, inspect.ismodule):
         if obj.__name__.startswith(plugin_module_name):
-            _add_routes(app, obj, plugin_module_name)
+            routes.extend(_collect_routes(obj, plugin_module_name, ()))
+    return routes
+
+
+def _resolve_handler(target: str) -> Any:
+    """Import the module of a handler given as `module:qualname` and get the handler."""
+    module_name, _, qualname = target.partition(":")
+    handler: Any = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        handler = getattr(handler, name)
+    return handler
+
+
+def _lazy_handler(target: str) -> Handler:
+    """Create a handler, which imports the module of the target handler on the first request."""
+    handler: Handler | None = None
+
+    async def _handle(request: Request) -> StreamResponse:
+        nonlocal handler
+        if handler is None:
+            handler = _resolve_handler(target)
+            _LOGGER.debug(f"Loaded route handler {target}")
+        return await handler(request)
+
+    return _handle
+
+
+def _handler_target(handler: Any) -> str | None:
+    """Get the import path of a handler, None if it can not be imported by its name."""
+    target = f"{getattr(handler, '__module__', '')}:{getattr(handler, '__qualname__', '')}"
+    try:
+        return target if _resolve_handler(target) is handler else None
+    except Exception:
+        return None
+
+
+def _module_file(module_name: str) -> Path:
+    """Get the source file of a bumper module without importing it."""
+    module_path = Path(__file__).parents[3].joinpath(*module_name.split("."))
+    for file in (module_path.with_suffix(".py"), module_path / "__init__.py"):
+        if file.is_file():
+            return file
+    msg = f"Source of module {module_name} not found"
+    raise FileNotFoundError(msg)
+
+
+def _fingerprint(handler_modules: Iterable[str]) -> str:
+    """Hash the sources of all plugin modules and of the handler modules, to detect an outdated manifest."""
+    root = Path(__file__).parents[3]
+    files = {*Path(__file__).parent.glob("**/*.py"), *(_module_file(module_name) for module_name in handler_modules)}
+    digest = hashlib.sha256()
+    for file in sorted(files):
+        digest.update(file.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def write_route_manifest(path: Path, routes: Iterable[PluginRoute]) -> bool:
+    """Write the routes with the import paths of their handlers as manifest, skipped if a route can not be described."""
+    entries: list[dict[str, Any]] = []
+    for plugin_route in routes:
+        route = plugin_route.route
+        target = _handler_target(route.handler) if isinstance(route, RouteDef) and not route.kwargs else None
+        if not isinstance(route, RouteDef) or target is None:
+            _LOGGER.warning(f"Route manifest not written, route can not be described: {route}")
+            return False
+        entries.append({"app": list(plugin_route.app_path), "method": route.method, "path": route.path, "handler": target})
+
+    try:
+        manifest = {
+            "version": ROUTE_MANIFEST_VERSION,
+            "fingerprint": _fingerprint({entry["handler"].partition(":")[0] for entry in entries}),
+            "routes": entries,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(json_codec.dumpb(manifest))
+    except Exception:
+        _LOGGER.warning(f"Could not write route manifest: '{path}'", exc_info=True)
+        return False
+    _LOGGER.info(f"Route manifest written with {len(entries)} routes: '{path}'")
+    return True
+
+
+def load_route_manifest(path: Path) -> list[PluginRoute] | None:
+    """Load the routes from the manifest with lazy handlers, None if it is missing or outdated."""
+    try:
+        with path.open(encoding="utf-8") as file:
+            manifest = json_codec.load(file)
+        entries: list[dict[str, Any]] = manifest["routes"]
+        if manifest.get("version") != ROUTE_MANIFEST_VERSION or manifest.get("fingerprint") != _fingerprint(
+            {entry["handler"].partition(":")[0] for entry in entries},
+        ):
+            _LOGGER.info(f"Route manifest is outdated: '{path}'")
+            return None
+        return [
+            PluginRoute(
+                tuple(entry["app"]),
+                RouteDef(entry["method"], entry["path"], _lazy_handler(entry["handler"]), {}),
+            )
+            for entry in entries
+        ]
+    except FileNotFoundError:
+        return None
+    except Exception:
+        _LOGGER.warning(f"Could not read route manifest: '{path}'", exc_info=True)
+        return None
+
+
+def add_plugins(app: web.Application) -> None:
+    """Add all plugins to the web application.
+
+    Routes are registered from the route manifest when it is up to date, the handler modules are then imported on the
+    first request. Otherwise plugins are discovered and the manifest is written for the next start.
+    """
+    start = time.perf_counter()
+    routes: list[PluginRoute] | None = None
+    if bumper_isc.WEB_ROUTE_MANIFEST is True:
+        routes = load_route_manifest(bumper_isc.route_manifest_file)
+
+    source = "manifest"
+    if routes is None:
+        source = "discovery"
+        routes = discover_routes()
+        if bumper_isc.WEB_ROUTE_MANIFEST is True:
+            write_route_manifest(bumper_isc.route_manifest_file, routes)
+
+    _add_routes(app, routes, flat=bumper_isc.WEB_FLAT_ROUTES)
+    _LOGGER.debug(f"Added {len(routes)} plugin routes by {source} in {(time.perf_counter() - start) * 1000:.1f} ms")
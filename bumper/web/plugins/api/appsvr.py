@@ -1,13 +1,9 @@
 """Appsvr plugin module."""
 
 from collections.abc import Iterable, Mapping
-import copy
-import json
 import logging
-from pathlib import Path
 from typing import Any
 
-import aiofiles
 from aiohttp import web
 from aiohttp.web_exceptions import HTTPInternalServerError
 from aiohttp.web_request import Request
@@ -16,14 +12,22 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.db import bot_repo
 from bumper.mqtt.helper_bot import MQTTCommandModel
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web import auth_util
 from bumper.web.models import VacBotDevice
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_error_v5, response_success_v2, response_success_v3, response_success_v4
-
-from .pim import get_product_iot_map
+from bumper.web.response_utils import (
+    constant_response,
+    response_error_v5,
+    response_success_v2,
+    response_success_v3,
+    response_success_v4,
+)
+from bumper.web.static_responses import static_responses
+
+from .pim import STATIC_CODE_PUSH_CONFIG
+from .pim.catalog import product_catalog
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -110,7 +114,7 @@ async def _handle_app_do(request: Request) -> Response:
         if request.content_type == "application/x-www-form-urlencoded":
             post_body = await request.post()
         else:
-            post_body = json.loads(await request.text())
+            post_body = json_codec.loads(await request.read())
 
         todo = post_body.get("todo", "")
 
@@ -137,8 +141,9 @@ async def _handle_app_do(request: Request) -> Response:
             cmd = next(iter(data_ctl.keys()))
             cmd_json: dict[str, Any] = data_ctl.get(cmd, {})
             cmd_request = MQTTCommandModel(cmd_json, version=MQTTCommandModel.VERSION_P2P)
+            cmd_request.set_timeout(request.query.get("timeout"))
             if bumper_isc.mqtt_helperbot is not None:
-                return await bumper_isc.mqtt_helperbot.send_command(cmd_request)
+                return await bumper_isc.mqtt_helperbot.dispatch(cmd_request)
 
         if todo == "GetAppVideoUrl":
             keys: Any = post_body.get("keys", [])
@@ -246,8 +251,7 @@ async def _handle_app_config(request: Request) -> Response:
         ]
 
     elif code == "codepush_config":
-        async with aiofiles.open(Path(__file__).parent / "pim" / "codePushConfig.json", encoding="utf-8") as file:
-            data = json.loads(await file.read())
+        return static_responses.response(request, STATIC_CODE_PUSH_CONFIG)
 
     elif code == "base_station_guide":
         data = [
@@ -400,31 +404,37 @@ async def _handle_improve(request: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_improve_accept(_: Request) -> Response:
     """Improve accept."""
-    return web.json_response({"code": 0})
+    return json_codec.json_response({"code": 0})
 
 
+@constant_response
 async def _handle_improve_user_accept(_: Request) -> Response:
     """Improve accept."""
-    return web.json_response({"code": 0, "data": {"accept": False}})
+    return json_codec.json_response({"code": 0, "data": {"accept": False}})
 
 
+@constant_response
 async def _handle_notice_home(_: Request) -> Response:
     """Notice home."""
     return response_success_v2(data={})
 
 
+@constant_response
 async def _handle_notice_list(_: Request) -> Response:
     """Notice list."""
     return response_success_v2(data={})
 
 
+@constant_response
 async def _handle_ota_firmware(_: Request) -> Response:
     """OTA firmware."""
-    return web.json_response({"code": -1, "message": "No upgrades at this time"})
+    return json_codec.json_response({"code": -1, "message": "No upgrades at this time"})
 
 
+@constant_response
 async def _handle_device_blacklist_check(_: Request) -> Response:
     """Device blacklist check."""
     return response_success_v3(data=[])
@@ -440,70 +450,37 @@ def create_device_list() -> list[dict[str, Any]]:
 
 
 def _include_product_iot_map_info(bot: VacBotDevice) -> dict[str, Any] | None:
-    for botprod in get_product_iot_map():
-        if botprod["classid"] != bot.class_id:
-            continue
-
-        result: dict[str, Any] = copy.deepcopy(bot.as_dict())
-        result.pop("mqtt_connection")
-        result.pop("xmpp_connection")
-
-        if (botprod_invent := botprod.get("product")) is not None:
-            result["pid"] = botprod_invent["_id"]
-            result["materialNo"] = botprod_invent["materialNo"]
-            result["deviceName"] = botprod_invent["name"]
-            result["model"] = botprod_invent["model"]
-            result["UILogicId"] = botprod_invent["UILogicId"]
-            result["ota"] = botprod_invent["ota"]
-            result["icon"] = botprod_invent["iconUrl"]
-            result["product_category"] = "DEEBOT" if botprod_invent["name"].startswith("DEEBOT") else "UNKNOWN"
-
-        result["status"] = 1 if bot.mqtt_connection or bot.xmpp_connection else 0
-
-        result["otaUpgrade"] = {}
-        result["updateInfo"] = {"changeLog": "", "needUpdate": False}
-        result["shareable"] = bool(bot.mqtt_connection)
-        result["sharedDevice"] = False
-
-        # TODO: improve as non static
-        result["homeId"] = bumper_isc.HOME_ID
-        result["homeSort"] = 1
-
-        if bot.mqtt_connection:
-            result["bindTs"] = utils.get_current_time_as_millis()
-            result["offmap"] = True
-
-            with Path.open(Path(__file__).parent / "pim" / "productConfigBatch.json", encoding="utf-8") as file:
-                file_content = file.read()
-                product_config_batch: list[dict[str, Any]] = json.loads(file_content)
-
-            result["scode"] = {
-                "tmallstand": False,
-                "video": False,
-                "battery": True,
-                "clean": True,
-                "charge": True,
-                "chargestate": True,
-            }
-            for product_config in product_config_batch:
-                if botprod_invent["_id"] == product_config.get("pid", ""):
-                    result["scode"] = {
-                        "tmallstand": product_config.get("tmallstand", False),
-                        "video": product_config.get("video", False),
-                        "battery": product_config.get("battery", True),
-                        "clean": product_config.get("clean", True),
-                        "charge": product_config.get("charge", True),
-                        "chargestate": product_config.get("", True),
-                    }
-                    break
-
-            result["service"] = {
-                "jmq": f"jmq-ngiot-eu.{bumper_isc.DOM_SUB_2}{bumper_isc.DOMAIN_MAIN}",
-                "mqs": f"api-ngiot.{bumper_isc.DOM_SUB_1}{bumper_isc.DOMAIN_MAIN}",
-            }
-
-        return result
-    return None
+    product = product_catalog.by_classid(bot.class_id)
+    if product is None:
+        return None
+
+    # as_dict creates a new flat dict, so no copy is needed
+    result: dict[str, Any] = bot.as_dict()
+    result.pop("mqtt_connection")
+    result.pop("xmpp_connection")
+    result.update(product.device_fields)
+
+    result["status"] = 1 if bot.mqtt_connection or bot.xmpp_connection else 0
+
+    result["otaUpgrade"] = {}
+    result["updateInfo"] = {"changeLog": "", "needUpdate": False}
+    result["shareable"] = bool(bot.mqtt_connection)
+    result["sharedDevice"] = False
+
+    # TODO: improve as non static
+    result["homeId"] = bumper_isc.HOME_ID
+    result["homeSort"] = 1
+
+    if bot.mqtt_connection:
+        result["bindTs"] = utils.get_current_time_as_millis()
+        result["offmap"] = True
+        result["scode"] = product.scode
+        result["service"] = {
+            "jmq": f"jmq-ngiot-eu.{bumper_isc.DOM_SUB_2}{bumper_isc.DOMAIN_MAIN}",
+            "mqs": f"api-ngiot.{bumper_isc.DOM_SUB_1}{bumper_isc.DOMAIN_MAIN}",
+        }
+
+    return result
 
 
 async def _handle_akvs_start_watch(request: Request) -> Response:
@@ -514,10 +491,10 @@ async def _handle_akvs_start_watch(request: Request) -> Response:
     utils.default_log_warn_not_impl("_handle_akvs_start_watch")
     query_did = request.query.get("did", "")
     query_auth: str | dict[str, Any] = request.query.get("auth", {})
-    query_auth = json.loads(query_auth) if isinstance(query_auth, str) else query_auth
+    query_auth = json_codec.loads(query_auth) if isinstance(query_auth, str) else query_auth
     user_id = query_auth.get("userid", "")
     resource = query_auth.get("resource", "")
-    return web.json_response(
+    return json_codec.json_response(
         {
             "ret": "ok",
             "region": "eu-central-1",
@@ -8,7 +8,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 
 class DimPlugin(WebserverPlugin):
@@ -26,6 +26,7 @@ class DimPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_content_agreement(_: Request) -> Response:
     """Content agreement."""
     return response_success_v1(None)
@@ -12,7 +12,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.images import get_bot_image
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v3
+from bumper.web.response_utils import constant_response, response_success_v3
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -63,6 +63,7 @@ class EcmsPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_ad_res(_: Request) -> Response:
     """Ad res."""
     return response_success_v3(data=[], result_key=None, include_success=True)
@@ -142,6 +143,7 @@ async def _handle_resources(request: Request) -> Response:
     return response_success_v3(data=data, result_key=None, include_success=True)
 
 
+@constant_response
 async def _handle_push_event(_: Request) -> Response:
     """Ad res."""
     # dataCategory = request.query.get("dataCategory", "Discover-Hint")
@@ -1,7 +1,6 @@
 """Homed plugin module."""
 
 from collections.abc import Iterable
-import json
 import logging
 from typing import Any
 import uuid
@@ -13,7 +12,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.db import token_repo, user_repo
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.auth_util import get_jwt_details
 from bumper.web.plugins import WebserverPlugin
@@ -92,7 +91,7 @@ async def _handle_home_create(request: Request) -> Response:
     """Home create."""
     # TODO: check what's needed to be implemented
     utils.default_log_warn_not_impl("_handle_home_create")
-    json_body: dict[str, Any] = json.loads(await request.text())
+    json_body: dict[str, Any] = json_codec.loads(await request.read())
     authorization = request.headers.get("authorization")
     jwt_info = get_jwt_details(authorization)
     if jwt_info is None:
@@ -110,7 +109,7 @@ async def _handle_home_update(request: Request) -> Response:
     """Home update."""
     # TODO: check what's needed to be implemented
     utils.default_log_warn_not_impl("_handle_home_update")
-    json_body = json.loads(await request.text())
+    json_body = json_codec.loads(await request.read())
     home_id = json_body.get("homeId")
     name = json_body.get("name")
     _LOGGER.debug(f"Update :: homeId: {home_id} - name: {name}")
@@ -121,7 +120,7 @@ async def _handle_home_delete(request: Request) -> Response:
     """Home delete."""
     # TODO: check what's needed to be implemented
     utils.default_log_warn_not_impl("_handle_home_delete")
-    json_body = json.loads(await request.text())
+    json_body = json_codec.loads(await request.read())
     home_id = json_body.get("homeId")
     user = user_repo.get_by_home_id(home_id)
     if user is not None:
@@ -162,7 +161,7 @@ async def _handle_member_list(request: Request) -> Response:
 
 async def _handle_device_move(request: Request) -> Response:
     """Device move."""
-    post_body = json.loads(await request.text())
+    post_body = json_codec.loads(await request.read())
     did = post_body.get("did")
     mid = post_body.get("mid")
     to = post_body.get("to")  # NOTE: possible home id
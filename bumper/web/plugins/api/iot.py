@@ -1,7 +1,6 @@
 """Iot plugin module."""
 
 from collections.abc import Iterable
-import json
 import logging
 from typing import Any
 
@@ -12,7 +11,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.db import bot_repo
 from bumper.mqtt.helper_bot import MQTTCommandModel
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
 from bumper.web.response_utils import response_error_v7, response_error_v8
@@ -63,13 +62,14 @@ async def handle_commands(
 
         json_body: dict[str, Any] = {}
         if version == MQTTCommandModel.VERSION_OLD:
-            json_body = json.loads(await request.text())
+            json_body = json_codec.loads(await request.read())
         elif version == MQTTCommandModel.VERSION_NEW:
             json_body = dict(request.query)
-            json_body.update({"payload": json.loads(await request.text())})
+            json_body.update({"payload": json_codec.loads(await request.read())})
         else:
             _LOGGER.warning(f"MQTT command version not known :: '{version}'")
         cmd_request = MQTTCommandModel(cmdjson=json_body, version=version)
+        cmd_request.set_timeout(request.query.get("timeout"))
 
         # Its a command
         if cmd_request.did is not None:
@@ -83,11 +83,11 @@ async def handle_commands(
                 _LOGGER.warning(f"No bots with DID :: {cmd_request.did} :: connected to MQTT")
                 return response_error_v8(cmd_request.request_id, "requested bot is not supported")
 
-            return await bumper_isc.mqtt_helperbot.send_command(cmd_request)
+            return await bumper_isc.mqtt_helperbot.dispatch(cmd_request)
 
         if cmd_request.td is not None:
             if cmd_request.td == "PollSCResult":  # Seen when doing initial wifi config
-                return web.json_response(
+                return json_codec.json_response(
                     {
                         "ret": "ok",  # TODO: extend below
                         # "did": "DID",
@@ -97,9 +97,9 @@ async def handle_commands(
                     },
                 )
             if cmd_request.td == "HasUnreadMsg":  # EcoVacs Home
-                return web.json_response({"ret": "ok", "unRead": False})
+                return json_codec.json_response({"ret": "ok", "unRead": False})
             if cmd_request.td == "PreWifiConfig":  # EcoVacs Home
-                return web.json_response({"ret": "ok"})
+                return json_codec.json_response({"ret": "ok"})
             _LOGGER.warning(f"TD is not know :: {cmd_request.td} :: connected to MQTT")
 
     except Exception:
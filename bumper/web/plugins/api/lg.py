@@ -1,7 +1,6 @@
 """Lg plugin module."""
 
 from collections.abc import Iterable
-import json
 import logging
 from typing import Any
 
@@ -11,7 +10,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.db import bot_repo, clean_log_repo
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.web.plugins import WebserverPlugin
 from bumper.web.response_utils import response_error_v7
 
@@ -36,7 +35,7 @@ class LgPlugin(WebserverPlugin):
 async def _handle_lg_log(request: Request) -> Response:
     """Clean result list."""
     try:
-        json_body: dict[str, Any] = json.loads(await request.text())
+        json_body: dict[str, Any] = json_codec.loads(await request.read())
         did: str | None = json_body.get("did")
         td: str = json_body.get("td", "")
         logs: list[dict[str, Any]] = []
@@ -51,7 +50,7 @@ async def _handle_lg_log(request: Request) -> Response:
                 clean_logs = clean_log_repo.list_by_did(did)
                 logs.extend(clean_log.as_dict() for clean_log in clean_logs)
 
-        return web.json_response(
+        return json_codec.json_response(
             {
                 "ret": "ok",
                 "logs": sorted(logs, key=lambda x: x["ts"], reverse=True),
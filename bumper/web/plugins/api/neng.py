@@ -9,7 +9,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.db import bot_repo
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v3, response_success_v4
+from bumper.web.response_utils import constant_response, response_success_v3, response_success_v4
 
 
 class NengPlugin(WebserverPlugin):
@@ -72,26 +72,31 @@ class NengPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_has_unread_message(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v4({"hasUnRead": False, "shareMsgUnRead": False})
 
 
+@constant_response
 async def _handle_get_share_msgs(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v4({"hasNext": False, "msgs": []})
 
 
+@constant_response
 async def _handle_get_list(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v4({"hasNext": False, "msgs": []})
 
 
+@constant_response
 async def _handle_read(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v3(result_key=None)
 
 
+@constant_response
 async def _handle_v2_message_push(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v3(msg="", data="success")
@@ -118,16 +123,19 @@ async def _handle_v3_message_push_status(request: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_v3_latest_by_did(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v3(data=[])
 
 
+@constant_response
 async def _handle_v3_message_list(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v3(data=[])
 
 
+@constant_response
 async def _handle_v3_product_msg_tabs(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v3(
@@ -144,6 +152,7 @@ async def _handle_v3_product_msg_tabs(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_v3_share_msg_has_unread_msg(_: Request) -> Response:
     # EcoVacs Home
     return response_success_v3(data={"count": 0, "unRead": False})
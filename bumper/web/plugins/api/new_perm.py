@@ -9,7 +9,7 @@ from aiohttp.web_request import Request
 from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.web.auth_util import generate_jwt_helper
 from bumper.web.plugins import WebserverPlugin
 from bumper.web.response_utils import response_success_v3
@@ -34,7 +34,7 @@ class NewPermPlugin(WebserverPlugin):
 
 async def _handle_sst_issue(request: Request) -> Response:
     try:
-        body = await request.json()
+        body = json_codec.loads(await request.read())
         acl = body.get("acl")
         exp_seconds = body.get("exp")
         sub = body.get("sub")
@@ -1,16 +1,31 @@
 """Api pim module plugin."""
 
-import json
 from pathlib import Path
 from typing import Any
 
+from bumper.web.static_responses import static_responses
+
+STATIC_PRODUCT_IOT_MAP = "productIotMap"
+STATIC_CONFIG_NET_ALL = "configNetAll"
+STATIC_CONFIG_GROUPS = "configGroups"
+STATIC_CODE_PUSH_CONFIG = "codePushConfig"
 
 # EcoVacs Home Product IOT Map - 2025-04-03
 # https://portal-ww.ecouser.net/api/pim/product/getProductIotMap
+static_responses.register_file(
+    STATIC_PRODUCT_IOT_MAP,
+    Path(__file__).parent / "productIotMap.json",
+    lambda data: {"code": 0, "data": data},
+)
+static_responses.register_file(STATIC_CONFIG_NET_ALL, Path(__file__).parent / "configNetAllResponse.json")
+static_responses.register_file(STATIC_CONFIG_GROUPS, Path(__file__).parent / "configGroupsResponse.json")
+static_responses.register_file(
+    STATIC_CODE_PUSH_CONFIG,
+    Path(__file__).parent / "codePushConfig.json",
+    lambda data: {"code": 0, "message": "success", "ret": "ok", "data": data},
+)
+
+
 def get_product_iot_map() -> Any:
-    """Get product iot map."""
-    with Path.open(
-        Path(__file__).parent / "productIotMap.json",
-        encoding="utf-8",
-    ) as file:
-        return json.load(file)
+    """Get product iot map, loaded once and shared, so it must not be modified."""
+    return static_responses.data(STATIC_PRODUCT_IOT_MAP)
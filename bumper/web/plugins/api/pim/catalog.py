@@ -0,0 +1,106 @@
+"""Pim product catalog module."""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from bumper.utils import json_codec
+
+from . import get_product_iot_map
+
+_DEFAULT_SCODE: dict[str, bool] = {
+    "tmallstand": False,
+    "video": False,
+    "battery": True,
+    "clean": True,
+    "charge": True,
+    "chargestate": True,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Product:
+    """Product of the catalog with the values prepared for the device list.
+
+    The dicts are shared between all device entries and must not be modified.
+    """
+
+    classid: str
+    pid: str | None
+    device_fields: dict[str, Any]
+    scode: dict[str, bool]
+
+
+class ProductCatalog:
+    """Immutable product catalog indexed by class id and product id."""
+
+    def __init__(self, product_iot_map: Iterable[dict[str, Any]], product_config_batch: Iterable[dict[str, Any]]) -> None:
+        """Build the catalog indexes."""
+        configs: dict[str, dict[str, Any]] = {}
+        for product_config in product_config_batch:
+            configs.setdefault(product_config.get("pid", ""), product_config)
+
+        by_classid: dict[str, Product] = {}
+        by_pid: dict[str, Product] = {}
+        for botprod in product_iot_map:
+            if botprod["classid"] in by_classid:
+                continue  # first entry wins, like the linear scan did
+            product = self._create_product(botprod, configs)
+            by_classid[product.classid] = product
+            if product.pid is not None:
+                by_pid.setdefault(product.pid, product)
+
+        self._by_classid: Mapping[str, Product] = MappingProxyType(by_classid)
+        self._by_pid: Mapping[str, Product] = MappingProxyType(by_pid)
+        self._configs: Mapping[str, dict[str, Any]] = MappingProxyType(configs)
+
+    @classmethod
+    def from_files(cls, product_config_batch_file: Path) -> "ProductCatalog":
+        """Create the catalog from the product iot map and the product config batch file."""
+        with product_config_batch_file.open(encoding="utf-8") as file:
+            return cls(get_product_iot_map(), json_codec.load(file))
+
+    def by_classid(self, classid: str) -> Product | None:
+        """Get product by class id."""
+        return self._by_classid.get(classid)
+
+    def by_pid(self, pid: str) -> Product | None:
+        """Get product by product id."""
+        return self._by_pid.get(pid)
+
+    def config(self, pid: str) -> dict[str, Any] | None:
+        """Get the software config of a product, shared and must not be modified."""
+        return self._configs.get(pid)
+
+    @staticmethod
+    def _create_product(botprod: dict[str, Any], configs: Mapping[str, dict[str, Any]]) -> Product:
+        pid: str | None = None
+        device_fields: dict[str, Any] = {}
+        scode = _DEFAULT_SCODE
+        if (botprod_invent := botprod.get("product")) is not None:
+            pid = botprod_invent["_id"]
+            device_fields = {
+                "pid": pid,
+                "materialNo": botprod_invent["materialNo"],
+                "deviceName": botprod_invent["name"],
+                "model": botprod_invent["model"],
+                "UILogicId": botprod_invent["UILogicId"],
+                "ota": botprod_invent["ota"],
+                "icon": botprod_invent["iconUrl"],
+                "product_category": "DEEBOT" if botprod_invent["name"].startswith("DEEBOT") else "UNKNOWN",
+            }
+            if (product_config := configs.get(pid or "")) is not None:
+                scode = {
+                    "tmallstand": product_config.get("tmallstand", False),
+                    "video": product_config.get("video", False),
+                    "battery": product_config.get("battery", True),
+                    "clean": product_config.get("clean", True),
+                    "charge": product_config.get("charge", True),
+                    "chargestate": product_config.get("", True),
+                }
+        return Product(classid=botprod["classid"], pid=pid, device_fields=device_fields, scode=scode)
+
+
+product_catalog: ProductCatalog = ProductCatalog.from_files(Path(__file__).parent / "productConfigBatch.json")
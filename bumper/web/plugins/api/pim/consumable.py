@@ -12,7 +12,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 from bumper.utils import utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v3
+from bumper.web.response_utils import constant_response, response_success_v3
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +32,7 @@ class ConsumablePlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_get_purchase_url(_: Request) -> Response:
     """Get purchas url."""
     try:
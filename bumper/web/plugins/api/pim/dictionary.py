@@ -7,7 +7,9 @@ from aiohttp.web_request import Request
 from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
+from bumper.utils import json_codec
 from bumper.web.plugins import WebserverPlugin
+from bumper.web.response_utils import constant_response
 
 
 class DictionaryPlugin(WebserverPlugin):
@@ -25,9 +27,10 @@ class DictionaryPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_get_err_detail(_: Request) -> Response:
     """Get error details."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "code": 0,
             "msg": "success",
@@ -9,6 +9,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.web.plugins import WebserverPlugin
+from bumper.web.response_utils import constant_response
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,6 +29,7 @@ class EventDetailPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_eventdetail(_: Request) -> Response:
     """Event Detail."""
     html_content = """
@@ -1,24 +1,23 @@
 """Pim product plugin module."""
 
 from collections.abc import Iterable
-import json
 import logging
-from pathlib import Path
 from typing import Any
 
-import aiofiles
 from aiohttp import web
 from aiohttp.web_exceptions import HTTPInternalServerError
 from aiohttp.web_request import Request
 from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.web.images import get_bot_image
 from bumper.web.plugins import WebserverPlugin
 from bumper.web.response_utils import response_success_v3, response_success_v4
+from bumper.web.static_responses import static_responses
 
-from . import get_product_iot_map
+from . import STATIC_CONFIG_GROUPS, STATIC_CONFIG_NET_ALL, STATIC_PRODUCT_IOT_MAP
+from .catalog import product_catalog
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -63,33 +62,29 @@ class ProductPlugin(WebserverPlugin):
         ]
 
 
-async def _handle_get_product_iot_map(_: Request) -> Response:
+async def _handle_get_product_iot_map(request: Request) -> Response:
     """Get product iot map."""
     try:
-        return response_success_v4(get_product_iot_map())
+        return static_responses.response(request, STATIC_PRODUCT_IOT_MAP)
 
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder(info="during handling request"))
     raise HTTPInternalServerError
 
 
-async def _handle_get_config_net_all(_: Request) -> Response:
+async def _handle_get_config_net_all(request: Request) -> Response:
     """Get config net all."""
     try:
-        async with aiofiles.open(Path(__file__).parent / "configNetAllResponse.json", encoding="utf-8") as file:
-            file_content = await file.read()
-            return web.json_response(json.loads(file_content))
+        return static_responses.response(request, STATIC_CONFIG_NET_ALL)
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder(info="during handling request"))
     raise HTTPInternalServerError
 
 
-async def _handle_get_config_groups(_: Request) -> Response:
+async def _handle_get_config_groups(request: Request) -> Response:
     """Get config groups."""
     try:
-        async with aiofiles.open(Path(__file__).parent / "configGroupsResponse.json", encoding="utf-8") as file:
-            file_content = await file.read()
-            return web.json_response(json.loads(file_content))
+        return static_responses.response(request, STATIC_CONFIG_GROUPS)
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder(info="during handling request"))
     raise HTTPInternalServerError
@@ -98,17 +93,10 @@ async def _handle_get_config_groups(_: Request) -> Response:
 async def _handle_config_batch(request: Request) -> Response:
     """Handle product config batch."""
     try:
-        async with aiofiles.open(Path(__file__).parent / "productConfigBatch.json", encoding="utf-8") as file:
-            file_content = await file.read()
-            product_config_batch: list[dict[str, Any]] = json.loads(file_content)
-
-        # Build a pid -> config dict for fast lookup
-        pid_to_config = {item.get("pid", ""): item for item in product_config_batch}
-
-        json_body = json.loads(await request.text())
-        data = []
+        json_body = json_codec.loads(await request.read())
+        data: list[dict[str, Any]] = []
         for pid in json_body.get("pids", []):
-            if config := pid_to_config.get(pid):
+            if config := product_catalog.config(pid):
                 data.append(config)
             else:
                 # not found in product_config_batch
@@ -123,7 +111,7 @@ async def _handle_config_batch(request: Request) -> Response:
 async def _handle_get_share_info(request: Request) -> Response:
     """Get share info."""
     try:
-        json_body = json.loads(await request.text())
+        json_body = json_codec.loads(await request.read())
         scene = json_body.get("scene")
         _LOGGER.debug(f"Share info :: {scene}")
         return response_success_v4([])
@@ -11,7 +11,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 from bumper.utils import utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v3
+from bumper.web.response_utils import constant_response, response_success_v3
 
 
 class VoicePlugin(WebserverPlugin):
@@ -81,6 +81,7 @@ async def _handle_get(request: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_lanuages(_: Request) -> Response:
     """Get languages."""
     return response_success_v3(data_key="voices", data=_get_voice_list())
@@ -9,7 +9,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.utils import utils
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v3
+from bumper.web.response_utils import constant_response, response_success_v3
 
 
 class RappPlugin(WebserverPlugin):
@@ -37,6 +37,7 @@ class RappPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_map_get(_: Request) -> Response:
     """Map get."""
     return response_success_v3(
@@ -48,6 +49,7 @@ async def _handle_map_get(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_user_data_del(_: Request) -> Response:
     """User data del."""
     return response_success_v3(result_key=None, data=None)
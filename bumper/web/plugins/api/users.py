@@ -1,7 +1,6 @@
 """Users plugin module."""
 
 from collections.abc import Awaitable, Callable, Iterable, Mapping
-import json
 import logging
 from typing import Any
 
@@ -12,7 +11,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.db import bot_repo, client_repo, token_repo, user_repo
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web import auth_util
 from bumper.web.plugins import WebserverPlugin
@@ -45,7 +44,7 @@ async def _handle_user(request: Request) -> Response:
         if request.content_type == "application/x-www-form-urlencoded":
             post_body = await request.post()
         else:
-            post_body = json.loads(await request.text())
+            post_body = json_codec.loads(await request.read())
 
         todo: str = str(post_body.get("todo", ""))
         handler: HandlerFunction | None = _TODO_HANDLERS.get(todo)
@@ -75,9 +74,11 @@ async def _handle_user(request: Request) -> Response:
 async def _handle_find_best(post_body: Mapping[str, Any], _: Request) -> Response | None:
     service = post_body.get("service", "")
     if service == "EcoMsgNew":
-        return web.json_response({"ip": bumper_isc.bumper_announce_ip, "port": bumper_isc.XMPP_LISTEN_PORT_TLS, "result": "ok"})
+        return json_codec.json_response(
+            {"ip": bumper_isc.bumper_announce_ip, "port": bumper_isc.XMPP_LISTEN_PORT_TLS, "result": "ok"},
+        )
     if service == "EcoUpdate":
-        return web.json_response(
+        return json_codec.json_response(
             {"ip": bumper_isc.ECOVACS_UPDATE_SERVER, "port": bumper_isc.ECOVACS_UPDATE_SERVER_PORT, "result": "ok"},
         )
     return None
@@ -86,7 +87,7 @@ async def _handle_find_best(post_body: Mapping[str, Any], _: Request) -> Respons
 async def _handle_login_by_it_token(post_body: Mapping[str, Any], _: Request) -> Response | None:
     if "userId" in post_body:
         if token_repo.verify_it(post_body["userId"], post_body["token"]):
-            return web.json_response(
+            return json_codec.json_response(
                 {
                     "resource": post_body["resource"],
                     "result": "ok",
@@ -98,7 +99,7 @@ async def _handle_login_by_it_token(post_body: Mapping[str, Any], _: Request) ->
     else:
         login_token = token_repo.login_by_it_token(post_body["token"])
         if login_token:
-            return web.json_response(
+            return json_codec.json_response(
                 {
                     "resource": post_body["resource"],
                     "result": "ok",
@@ -115,7 +116,7 @@ async def _handle_get_auth_code(_: Mapping[str, Any], request: Request) -> Respo
 
 
 async def _handle_get_device_list(_: Mapping[str, Any], __: Request) -> Response | None:
-    return web.json_response({"devices": create_device_list(), "result": "ok", "todo": "result"})
+    return json_codec.json_response({"devices": create_device_list(), "result": "ok", "todo": "result"})
 
 
 async def _handle_set_device_nick(post_body: Mapping[str, Any], _: Request) -> Response | None:
@@ -143,7 +144,7 @@ async def _handle_logout(post_body: Mapping[str, Any], __: Request) -> Response
     user_id: str = post_body["userId"]
     user_repo.remove(user_id)
     client_repo.remove(user_id)
-    return web.json_response({"todo": "result", "result": "ok"})
+    return json_codec.json_response({"todo": "result", "result": "ok"})
 
 
 # ----------- Mapping -----------
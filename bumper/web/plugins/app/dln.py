@@ -11,7 +11,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.db import bot_repo, clean_log_repo
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.web.plugins import WebserverPlugin
 from bumper.web.response_utils import response_success_v3
 
@@ -66,7 +66,7 @@ async def _handle_clean_result_list(request: Request) -> Response:
 
 async def _handle_clean_result_del(request: Request) -> Response:
     """Clean result delete."""
-    json_data: dict[str, Any] = await request.json()
+    json_data: dict[str, Any] = json_codec.loads(await request.read())
     log_ids: list[str] = json_data.get("logIds", [])
     for log_id in log_ids:
         clean_log_repo.remove_by_id(log_id)
@@ -10,6 +10,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.web.images import get_bot_image
 from bumper.web.plugins import WebserverPlugin
+from bumper.web.response_utils import constant_response
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ class EventDetailPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_base_station_guide_newton_curi(_: Request) -> Response:
     """Handle Base station guide newton curi."""
     html_content = """
@@ -8,7 +8,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -33,5 +33,6 @@ class AdPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle(_: Request) -> Response:
     return response_success_v1(None)
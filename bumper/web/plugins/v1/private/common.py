@@ -2,7 +2,6 @@
 
 import base64
 from collections.abc import Iterable
-import json
 import logging
 from pathlib import Path
 
@@ -17,10 +16,10 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 
 from bumper.db import user_repo
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -102,6 +101,7 @@ class CommonPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_check_version(_: Request) -> Response:
     """Check version."""
     return response_success_v1(
@@ -117,6 +117,7 @@ async def _handle_check_version(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_check_app_version(_: Request) -> Response:
     """Check app version."""
     return response_success_v1(
@@ -134,11 +135,13 @@ async def _handle_check_app_version(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_upload_device_info(_: Request) -> Response:
     """Upload device info."""
     return response_success_v1({"devicePushRegisterResult": "N"})
 
 
+@constant_response
 async def _handle_get_system_reminder(_: Request) -> Response:
     """Get system reminder."""
     return response_success_v1(
@@ -164,22 +167,22 @@ async def _handle_get_config(request: Request) -> Response:
                 cert = x509.load_pem_x509_certificate(cert_data, default_backend())
                 public_key = cert.public_key().public_bytes(encoding=Encoding.DER, format=PublicFormat.SubjectPublicKeyInfo)
                 base64_encoded_public_key = base64.b64encode(public_key).decode("utf-8")
-                data.append({"key": key, "value": json.dumps({"publicKey": base64_encoded_public_key})})
+                data.append({"key": key, "value": json_codec.dumps({"publicKey": base64_encoded_public_key})})
 
             elif key == "EMAIL.REGISTER.CONFIG":
-                data.append({"key": key, "value": json.dumps({"needVerify": "N"})})
+                data.append({"key": key, "value": json_codec.dumps({"needVerify": "N"})})
             elif key == "OPEN.APP.CERTIFICATE.CONFIG":
-                data.append({"key": key, "value": json.dumps({"ISO27001": "ENABLED", "TUV": "ENABLED"})})
-                # data.append({"key": key, "value": json.dumps({"ISO27001": "DISABLED", "TUV": "DISABLED"})})
+                data.append({"key": key, "value": json_codec.dumps({"ISO27001": "ENABLED", "TUV": "ENABLED"})})
+                # data.append({"key": key, "value": json_codec.dumps({"ISO27001": "DISABLED", "TUV": "DISABLED"})})
             elif key == "USER.DATA.COLLECTION":
                 data.append({"key": key, "value": "N"})
             elif key == "USER.DEVICE.LIST.CONFIG":
-                data.append({"key": key, "value": json.dumps({"showFlag": "N"})})
+                data.append({"key": key, "value": json_codec.dumps({"showFlag": "N"})})
             elif key == "PRIVACY.CONFIG":
                 data.append(
                     {
                         "key": key,
-                        "value": json.dumps(
+                        "value": json_codec.dumps(
                             [
                                 {"key": "PERSONAL_INFO_SHARING", "status": "DISABLED", "url": ""},
                                 {"key": "THIRD_PARTY_SDK", "status": "DISABLED", "url": ""},
@@ -221,22 +224,25 @@ async def _handle_get_user_config(request: Request) -> Response:
     raise HTTPInternalServerError
 
 
+@constant_response
 async def _handle_get_areas(_: Request) -> Response:
     """Get Areas."""
     try:
         async with aiofiles.open(Path(__file__).parent / "common_area.json", encoding="utf-8") as file:
             file_content = await file.read()
-            return response_success_v1(json.loads(file_content))
+            return response_success_v1(json_codec.loads(file_content))
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder(info="during handling request"))
     raise HTTPInternalServerError
 
 
+@constant_response
 async def _handle_common_get_area_support_service(_: Request) -> Response:
     """Get Area Support Service."""
     return response_success_v1({"isSelfHelpRepair": "N"})
 
 
+@constant_response
 async def _handle_get_agreement_url_batch(_: Request) -> Response:
     """Get agreement url batch."""
     domain = f"https://{bumper_isc.DOMAIN_SEC3}/content/agreement"
@@ -274,11 +280,13 @@ async def _handle_get_timestamp(_: Request) -> Response:
     return response_success_v1({"timestamp": time}, time)
 
 
+@constant_response
 async def _handle_get_about_brief_item(_: Request) -> Response:
     """Get about brief item."""
     return response_success_v1([])
 
 
+@constant_response
 async def _handle_get_bottom_navigate_info_list(_: Request) -> Response:
     """Get bottom navigation info list."""
     domain_01 = f"https://{bumper_isc.DOMAIN_SEC2}/upload/global"
@@ -328,6 +336,7 @@ async def _handle_get_bottom_navigate_info_list(_: Request) -> Response:
     )
 
 
+@constant_response
 async def handle_get_current_area_support_service_info(_: Request) -> Response:
     """Get current area support service info."""
     return response_success_v1(
@@ -9,7 +9,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -34,6 +34,7 @@ class HelpPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_get_help_index(_: Request) -> Response:
     """Get help index."""
     return response_success_v1(
@@ -109,6 +110,7 @@ async def _handle_get_help_index(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_product_help_index(_: Request) -> Response:
     """Get product help index."""
     url_01 = f"https://{bumper_isc.DOMAIN_SEC3}/product/faq?faqId=20230428010042_1bc8d9bd2ee5a7e7b7956654db4062b0&lang=EN"
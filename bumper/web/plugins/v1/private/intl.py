@@ -13,7 +13,7 @@ from bumper.db import user_repo
 from bumper.utils import utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -89,6 +89,7 @@ async def _handle_basic_info(request: Request) -> Response:
     raise HTTPInternalServerError
 
 
+@constant_response
 async def _handle_sign_status(_: Request) -> Response:
     """Sign. status."""
     return response_success_v1({"signStatus": "SIGN"})
@@ -8,7 +8,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -33,11 +33,13 @@ class MessagePlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_has_unread_message(_: Request) -> Response:
     """Has unread message."""
     return response_success_v1("N")
 
 
+@constant_response
 async def _handle_get_msg_list(_: Request) -> Response:
     """Get msg list."""
     return response_success_v1({"hasNextPage": 0, "items": []})
@@ -9,7 +9,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -105,6 +105,7 @@ async def _handle_get_country_config(request: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_layout(_: Request) -> Response:
     """Get layout."""
     return response_success_v1(
@@ -126,6 +127,7 @@ async def _handle_get_layout(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_banner_list(_: Request) -> Response:
     """Get banner list."""
     domain = f"https://{bumper_isc.DOMAIN_SEC2}/upload/global"
@@ -179,6 +181,7 @@ async def _handle_get_banner_list(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_goods_category(_: Request) -> Response:
     """Get goods category."""
     domain = f"https://{bumper_isc.DOMAIN_SEC2}/upload/global"
@@ -225,36 +228,43 @@ async def _handle_get_goods_category(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_conf_net_robot_parts_goods(_: Request) -> Response:
     """Get conf net robot pars goods."""
     return response_success_v1({})
 
 
+@constant_response
 async def _handle_get_recommend_goods(_: Request) -> Response:
     """Get recommend goods."""
     return response_success_v1({"goodsList": [], "materialNo": None, "mid": None, "nickName": None})
 
 
+@constant_response
 async def _handle_get_user_center_coupon_list(_: Request) -> Response:
     """Get user center coupon list."""
     return response_success_v1([])
 
 
+@constant_response
 async def _handle_get_my_coupon(_: Request) -> Response:
     """Get my coupon."""
     return response_success_v1({"available": [], "used": [], "invalidated": []})
 
 
+@constant_response
 async def _handle_get_customer_coupon_send_activity_coupon(_: Request) -> Response:
     """Get customer coupon send activity coupon."""
     return response_success_v1([])
 
 
+@constant_response
 async def _handle_get_count(_: Request) -> Response:
     """Get count."""
     return response_success_v1({"item_count": 0.0})
 
 
+@constant_response
 async def _handle_order_list(_: Request) -> Response:
     """Order list."""
     return response_success_v1(
@@ -270,16 +280,19 @@ async def _handle_order_list(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_material_accessory_list(_: Request) -> Response:
     """Material accessory list."""
     return response_success_v1([])
 
 
+@constant_response
 async def _handle_v2_get_benefits(_: Request) -> Response:
     """Get benefits."""
     return response_success_v1([])
 
 
+@constant_response
 async def _handle_v2_payment_icon_index(_: Request) -> Response:
     """Payment icon index."""
     return response_success_v1([])
@@ -8,7 +8,7 @@ from aiohttp.web_response import Response
 from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -28,6 +28,7 @@ class ShopPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_get_cn_wap_shop_config(_: Request) -> Response:
     """Get cn wap shop config."""
     return response_success_v1(
@@ -14,7 +14,7 @@ from bumper.utils import utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web import auth_util
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -193,6 +193,7 @@ async def _handle_check_agreement(request: Request) -> Response:
     return response_success_v1(data)
 
 
+@constant_response
 async def handle_check_agreement_batch(_: Request) -> Response:
     """Check agreement batch."""
     return response_success_v1(
@@ -223,6 +224,7 @@ async def handle_check_agreement_batch(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_user_menu_info(_: Request) -> Response:
     """Get user menu info."""
     domain = f"https://{bumper_isc.DOMAIN_SEC2}/upload/global"
@@ -284,6 +286,7 @@ async def _handle_get_user_menu_info(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_get_my_user_menu_info(_: Request) -> Response:
     """Get my user menu info."""
     domain = f"https://{bumper_isc.DOMAIN_SEC2}/upload/global"
@@ -343,11 +346,13 @@ async def _handle_get_my_user_menu_info(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_change_area(_: Request) -> Response:
     """Change area."""
     return response_success_v1({"isNeedReLogin": "N"})
 
 
+@constant_response
 async def _handle_accept_agreement_batch(_: Request) -> Response:
     """Accept agreement batch."""
     return response_success_v1(None)
@@ -9,7 +9,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.utils import utils
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -39,6 +39,7 @@ class UserSettingPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_get_suggestion_setting(_: Request) -> Response:
     """Get suggestion setting."""
     activity_sub_title = "Allow to receive notification including membership benefits, product and consumable recommendations."
@@ -87,6 +88,7 @@ async def _handle_get_suggestion_setting(_: Request) -> Response:
     )
 
 
+@constant_response
 async def handle_get_msg_receive_setting(_: Request) -> Response:
     """Get msg receive setting."""
     return response_success_v1(
@@ -11,7 +11,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
 from bumper.web.plugins.v1.private.common import handle_get_current_area_support_service_info
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -43,6 +43,7 @@ class CommonPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def handle_get_bottom_navigate_info_list(_: Request) -> Response:
     """Get bottom navigation info list."""
     domain = f"https://{bumper_isc.DOMAIN_SEC2}/upload/global"
@@ -120,5 +121,6 @@ async def handle_get_bottom_navigate_info_list(_: Request) -> Response:
     )
 
 
+@constant_response
 async def _handle_yiko_basic_setting(_: Request) -> Response:
     return response_success_v1(None)
@@ -9,7 +9,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.web.plugins import WebserverPlugin
 from bumper.web.plugins.v1.private.member import handle_get_exp_by_scene
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -34,6 +34,7 @@ class MemberPlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_get_bind_benefit(_: Request) -> Response:
     """Get bind benefit."""
     return response_success_v1({"completeList": []})
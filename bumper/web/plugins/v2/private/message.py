@@ -9,7 +9,7 @@ from aiohttp.web_routedef import AbstractRouteDef
 
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.plugins import WebserverPlugin
-from bumper.web.response_utils import response_success_v1
+from bumper.web.response_utils import constant_response, response_success_v1
 
 from . import BASE_URL
 
@@ -39,16 +39,19 @@ class MessagePlugin(WebserverPlugin):
         ]
 
 
+@constant_response
 async def _handle_has_more_unread_message(_: Request) -> Response:
     """Has more unread message."""
     return response_success_v1({"moreUnReadMsg": "N"})
 
 
+@constant_response
 async def _handle_waterfall_flow(_: Request) -> Response:
     """Message waterfall flow."""
     return response_success_v1({"list": []})
 
 
+@constant_response
 async def _handle_module_configuration(_: Request) -> Response:
     """Message module configuration."""
     domain = f"https://{bumper_isc.DOMAIN_SEC2}/upload/global"
@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
+import functools
 from typing import TYPE_CHECKING, Any
 
 from aiohttp import web
+from multidict import CIMultiDict, CIMultiDictProxy
 
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from aiohttp.web_request import Request
     from aiohttp.web_response import Response
 
 # ******************************************************************************
@@ -61,7 +67,7 @@ API_ERRORS: dict[str, str] = {
 
 def response_success_v1(data: Any, time: int = utils.get_current_time_as_millis()) -> Response:
     """Get success response with provided data."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "code": RETURN_API_SUCCESS,
             "data": data,
@@ -88,7 +94,7 @@ def response_success_v2(
         payload[data_key] = data
     if code is not None:
         payload["code"] = code
-    return web.json_response(payload)
+    return json_codec.json_response(payload)
 
 
 def response_success_v3(
@@ -112,12 +118,12 @@ def response_success_v3(
         payload[data_key] = data
     if include_success:
         payload["success"] = True
-    return web.json_response(payload)
+    return json_codec.json_response(payload)
 
 
 def response_success_v4(data: Any, code: int = 0, data_key: str = "data") -> Response:
     """Response success v4."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "code": code,
             data_key: data,
@@ -130,7 +136,7 @@ def response_success_v4(data: Any, code: int = 0, data_key: str = "data") -> Res
 
 def response_error_v1(msg: str = "Parameter error. Please try again later", code: str = ERR_COMMON) -> Response:
     """Response error v1."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "code": code,
             "msg": msg,
@@ -141,7 +147,7 @@ def response_error_v1(msg: str = "Parameter error. Please try again later", code
 
 def response_error_v2(msg: str = "Parameter error. Please try again later", code: str = ERR_COMMON) -> Response:
     """Response error v2."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "errno": code,
             "error": msg,
@@ -153,7 +159,7 @@ def response_error_v2(msg: str = "Parameter error. Please try again later", code
 
 def response_error_v3(msg: str = "Parameter error. Please try again later", code: str = ERR_COMMON) -> Response:
     """Response error v3."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "errno": code,
             "error": msg,
@@ -165,7 +171,7 @@ def response_error_v3(msg: str = "Parameter error. Please try again later", code
 
 def response_error_v4(msg: str = "Parameter error. Please try again later") -> Response:
     """Response error v4."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "todo": "result",
             "ret": "fail",
@@ -176,7 +182,7 @@ def response_error_v4(msg: str = "Parameter error. Please try again later") -> R
 
 def response_error_v5() -> Response:
     """Response error v5."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "todo": "result",
             "ret": "fail",
@@ -189,7 +195,7 @@ def response_error_v5() -> Response:
 
 def response_error_v6(debug: str, error: str = "Error request, unknown todo") -> Response:
     """Response error v6."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "todo": "result",
             "result": "fail",
@@ -202,7 +208,7 @@ def response_error_v6(debug: str, error: str = "Error request, unknown todo") ->
 
 def response_error_v7(errno: int = 1, error: str = "unknown") -> Response:
     """Response error v7."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "ret": "fail",
             "errno": errno,
@@ -213,7 +219,7 @@ def response_error_v7(errno: int = 1, error: str = "unknown") -> Response:
 
 def response_error_v8(request_id: str, error: str) -> Response:
     """Response error v8."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "id": request_id,
             "errno": 500,
@@ -225,7 +231,7 @@ def response_error_v8(request_id: str, error: str) -> Response:
 
 def response_error_v9(msg: str = "Expired user login", code: str = ERR_TOKEN_INVALID) -> Response:
     """Response error v9."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "code": code,
             "msg": msg,
@@ -234,3 +240,60 @@ def response_error_v9(msg: str = "Expired user login", code: str = ERR_TOKEN_INV
             "success": False,
         },
     )
+
+
+# ******************************************************************************
+
+CONSTANT_RESPONSE_TIME_KEY = "time"
+_TIME_PLACEHOLDER = "\x00time\x00"
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedResponse:
+    """Encoded response, the current time in milliseconds is inserted between the body parts."""
+
+    status: int
+    reason: str
+    headers: CIMultiDictProxy[str]
+    body_parts: tuple[bytes, ...]
+
+    @classmethod
+    def from_response(cls, response: Response) -> EncodedResponse | None:
+        """Encode a response, a top level `time` field of a json body is templated, None if the body is no bytes."""
+        if not isinstance(response.body, bytes):
+            return None
+        body_parts: tuple[bytes, ...] = (response.body,)
+        if response.content_type == json_codec.CONTENT_TYPE_JSON:
+            data = json_codec.loads(response.body)
+            if isinstance(data, dict) and CONSTANT_RESPONSE_TIME_KEY in data:
+                data[CONSTANT_RESPONSE_TIME_KEY] = _TIME_PLACEHOLDER
+                body_parts = tuple(json_codec.dumpb(data).split(json_codec.dumpb(_TIME_PLACEHOLDER)))
+        return cls(response.status, response.reason, CIMultiDictProxy(CIMultiDict(response.headers)), body_parts)
+
+    def response(self) -> Response:
+        """Create a new response from the encoded one."""
+        if len(self.body_parts) == 1:
+            body = self.body_parts[0]
+        else:
+            body = (b"%d" % utils.get_current_time_as_millis()).join(self.body_parts)
+        return web.Response(body=body, status=self.status, reason=self.reason, headers=self.headers)
+
+
+def constant_response(handler: Callable[[Request], Awaitable[Response]]) -> Callable[[Request], Awaitable[Response]]:
+    """Serve the response of a handler, which does not depend on the request, from the encoded bytes.
+
+    The handler is called on the first request only, all following requests get a copy of the encoded response with the
+    current `time`.
+    """
+    encoded: EncodedResponse | None = None
+
+    @functools.wraps(handler)
+    async def _handle(request: Request) -> Response:
+        nonlocal encoded
+        if encoded is None:
+            response = await handler(request)
+            if (encoded := EncodedResponse.from_response(response)) is None:
+                return response
+        return encoded.response()
+
+    return _handle
@@ -1,15 +1,15 @@
 """Web server module."""
 
 import asyncio
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
+import contextlib
 import dataclasses
 from importlib.resources import files
 import logging
 from pathlib import Path
-import ssl
 from typing import TYPE_CHECKING, Any
 
-from aiohttp import ClientSession, TCPConnector, web
+from aiohttp import hdrs, web
 from aiohttp.web_exceptions import HTTPInternalServerError
 from aiohttp.web_request import Request
 from aiohttp.web_response import Response
@@ -18,9 +18,15 @@ import jinja2
 from yarl import URL
 
 from bumper.db import bot_repo, client_repo, user_repo
-from bumper.utils import utils
-from bumper.utils.settings import config as bumper_isc
+from bumper.mqtt import proxy as mqtt_proxy
+from bumper.utils import json_codec, utils
+from bumper.utils.api_coverage import api_coverage
+from bumper.utils.dns_cache import dns_resolver
+from bumper.utils.readiness import Readiness
+from bumper.utils.settings import config as bumper_isc, str_to_bool
+from bumper.utils.tls_context import tls_provider
 from bumper.web import middlewares, plugins, single_paths
+from bumper.web.upstream import STREAM_CHUNK_SIZE, BodyPreview, forward_headers, upstream_client
 
 if TYPE_CHECKING:
     from bumper.web.models import BumperUser, VacBotClient, VacBotDevice
@@ -44,8 +50,9 @@ class WebServer:
     def __init__(self, bindings: list[WebserverBinding] | WebserverBinding, proxy_mode: bool) -> None:
         """Web Server init."""
         self._runners: list[web.AppRunner] = []
+        self.readiness = Readiness()
         self._bindings = [bindings] if isinstance(bindings, WebserverBinding) else bindings
-        self._app = web.Application(middlewares=[middlewares.log_all_requests])
+        self._app = web.Application(middlewares=[middlewares.log_all_requests, middlewares.compress_response])
 
         templates_path = self._resolve_path("templates")
         static_path = self._resolve_path("static")
@@ -72,6 +79,9 @@ class WebServer:
             web.get("/client/remove/{userid}", self._handle_remove_entity("client")),
             web.get("/users", self._handle_partial("users")),
             web.get("/user/remove/{userid}", self._handle_remove_entity("user")),
+            web.get("/api-coverage", self._handle_api_coverage),
+            web.get("/helperbot-stats", self._handle_helperbot_stats),
+            web.get("/proxy-stats", self._handle_proxy_stats),
         ]
         if proxy_mode is True:
             routes.append(web.route("*", "/{path:.*}", self._handle_proxy))
@@ -104,20 +114,15 @@ class WebServer:
                 self._runners.append(runner)
                 await runner.setup()
 
-                ssl_ctx: ssl.SSLContext | None = None
-                if binding.use_ssl:
-                    ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-                    ssl_ctx.load_cert_chain(bumper_isc.server_cert, bumper_isc.server_key)
-                    ssl_ctx.load_verify_locations(cafile=bumper_isc.ca_cert)
-
                 site = web.TCPSite(
                     runner,
                     host=binding.host,
                     port=binding.port,
-                    ssl_context=ssl_ctx,
+                    ssl_context=tls_provider.server_context() if binding.use_ssl else None,
                 )
 
                 await site.start()
+            self.readiness.set_ready()
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder())
             raise
@@ -126,10 +131,14 @@ class WebServer:
         """Shutdown server."""
         try:
             _LOGGER.info("Shutting down Web Server...")
+            # Cleanup also stops the sites, so the ports are free for a restart
             for runner in self._runners:
-                await runner.shutdown()
+                await runner.cleanup()
             self._runners.clear()
+            self.readiness.set_stopped()
             await self._app.shutdown()
+            await upstream_client.close()
+            middlewares.request_log_writer.stop()
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder())
             raise
@@ -188,6 +197,8 @@ class WebServer:
                         "clients": [client.to_dict() for client in bumper_isc.xmpp_server.clients]
                         if bumper_isc.xmpp_server
                         else [],
+                        "connections": bumper_isc.xmpp_server.connection_count if bumper_isc.xmpp_server else 0,
+                        "memory_per_connection": bumper_isc.xmpp_server.memory_per_connection() if bumper_isc.xmpp_server else 0,
                     },
                 },
                 "helperbot": {
@@ -253,22 +264,48 @@ class WebServer:
             _LOGGER.exception("Failed to serve favicon.ico")
             raise HTTPInternalServerError from e
 
+    async def _handle_api_coverage(self, request: Request) -> Response:
+        """Serve the hit counters of implemented and unknown api paths, reset them with `?reset=true`."""
+        stats = api_coverage.stats()
+        if str_to_bool(request.query.get("reset")):
+            api_coverage.reset()
+        return json_codec.json_response(stats)
+
+    async def _handle_helperbot_stats(self, _: Request) -> Response:
+        """Serve the command counters and the latency per bot class and command of the helper bot."""
+        if bumper_isc.mqtt_helperbot is None:
+            return json_codec.json_response({"commands": {}, "latency": {}})
+        return json_codec.json_response(
+            {"commands": bumper_isc.mqtt_helperbot.stats(), "latency": bumper_isc.mqtt_helperbot.latency.stats()},
+        )
+
+    async def _handle_proxy_stats(self, _: Request) -> Response:
+        """Serve the counters of the web and mqtt proxy, their upstream connections and the dns cache."""
+        return json_codec.json_response(
+            {
+                **upstream_client.stats(),
+                "dns": dns_resolver.stats(),
+                "mqtt_pool": mqtt_proxy.proxy_pool.stats(),
+                "mqtt_forward": mqtt_proxy.forward_stats(),
+            },
+        )
+
     async def _handle_restart_service(self, request: Request) -> Response:
         try:
             service = request.match_info.get("service", "")
             if service == "Helperbot":
                 await self._restart_helper_bot()
-                return web.json_response({"status": "complete"})
+                return json_codec.json_response({"status": "complete"})
             if service == "MQTTServer":
                 if await self._restart_mqtt_server():
                     await self._restart_helper_bot()
-                    return web.json_response({"status": "complete"})
-                return web.json_response({"status": "failed"})
+                    return json_codec.json_response({"status": "complete"})
+                return json_codec.json_response({"status": "failed"})
             if service == "XMPPServer" and bumper_isc.xmpp_server is not None:
                 await bumper_isc.xmpp_server.disconnect()
                 await bumper_isc.xmpp_server.start_async_server()
-                return web.json_response({"status": "complete"})
-            return web.json_response({"status": "invalid service"})
+                return json_codec.json_response({"status": "complete"})
+            return json_codec.json_response({"status": "invalid service"})
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder())
         raise HTTPInternalServerError
@@ -276,15 +313,19 @@ class WebServer:
     async def _restart_mqtt_server(self) -> bool:
         if bumper_isc.mqtt_server is not None:
             _LOGGER.info("Restarting MQTT Server...")
-            await bumper_isc.mqtt_server.shutdown()
-            await bumper_isc.mqtt_server.wait_for_state_change(["stopped"], reverse=True)
-            if bumper_isc.mqtt_server.state != "stopped":
+            try:
+                async with asyncio.timeout(bumper_isc.SERVICE_START_TIMEOUT):
+                    await bumper_isc.mqtt_server.shutdown()
+                    await bumper_isc.mqtt_server.readiness.wait_stopped()
+            except TimeoutError:
                 _LOGGER.warning("MQTT Server failed to stop")
                 return False
             await bumper_isc.mqtt_server.start()
-            await bumper_isc.mqtt_server.wait_for_state_change(["started"], reverse=True)
 
-            if bumper_isc.mqtt_server.state == "started":
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(bumper_isc.SERVICE_START_TIMEOUT):
+                    await bumper_isc.mqtt_server.readiness.wait_ready()
+            if bumper_isc.mqtt_server.readiness.is_ready:
                 _LOGGER.info("MQTT Server restarted successfully")
                 return True
         _LOGGER.warning("MQTT Server failed to restart")
@@ -317,16 +358,17 @@ class WebServer:
                 if entity_id and remove_func and get_func:
                     remove_func(entity_id)
                     if get_func(entity_id):
-                        return web.json_response({"status": f"failed to remove {entity_type}"})
-                    return web.json_response({"status": f"successfully removed {entity_type}"})
-                return web.json_response({"status": f"not implemented for {entity_type}"})
+                        return json_codec.json_response({"status": f"failed to remove {entity_type}"})
+                    return json_codec.json_response({"status": f"successfully removed {entity_type}"})
+                return json_codec.json_response({"status": f"not implemented for {entity_type}"})
             except Exception:
                 _LOGGER.exception(utils.default_exception_str_builder())
             raise HTTPInternalServerError
 
         return handler
 
-    async def _handle_proxy(self, request: Request) -> Response:
+    async def _handle_proxy(self, request: Request) -> web.StreamResponse:
+        """Forward the request to Ecovacs and stream the request and the response body chunk by chunk."""
         try:
             if request.raw_path == "/":
                 return await self._handle_base(request)
@@ -334,43 +376,32 @@ class WebServer:
                 return await single_paths.handle_lookup(request)
                 # use bumper to handle lookup so bot gets Bumper IP and not Ecovacs
 
-            async with ClientSession(
-                headers=request.headers,
-                connector=TCPConnector(verify_ssl=False, resolver=utils.get_resolver_with_public_nameserver()),
-            ) as session:
-                data: Any = None
-                json_data: Any = None
-                if request.content.total_bytes > 0:
-                    read_body = await request.read()
-                    _LOGGER_PROXY.info(
-                        f"HTTP Proxy Request to EcoVacs (body=true) (URL:{request.url}) :: {read_body.decode('utf-8')}",
-                    )
-                    if request.content_type == "application/x-www-form-urlencoded":
-                        # android apps use form
-                        data = await request.post()
-                    else:
-                        # handle json
-                        json_data = await request.json()
-
-                else:
-                    _LOGGER_PROXY.info(f"HTTP Proxy Request to EcoVacs (body=false) (URL:{request.url})")
-
-                # Validate and sanitize user-provided input
-                validated_url = self._validate_and_sanitize_url(request.url)
-
-                async with session.request(request.method, validated_url, data=data, json=json_data) as resp:
-                    if resp.content_type == "application/octet-stream":
-                        _LOGGER_PROXY.info(
-                            f"HTTP Proxy Response from EcoVacs (URL: {request.url})"
-                            f" :: (Status: {resp.status}) :: <BYTES CONTENT>",
-                        )
-                        return web.Response(body=await resp.read())
-
-                    response = await resp.text()
-                    _LOGGER_PROXY.info(
-                        f"HTTP Proxy Response from EcoVacs (URL: {request.url}) :: (Status: {resp.status}) :: {response}",
-                    )
-                    return web.Response(text=response)
+            # Validate and sanitize user-provided input
+            validated_url = self._validate_and_sanitize_url(request.url)
+            _LOGGER_PROXY.info(f"HTTP Proxy Request to EcoVacs (body={str(request.body_exists).lower()}) (URL:{request.url})")
+
+            async with upstream_client.session().request(
+                request.method,
+                validated_url,
+                headers=forward_headers(request.headers),
+                data=self._stream_proxy_request_body(request) if request.body_exists else None,
+                auto_decompress=False,
+            ) as resp:
+                response = web.StreamResponse(status=resp.status, reason=resp.reason, headers=forward_headers(resp.headers))
+                await response.prepare(request)
+                preview = BodyPreview()
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    preview.feed(chunk)
+                    await response.write(chunk)
+                await response.write_eof()
+
+                body_log = str(preview)
+                if resp.content_type == "application/octet-stream" or hdrs.CONTENT_ENCODING in resp.headers:
+                    body_log = f"<BYTES CONTENT> ({preview.size} bytes)"
+                _LOGGER_PROXY.info(
+                    f"HTTP Proxy Response from EcoVacs (URL: {request.url}) :: (Status: {resp.status}) :: {body_log}",
+                )
+                return response
         except asyncio.CancelledError:
             _LOGGER_PROXY.exception(f"Request cancelled or timeout :: {request.url}", exc_info=True)
             raise
@@ -378,6 +409,20 @@ class WebServer:
             _LOGGER_PROXY.exception(utils.default_exception_str_builder(info="during proxy the request"), exc_info=True)
         raise HTTPInternalServerError
 
+    async def _stream_proxy_request_body(self, request: Request) -> AsyncIterator[bytes]:
+        """Stream the request body to Ecovacs and log its first bytes."""
+        preview = BodyPreview()
+        if request.content.at_eof():
+            # body was already read, e.g. by the request logging
+            body = await request.read()
+            preview.feed(body)
+            yield body
+        else:
+            async for chunk in request.content.iter_chunked(STREAM_CHUNK_SIZE):
+                preview.feed(chunk)
+                yield chunk
+        _LOGGER_PROXY.info(f"HTTP Proxy Request body to EcoVacs (URL:{request.url}) :: {preview}")
+
     def _validate_and_sanitize_url(self, url: URL) -> str:
         # Perform URL validation and sanitization here
         # For example, you can check if the URL is in an allowed list
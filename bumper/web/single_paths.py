@@ -2,7 +2,6 @@
 
 import base64
 import gzip
-import json
 import logging
 
 from aiohttp import web
@@ -10,10 +9,10 @@ from aiohttp.web_exceptions import HTTPInternalServerError
 from aiohttp.web_request import Request
 from aiohttp.web_response import Response
 
-from bumper.utils import utils
+from bumper.utils import json_codec, utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.auth_util import get_new_auth
-from bumper.web.response_utils import ERR_UNKNOWN_TODO, response_error_v2, response_success_v3
+from bumper.web.response_utils import ERR_UNKNOWN_TODO, constant_response, response_error_v2, response_success_v3
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,7 +20,7 @@ _LOGGER = logging.getLogger(__name__)
 async def handle_new_auth(request: Request) -> Response:
     """Handle new auth (/newauth.do)."""
     try:
-        post_body = json.loads(await request.text())
+        post_body = json_codec.loads(await request.read())
 
         todo = post_body.get("todo", "")
         if todo == "OLoginByITToken":
@@ -40,7 +39,7 @@ async def handle_lookup(request: Request) -> Response:
         if request.content_type == "application/x-www-form-urlencoded":
             post_body = await request.post()
         else:
-            post_body = json.loads(await request.text())
+            post_body = json_codec.loads(await request.read())
 
         todo = post_body.get("todo", "")
         if todo == "FindBest":
@@ -49,28 +48,27 @@ async def handle_lookup(request: Request) -> Response:
                 srv_ip = bumper_isc.bumper_announce_ip
                 srv_port = bumper_isc.XMPP_LISTEN_PORT_TLS
                 _LOGGER.info(f"Announcing EcoMsgNew Server to bot as: {srv_ip}:{srv_port}")
-                server = json.dumps({"ip": srv_ip, "port": srv_port, "result": "ok"})
-                # NOTE: bot seems to be very picky about having no spaces, only way was with text
-                server = server.replace(" ", "")
-                return web.json_response(text=server)
+                # NOTE: bot seems to be very picky about having no spaces, the json codec encodes without them
+                return json_codec.json_response({"ip": srv_ip, "port": srv_port, "result": "ok"})
             if service == "EcoUpdate":
                 srv_ip = bumper_isc.ECOVACS_UPDATE_SERVER
                 srv_port = bumper_isc.ECOVACS_UPDATE_SERVER_PORT
                 _LOGGER.info(f"Announcing EcoUpdate Server to bot as: {srv_ip}:{srv_port}")
-                return web.json_response({"result": "ok", "ip": srv_ip, "port": srv_port})
+                return json_codec.json_response({"result": "ok", "ip": srv_ip, "port": srv_port})
             _LOGGER.warning(f"service is not know :: {service!s}")
         _LOGGER.warning(f"todo is not know :: {todo!s}")
 
-        return web.json_response({})
+        return json_codec.json_response({})
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder())
     raise HTTPInternalServerError
 
 
+@constant_response
 async def handle_config_android_conf(_: Request) -> Response:
     """Handle config android conf (/config/Android.conf)."""
     try:
-        return web.json_response(
+        return json_codec.json_response(
             {
                 "v": "v1",
                 "configs": {"disableSDK": False, "disableDebugMode": False},
@@ -81,10 +79,11 @@ async def handle_config_android_conf(_: Request) -> Response:
     raise HTTPInternalServerError
 
 
+@constant_response
 async def handle_data_collect(_: Request) -> Response:
     """Handle data collect (/data_collect/upload/generalData)."""
     try:
-        return web.json_response(None)
+        return json_codec.json_response(None)
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder())
     raise HTTPInternalServerError
@@ -97,7 +96,7 @@ async def handle_sa(request: Request) -> Response:
             if request.content_type == "application/x-www-form-urlencoded":
                 post_body = await request.post()
             else:
-                post_body = json.loads(await request.text())
+                post_body = json_codec.loads(await request.read())
 
             post_body_gzip = str(post_body.get("gzip", 0))
             data_list = post_body.get("data_list")
@@ -105,12 +104,13 @@ async def handle_sa(request: Request) -> Response:
                 decoded_data = base64.b64decode(data_list)
                 decompressed_data = gzip.decompress(decoded_data).decode("utf-8")
                 _LOGGER.info(decompressed_data)
-        return web.json_response(None)
+        return json_codec.json_response(None)
     except Exception:
         _LOGGER.exception(utils.default_exception_str_builder())
     raise HTTPInternalServerError
 
 
+@constant_response
 async def handle_codepush_report_status_deploy(_: Request) -> Response:
     """Codepush Report Status Deploy (/v0.1/public/codepush/report_status/deploy)."""
     return response_success_v3(result_key=None, msg_key="msg")
@@ -167,12 +167,13 @@ async def handle_codepush_update_check(request: Request) -> Response:
             },
         }
 
-    return web.json_response(response)
+    return json_codec.json_response(response)
 
 
+@constant_response
 async def handle_global_app_bury_point_api(_: Request) -> Response:
     """Codepush Report Status Deploy (/Global_APP_BuryPoint/api)."""
-    return web.json_response(
+    return json_codec.json_response(
         {
             "header": {
                 "result_code": "000000",
@@ -189,6 +190,7 @@ async def handle_global_app_bury_point_api(_: Request) -> Response:
     )
 
 
+@constant_response
 async def handle_chat_bot_id_config(_: Request) -> Response:
     """Handle chat bot ID config (/biz-app-config/api/v2/chat_bot_id/config)."""
     return response_success_v3(
@@ -201,6 +203,7 @@ async def handle_chat_bot_id_config(_: Request) -> Response:
     )
 
 
+@constant_response
 async def handle_content_agreement(_: web.Request) -> web.Response:
     """Content Agreement (/content/agreement)."""
     html_content = """
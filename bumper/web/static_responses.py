@@ -0,0 +1,115 @@
+"""Static JSON response registry module."""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import gzip
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any
+
+from aiohttp import hdrs, web
+from aiohttp.web_request import Request
+from aiohttp.web_response import Response
+
+from bumper.utils import json_codec
+
+try:
+    from brotli import compress as brotli_compress  # type:ignore[import-not-found,unused-ignore]
+except ImportError:
+    brotli_compress = None
+
+_LOGGER = logging.getLogger(__name__)
+
+ENCODING_BROTLI = "br"
+ENCODING_DEFLATE = "deflate"
+ENCODING_GZIP = "gzip"
+ENCODING_IDENTITY = "identity"
+
+
+@dataclass(frozen=True, slots=True)
+class StaticResponse:
+    """Pre-serialized JSON response with its compressed variants."""
+
+    name: str
+    data: Any
+    body: bytes
+    etag: str
+    variants: dict[str, bytes]
+
+
+class StaticResponseRegistry:
+    """Registry of JSON responses, which are loaded, encoded and compressed once instead of on every request."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._responses: dict[str, StaticResponse] = {}
+
+    def register(self, name: str, data: Any, envelope: Callable[[Any], Any] | None = None) -> StaticResponse:
+        """Register data, optional wrapped by an envelope, as static response."""
+        body = json_codec.dumpb(envelope(data) if envelope is not None else data)
+        variants = {ENCODING_GZIP: gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli_compress is not None:
+            variants[ENCODING_BROTLI] = brotli_compress(body)
+
+        static_response = StaticResponse(
+            name=name,
+            data=data,
+            body=body,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            variants=variants,
+        )
+        self._responses[name] = static_response
+        _LOGGER.debug(f"Registered static response '{name}' with {len(body)} bytes ({', '.join(variants)})")
+        return static_response
+
+    def register_file(self, name: str, path: Path, envelope: Callable[[Any], Any] | None = None) -> StaticResponse:
+        """Register the content of a json file as static response."""
+        with path.open(encoding="utf-8") as file:
+            return self.register(name, json_codec.load(file), envelope)
+
+    def get(self, name: str) -> StaticResponse:
+        """Get a registered static response."""
+        return self._responses[name]
+
+    def data(self, name: str) -> Any:
+        """Get the loaded data of a registered static response, which is shared and must not be modified."""
+        return self._responses[name].data
+
+    def response(self, request: Request, name: str) -> Response:
+        """Build the response for a request, answers with 304 when the client already has the current version."""
+        static_response = self._responses[name]
+        encoding = select_encoding(
+            request.headers.get(hdrs.ACCEPT_ENCODING, ""),
+            [encoding for encoding in (ENCODING_BROTLI, ENCODING_GZIP) if encoding in static_response.variants],
+        )
+        etag = static_response.etag if encoding == ENCODING_IDENTITY else f"{static_response.etag}-{encoding}"
+        headers: dict[str, str] = {hdrs.VARY: hdrs.ACCEPT_ENCODING}
+
+        if any(request_etag.value in (etag, "*") for request_etag in request.if_none_match or ()):
+            response = web.Response(status=304, headers=headers)
+        else:
+            body = static_response.body if encoding == ENCODING_IDENTITY else static_response.variants[encoding]
+            if encoding != ENCODING_IDENTITY:
+                headers[hdrs.CONTENT_ENCODING] = encoding
+            response = web.Response(body=body, content_type="application/json", headers=headers)
+        response.etag = etag
+        return response
+
+
+def select_encoding(accept_encoding: str, available: Iterable[str]) -> str:
+    """Select the first of the available content codings accepted by the client, identity if none is."""
+    accepted: set[str] = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+
+    for encoding in available:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return ENCODING_IDENTITY
+
+
+static_responses: StaticResponseRegistry = StaticResponseRegistry()
@@ -0,0 +1,140 @@
+"""Upstream HTTP client module."""
+
+from collections import Counter
+from collections.abc import Awaitable, Callable, Mapping
+import logging
+import ssl
+from typing import Any
+
+from aiohttp import ClientSession, TCPConnector, TraceConfig, hdrs
+from aiohttp.abc import AbstractResolver
+from multidict import CIMultiDict
+
+from bumper.utils.dns_cache import AiohttpCachedResolver
+from bumper.utils.settings import config as bumper_isc
+
+_LOGGER = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+# Headers only valid for a single connection, which are not forwarded
+HOP_BY_HOP_HEADERS = frozenset(
+    header.lower()
+    for header in (
+        hdrs.CONNECTION,
+        hdrs.KEEP_ALIVE,
+        hdrs.PROXY_AUTHENTICATE,
+        hdrs.PROXY_AUTHORIZATION,
+        hdrs.TE,
+        hdrs.TRAILER,
+        hdrs.TRANSFER_ENCODING,
+        hdrs.UPGRADE,
+    )
+)
+
+
+def forward_headers(headers: Mapping[str, str]) -> CIMultiDict[str]:
+    """Copy the headers to forward, without the hop-by-hop headers."""
+    return CIMultiDict((key, value) for key, value in headers.items() if key.lower() not in HOP_BY_HOP_HEADERS)
+
+
+class BodyPreview:
+    """Keep the first bytes of a streamed body for logging, without holding the whole body."""
+
+    def __init__(self, limit: int = bumper_isc.PROXY_WEB_LOG_BODY_BYTES) -> None:
+        """Body preview init."""
+        self._limit = limit
+        self._prefix = bytearray()
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Count a chunk and keep its bytes until the limit is reached."""
+        self.size += len(chunk)
+        if (missing := self._limit - len(self._prefix)) > 0:
+            self._prefix += chunk[:missing]
+
+    def __str__(self) -> str:
+        """Get the kept bytes as text, with the total size if the body was longer."""
+        text = self._prefix.decode("utf-8", errors="replace")
+        return f"{text}... ({self.size} bytes)" if self.size > len(self._prefix) else text
+
+
+class UpstreamClient:
+    """Long-lived client session for proxied requests to the Ecovacs servers.
+
+    The connector keeps a bounded pool of keep-alive connections and resolves hosts through the shared cached resolver,
+    so a proxied request skips the DNS lookup and the TCP and TLS handshakes while a connection is open.
+    """
+
+    def __init__(
+        self,
+        limit: int = bumper_isc.PROXY_WEB_POOL_LIMIT,
+        limit_per_host: int = bumper_isc.PROXY_WEB_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = bumper_isc.PROXY_WEB_KEEPALIVE_TIMEOUT,
+        resolver_factory: Callable[[], AbstractResolver] = AiohttpCachedResolver,
+        ssl_context: ssl.SSLContext | bool = False,
+    ) -> None:
+        """Upstream client init, the session is created on first use."""
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._resolver_factory = resolver_factory
+        self._ssl_context = ssl_context
+        self._session: ClientSession | None = None
+        self._connector: TCPConnector | None = None
+        self._counters: Counter[str] = Counter()
+
+    def session(self) -> ClientSession:
+        """Get the shared session, created on first use or after it was closed."""
+        if self._session is None or self._session.closed:
+            self._connector = TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                use_dns_cache=False,  # cached by the resolver, with the TTL of the records
+                resolver=self._resolver_factory(),
+                ssl=self._ssl_context,
+            )
+            self._session = ClientSession(connector=self._connector, trace_configs=[self._trace_config()])
+            self._counters["sessions_created"] += 1
+            _LOGGER.debug("Created upstream client session")
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and all pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            _LOGGER.debug("Closed upstream client session")
+        self._session = None
+        self._connector = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get the request and connection counters and the current pool usage."""
+        in_use = idle = 0
+        if self._connector is not None and not self._connector.closed:
+            in_use = len(self._connector._acquired)  # noqa: SLF001
+            idle = sum(len(connections) for connections in self._connector._conns.values())  # noqa: SLF001
+        return {
+            "sessions_created": self._counters["sessions_created"],
+            "requests": self._counters["requests"],
+            "request_errors": self._counters["request_errors"],
+            "connections_created": self._counters["connections_created"],
+            "connections_reused": self._counters["connections_reused"],
+            "pool": {"limit": self._limit, "limit_per_host": self._limit_per_host, "in_use": in_use, "idle": idle},
+        }
+
+    def _trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._count("requests"))
+        trace_config.on_request_exception.append(self._count("request_errors"))
+        trace_config.on_connection_create_end.append(self._count("connections_created"))
+        trace_config.on_connection_reuseconn.append(self._count("connections_reused"))
+        return trace_config
+
+    def _count(self, name: str) -> Callable[..., Awaitable[None]]:
+        async def _on_trace(*_: Any) -> None:
+            self._counters[name] += 1
+
+        return _on_trace
+
+
+upstream_client: UpstreamClient = UpstreamClient()
@@ -3,49 +3,172 @@
 import asyncio
 from asyncio import Task, transports
 import base64
+from collections import Counter
+from collections.abc import Coroutine, Iterable
+import functools
+import itertools
 import logging
 import re
-import ssl
-from typing import Any
+import sys
+import time
+from typing import Any, ClassVar
 import uuid
 from xml.etree.ElementTree import Element
 
 import defusedxml.ElementTree as ET  # noqa: N817
 
 from bumper.db import bot_repo, client_repo, token_repo
+from bumper.db.db import run_in_db_executor
 from bumper.utils import utils
+from bumper.utils.readiness import Readiness
 from bumper.utils.settings import config as bumper_isc
+from bumper.utils.tls_context import tls_provider
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER_CLIENT = logging.getLogger(f"{__name__}.client")
 
+# Maximum seconds between two runs of the idle connection reaper
+REAPER_INTERVAL = 5.0
+
 
 class XMPPServer:
     """XMPP server."""
 
     server_id: str = bumper_isc.DOMAIN_MAIN
-    clients: list["XMPPAsyncClient"] = []
+    clients: dict["XMPPAsyncClient", None] = {}  # Insertion ordered set, so a disconnect removes its client in O(1)
     exit_flag: bool = False
     server: asyncio.Server | None = None
 
-    def __init__(self, host: str, port: int) -> None:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_connections: int = bumper_isc.XMPP_MAX_CONNECTIONS,
+        max_connections_per_ip: int = bumper_isc.XMPP_MAX_CONNECTIONS_PER_IP,
+        idle_timeout: float = bumper_isc.XMPP_IDLE_TIMEOUT,
+        ping_interval: float = bumper_isc.XMPP_PING_INTERVAL,
+    ) -> None:
         """XMPP server init."""
         # Initialize bot server
         self._host = host
         self._port = port
         self.xmpp_protocol = XMPPServerProtocol
         self.server_coro: Task[None] | None = None
+        self._max_connections = max_connections
+        self._max_connections_per_ip = max_connections_per_ip
+        self._idle_timeout = idle_timeout
+        self._ping_interval = ping_interval
+        self._connections_per_ip: Counter[str] = Counter()
+        self._reaper_task: Task[None] | None = None
+        self.readiness = Readiness()
 
     async def start_async_server(self) -> None:
         """Start server."""
         try:
             _LOGGER.info(f"Starting XMPP Server at {self._host}:{self._port}")
             loop = asyncio.get_running_loop()
-            self.server = await loop.create_server(self.xmpp_protocol, host=self._host, port=self._port)
+            self.server = await loop.create_server(
+                functools.partial(self.xmpp_protocol, self),
+                host=self._host,
+                port=self._port,
+            )
+            self._reaper_task = asyncio.create_task(self._reaper_loop())
+            self.readiness.set_ready()
         except Exception:
             _LOGGER.exception(utils.default_exception_str_builder())
             raise
 
+    @property
+    def connection_count(self) -> int:
+        """Number of currently open connections."""
+        return len(self.clients)
+
+    def memory_per_connection(self, sample_size: int = 100) -> int:
+        """Estimate the bytes held per connection by a sample of clients, transport and socket buffers excluded."""
+        sample = list(itertools.islice(self.clients, sample_size))
+        if not sample:
+            return 0
+        return sum(client.memory_size() for client in sample) // len(sample)
+
+    def register(self, client: "XMPPAsyncClient") -> bool:
+        """Register a new connection, returns False when a connection limit is reached."""
+        ip = client.address[0]
+        if self._max_connections > 0 and len(self.clients) >= self._max_connections:
+            _LOGGER.warning(f"Rejecting connection from {ip}, limit of {self._max_connections} connections reached")
+            return False
+        if self._max_connections_per_ip > 0 and self._connections_per_ip[ip] >= self._max_connections_per_ip:
+            _LOGGER.warning(f"Rejecting connection from {ip}, limit of {self._max_connections_per_ip} connections per IP reached")
+            return False
+
+        self._connections_per_ip[ip] += 1
+        self.clients[client] = None
+        return True
+
+    def unregister(self, client: "XMPPAsyncClient") -> None:
+        """Unregister a closed connection."""
+        if client not in self.clients:
+            return
+        del self.clients[client]
+        ip = client.address[0]
+        self._connections_per_ip[ip] -= 1
+        if self._connections_per_ip[ip] <= 0:
+            del self._connections_per_ip[ip]
+
+    def reap_idle_clients(self, now: float | None = None) -> int:
+        """Close connections without any traffic within the idle timeout and ping idle ready clients.
+
+        A pong or any other data from the client counts as traffic. Returns the number of closed connections.
+        """
+        if now is None:
+            now = time.monotonic()
+        reaped = 0
+        for client in list(self.clients):
+            idle = now - client.last_activity
+            if self._idle_timeout > 0 and idle >= self._idle_timeout:
+                _LOGGER.info(f"Closing idle connection ({client.address[0]}:{client.address[1]} | {client.bumper_jid})")
+                client.abort()
+                reaped += 1
+            elif (
+                self._ping_interval > 0
+                and client.state == client.READY
+                and idle >= self._ping_interval
+                and now - client.last_ping >= self._ping_interval
+            ):
+                client.last_ping = now
+                client.send(
+                    f"<iq from='{self.server_id}' to='{client.bumper_jid}' id='s2c1' type='get'>"
+                    " <ping xmlns='urn:xmpp:ping'/></iq>",
+                )
+        return reaped
+
+    async def _reaper_loop(self) -> None:
+        interval = min(value for value in (self._idle_timeout, self._ping_interval, REAPER_INTERVAL) if value > 0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reap_idle_clients()
+            except Exception:
+                _LOGGER.exception(utils.default_exception_str_builder())
+
+    @staticmethod
+    def broadcast(command: str, targets: Iterable["XMPPAsyncClient"]) -> int:
+        """Send the same command to all targets, serialized and encoded only once.
+
+        Returns the number of clients the command was written to.
+        """
+        data = XMPPAsyncClient.encode(command)
+        count = 0
+        for client in targets:
+            if client.write(data):
+                count += 1
+
+        if _LOGGER_CLIENT.isEnabledFor(logging.DEBUG):
+            _LOGGER_CLIENT.debug(f"broadcast to {count} clients - {data.decode()}")
+        if bumper_isc.DEBUG_LOGGING_XMPP_RESPONSE is True:
+            _LOGGER_CLIENT.info(f"XMPP BROADCAST to  :: {count} clients")
+            _LOGGER_CLIENT.info(f"XMPP BROADCAST cmd :: {data.decode()}")
+        return count
+
     async def disconnect(self) -> None:
         """Disconnect."""
         _LOGGER.info("Shutting down XMPP Server...")
@@ -55,20 +178,29 @@ class XMPPServer:
             client.disconnect()
 
         self.exit_flag = True
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            self._reaper_task = None
         if self.server is not None and self.server.is_serving():
             self.server.close()
             await self.server.wait_closed()
+        # Let pending database updates of the disconnected clients finish
+        await XMPPAsyncClient.wait_background_tasks()
         _LOGGER.debug("shutting down")
         if self.server_coro is not None:
             self.server_coro.cancel()
+        self.readiness.set_stopped()
 
 
 class XMPPServerProtocol(asyncio.Protocol):
     """XMPP server protocol."""
 
-    client_id: str | None = None
-    exit_flag: bool = False
-    _client: "XMPPAsyncClient | None" = None
+    __slots__ = ("_client", "_server")
+
+    def __init__(self, server: XMPPServer) -> None:
+        """XMPP server protocol init."""
+        self._server = server
+        self._client: XMPPAsyncClient | None = None
 
     def connection_made(self, transport: transports.BaseTransport) -> None:
         """Establish connection."""
@@ -77,27 +209,45 @@ class XMPPServerProtocol(asyncio.Protocol):
             self._client.transport = transport
         else:
             client = XMPPAsyncClient(transport)
+            if not self._server.register(client):
+                transport.close()
+                return
             self._client = client
-            XMPPServer.clients.append(client)
             self._client.state = client.CONNECT
             _LOGGER.debug(f"New Connection from {client.address}")
 
     def connection_lost(self, _: Exception | None) -> None:
         """Lost connection."""
         if self._client is not None:
-            XMPPServer.clients.remove(self._client)
+            self._server.unregister(self._client)
             self._client.set_state("DISCONNECT")
             _LOGGER.debug(f"End Connection for ({self._client.address[0]}:{self._client.address[1]} | {self._client.bumper_jid})")
 
     def data_received(self, data: bytes) -> None:
         """Parse received data."""
         if self._client is not None:
+            self._client.last_activity = time.monotonic()
             self._client.parse_data(data)
 
 
 class XMPPAsyncClient:
     """XMPP client."""
 
+    __slots__ = (
+        "address",
+        "bumper_jid",
+        "clientresource",
+        "devclass",
+        "last_activity",
+        "last_ping",
+        "name",
+        "state",
+        "tls_upgraded",
+        "transport",
+        "type",
+        "uid",
+    )
+
     IDLE: int = 0
     CONNECT: int = 1
     INIT: int = 2
@@ -107,8 +257,9 @@ class XMPPAsyncClient:
     UNKNOWN: int = 0
     BOT: int = 1
     CONTROLLER: int = 2
-    tls_upgraded: bool = False
-    schedule_ping_task: asyncio.Task[Any] | None = None  # Track the schedule_ping task
+    log_sent_message: ClassVar[bool] = True  # Set to true to log sends
+    log_incoming_data: ClassVar[bool] = True  # Set to true to log incoming data
+    _background_tasks: ClassVar[set[asyncio.Task[None]]] = set()
 
     def __init__(self, transport: transports.BaseTransport) -> None:
         """XMPP client init."""
@@ -121,22 +272,27 @@ class XMPPAsyncClient:
         self.bumper_jid = ""
         self.uid = ""
         self.name: str | None = None
-        self.log_sent_message: bool = True  # Set to true to log sends
-        self.log_incoming_data: bool = True  # Set to true to log sends
+        self.tls_upgraded: bool = False
+        self.last_activity: float = time.monotonic()
+        self.last_ping: float = 0.0
         _LOGGER_CLIENT.debug(f"new client with ip {self.address}")
 
-    def cleanup(self) -> None:
-        """Ensure proper cleanup of the schedule_ping_task."""
-        if self.schedule_ping_task and not self.schedule_ping_task.done():
-            self.schedule_ping_task.cancel()
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    self.schedule_ping_task = asyncio.ensure_future(self.schedule_ping_task)
-                else:
-                    loop.run_until_complete(self.schedule_ping_task)
-            except (asyncio.CancelledError, RuntimeError):
-                _LOGGER_CLIENT.debug(f"Ping task canceled for {self.bumper_jid}")
+    def memory_size(self) -> int:
+        """Estimate the bytes held by the client object and its attribute values, the transport excluded."""
+        size = sys.getsizeof(self)
+        for name in self.__slots__:
+            if name == "transport":
+                continue
+            value = getattr(self, name, None)
+            size += sys.getsizeof(value)
+            if isinstance(value, tuple):
+                size += sum(sys.getsizeof(item) for item in value)
+        return size
+
+    @staticmethod
+    def encode(command: str) -> bytes:
+        """Encode command as it is written to the transport."""
+        return command.replace('"', "'").encode()
 
     def send(self, command: str) -> None:
         """Send command."""
@@ -156,22 +312,60 @@ class XMPPAsyncClient:
         except Exception:
             _LOGGER_CLIENT.exception(utils.default_exception_str_builder(), exc_info=True)
 
+    def write(self, data: bytes) -> bool:
+        """Write already encoded data to the transport."""
+        try:
+            if not isinstance(self.transport, transports.WriteTransport) or self.transport.is_closing():
+                return False
+            self.transport.write(data)
+            return True
+        except Exception:
+            _LOGGER_CLIENT.exception(utils.default_exception_str_builder(), exc_info=True)
+        return False
+
+    def abort(self) -> None:
+        """Close the transport immediately, without waiting for buffered data of a dead peer to be flushed."""
+        if isinstance(self.transport, transports.WriteTransport):
+            self.transport.abort()
+        else:
+            self.transport.close()
+
     def disconnect(self) -> None:
         """Disconnect."""
         _LOGGER.info("Disconnect XMPP Client...")
         try:
-            self.cleanup()  # Ensure the ping task is cleaned up
+            self.transport.close()
+            if self.uid:
+                self._create_task(self._set_xmpp_connection(False))
+        except Exception:
+            _LOGGER_CLIENT.error(utils.default_exception_str_builder(), exc_info=True)
+
+    def _create_task(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Run a coroutine in the background, keeping a reference until it is done."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    @classmethod
+    async def wait_background_tasks(cls) -> None:
+        """Wait until all pending background tasks of all clients are done."""
+        loop = asyncio.get_running_loop()
+        while tasks := [task for task in cls._background_tasks if task.get_loop() is loop and not task.done()]:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _set_xmpp_connection(self, connected: bool) -> None:
+        """Persist the XMPP connection state of the bot or client."""
+        try:
             if self.devclass:
-                bot = bot_repo.get(self.uid)
+                bot = await run_in_db_executor(bot_repo.get, self.uid)
                 if bot:
-                    bot_repo.set_xmpp(bot.did, False)
+                    await run_in_db_executor(bot_repo.set_xmpp, bot.did, connected)
             else:
-                client = client_repo.get(self.uid)
-                if client:
-                    client_repo.set_xmpp(client.userid, False)
-            self.transport.close()
+                client = await run_in_db_executor(client_repo.get, self.uid)
+                if client is not None:
+                    await run_in_db_executor(client_repo.set_xmpp, client.userid, connected)
         except Exception:
-            _LOGGER_CLIENT.error(utils.default_exception_str_builder(), exc_info=True)
+            _LOGGER_CLIENT.exception(utils.default_exception_str_builder(), exc_info=True)
 
     def _tag_strip_uri(self, tag: str) -> str:
         try:
@@ -281,20 +475,6 @@ class XMPPAsyncClient:
         except Exception:
             _LOGGER_CLIENT.exception(utils.default_exception_str_builder(), exc_info=True)
 
-    async def schedule_ping(self, time: float) -> None:
-        """Schedule ping."""
-        try:
-            while self.state != self.DISCONNECT:  # Run only if not disconnected
-                self.send(
-                    f"<iq from='{XMPPServer.server_id}' to='{self.bumper_jid}' id='s2c1' type='get'>"
-                    " <ping xmlns='urn:xmpp:ping'/></iq>",
-                )
-                await asyncio.sleep(time)
-        except asyncio.CancelledError:
-            _LOGGER_CLIENT.debug(f"Ping task canceled for {self.bumper_jid}")
-        except Exception:
-            _LOGGER_CLIENT.exception(utils.default_exception_str_builder(), exc_info=True)
-
     def _handle_result(self, xml: Element, data: str) -> None:
         try:
             ctl_to = xml.get("to")
@@ -358,19 +538,23 @@ class XMPPAsyncClient:
             else:
                 rxmlstring = self._xml_replacer(xml, "query", "com:ctl")
                 if self.type == self.BOT and ctl_to == "de.ecorobot.net":  # Send to all clients
-                    _LOGGER_CLIENT.debug(f"Sending to all clients because of de: {rxmlstring}")
-                    for client in XMPPServer.clients:
-                        client.send(rxmlstring)
+                    _LOGGER_CLIENT.debug("Sending to all clients because of de")
+                    XMPPServer.broadcast(rxmlstring, XMPPServer.clients)
 
                 if ctl_to is not None and ctl_to.find("@") != -1:  # address Found
                     ctl_to = f"{ctl_to.split('@')[0]}@ecouser.net"
 
-                for client in XMPPServer.clients:
-                    if client.bumper_jid != self.bumper_jid and client.state == client.READY:
-                        if ctl_to is None or "@" not in ctl_to:  # No user@, send to all clients?
-                            # NOTE: Revisit later, this may be wrong
-                            client.send(rxmlstring)
-                        elif client.uid.lower() in ctl_to.lower():  # If client matches TO=
+                targets = [
+                    client
+                    for client in XMPPServer.clients
+                    if client.bumper_jid != self.bumper_jid and client.state == client.READY
+                ]
+                if ctl_to is None or "@" not in ctl_to:  # No user@, send to all clients?
+                    # NOTE: Revisit later, this may be wrong
+                    XMPPServer.broadcast(rxmlstring, targets)
+                else:
+                    for client in targets:
+                        if client.uid.lower() in ctl_to.lower():  # If client matches TO=
                             _LOGGER_CLIENT.debug(f"Sending from {self.uid} to client {client.uid}: {rxmlstring}")
                             client.send(rxmlstring)
         except Exception:
@@ -457,12 +641,8 @@ class XMPPAsyncClient:
             transport = self.transport
             protocol = self.transport.get_protocol()
 
-            ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-            ssl_ctx.load_cert_chain(bumper_isc.server_cert, bumper_isc.server_key)
-            ssl_ctx.load_verify_locations(cafile=bumper_isc.ca_cert)
-
             if isinstance(transport, transports.WriteTransport):
-                new_transport = await loop.start_tls(transport, protocol, ssl_ctx, server_side=True)
+                new_transport = await loop.start_tls(transport, protocol, tls_provider.server_context(), server_side=True)
                 if new_transport is not None:
                     protocol.connection_made(new_transport)
 
@@ -491,8 +671,18 @@ class XMPPAsyncClient:
             if len(saslauth) > 2:
                 authcode = saslauth[2]
 
+            # Persisting the client happens in the DB executor, the response is sent afterwards
+            self._create_task(self._authenticate(authcode))
+
+        except Exception:
+            _LOGGER_CLIENT.exception(utils.default_exception_str_builder(), exc_info=True)
+
+    async def _authenticate(self, authcode: str) -> None:
+        try:
             if self.devclass:  # if there is a devclass it is a bot
-                bot_repo.add(self.uid, self.uid, self.devclass, "atom", "eco-legacy")
+                await run_in_db_executor(bot_repo.add, self.uid, self.uid, self.devclass, "atom", "eco-legacy")
+                if self.state == self.DISCONNECT:
+                    return
                 self.type = self.BOT
                 _LOGGER_CLIENT.info(f"XMPP Authentication Success :: Bot :: ClientID: {self.uid}")
                 # Send response
@@ -501,13 +691,13 @@ class XMPPAsyncClient:
                 self.set_state("INIT")
 
             else:
-                auth = False
-                if token_repo.verify_auth_code(self.uid, authcode) or bumper_isc.USE_AUTH is False:
-                    auth = True
+                auth = bumper_isc.USE_AUTH is False or await run_in_db_executor(token_repo.verify_auth_code, self.uid, authcode)
 
                 if auth and self.clientresource is not None:
+                    await run_in_db_executor(client_repo.add, self.uid, self.uid, "USER", self.clientresource)
+                    if self.state == self.DISCONNECT:
+                        return
                     self.type = self.CONTROLLER
-                    client_repo.add(self.uid, self.uid, "USER", self.clientresource)
                     _LOGGER_CLIENT.info(f"XMPP Authentication Success :: Client :: ClientID: {self.uid}")
                     # Client authenticated, move to next state
                     self.set_state("INIT")
@@ -522,15 +712,6 @@ class XMPPAsyncClient:
 
     def _handle_bind(self, xml: Element) -> None:
         try:
-            if self.devclass:
-                bot = bot_repo.get(self.uid)
-                if bot:
-                    bot_repo.set_xmpp(bot.did, True)
-            else:
-                client = client_repo.get(self.uid)
-                if client is not None:
-                    client_repo.set_xmpp(client.userid, True)
-
             type_added = "client"
             clientresourcexml = list(next(iter(xml)))
             if self.devclass:  # its a bot
@@ -552,17 +733,21 @@ class XMPPAsyncClient:
             )
 
             self.set_state("BIND")
-            self.send(res)
+            # Persisting the connection state happens in the DB executor, the response is sent afterwards
+            self._create_task(self._bind(res))
 
         except Exception:
             _LOGGER_CLIENT.exception(utils.default_exception_str_builder(), exc_info=True)
 
+    async def _bind(self, response: str) -> None:
+        await self._set_xmpp_connection(True)
+        if self.state != self.DISCONNECT:
+            self.send(response)
+
     def _handle_session(self, xml: Element) -> None:
         """Handle session."""
         self.set_state("READY")
         self.send(f'<iq type="result" id="{xml.get("id")}" />')
-        # Schedule the ping task and store it
-        self.schedule_ping_task = asyncio.create_task(self.schedule_ping(30))
 
     def _handle_presence(self, xml: Element) -> None:
         if len(xml) and xml[0].tag == "status":
@@ -662,7 +847,7 @@ class XMPPAsyncClient:
                     item.clear()
 
                 elif item_tag == "starttls" and self.tls_upgraded is False:
-                    asyncio.Task(self._handle_starttls())
+                    self._create_task(self._handle_starttls())
                     item.clear()
 
                 elif item_tag == "presence":
@@ -0,0 +1,76 @@
+"""Routing microbenchmark, compares nested plugin sub-applications with the flat route table.
+
+Run with: python scripts/benchmark-routing.py [--rounds 2000] [--packages 0]
+`--packages` adds empty dummy plugin packages, to show how the lookup cost grows with the number of packages.
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+from aiohttp.web_routedef import RouteDef
+
+from bumper.web import plugins
+
+PATHS = [
+    ("POST", "/api/appsvr/app.do"),
+    ("POST", "/api/users/user.do"),
+    ("GET", "/api/pim/product/getProductIotMap"),
+    ("POST", "/api/pim/product/software/config/batch"),
+    ("GET", "/v1/private/us/en/dev/app/1.0/dt/aid/user/checkLogin"),
+    ("GET", "/v2/private/us/en/dev/app/1.0/dt/aid/user/checkLogin"),
+    ("GET", "/v1/private/us/en/dev/app/1.0/dt/aid/userSetting/saveUserSetting"),
+    ("GET", "/upload/global/2025/01/01/1234"),
+    ("GET", "/not/existing"),
+]
+
+
+async def _handle_dummy(_: web.Request) -> web.Response:
+    return web.Response()
+
+
+def _build(routes: list[plugins.PluginRoute], flat: bool) -> web.Application:
+    app = web.Application()
+    plugins._add_routes(app, routes, flat=flat)
+    app.freeze()
+    return app
+
+
+def _target(match_info: web.UrlMappingMatchInfo) -> object:
+    return match_info.http_exception.status if match_info.http_exception is not None else match_info.handler
+
+
+async def _resolve_all(app: web.Application, requests: list[web.Request], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for request in requests:
+            await app.router.resolve(request)
+    return (time.perf_counter() - start) / (rounds * len(requests)) * 1_000_000
+
+
+async def main(rounds: int, packages: int) -> None:
+    routes = plugins.discover_routes()
+    routes.extend(
+        plugins.PluginRoute((f"dummy{index}",), RouteDef("GET", f"/route{index}", _handle_dummy, {})) for index in range(packages)
+    )
+    requests = [make_mocked_request(method, path) for method, path in PATHS]
+    print(f"{len(routes)} routes, {len(PATHS)} paths, {rounds} rounds")
+
+    for flat in (False, True):
+        app = _build(routes, flat)
+        handlers = [_target(await app.router.resolve(request)) for request in requests]
+        print(f"{'flat' if flat else 'nested':>6}: {await _resolve_all(app, requests, rounds):7.2f} µs per lookup")
+        if flat is False:
+            nested_handlers = handlers
+        elif handlers != nested_handlers:
+            print("Warning: layouts resolved different handlers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--packages", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.packages))
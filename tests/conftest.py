@@ -86,8 +86,8 @@ async def mqtt_server_anonymous():
 
     try:
         await bumper_isc.mqtt_server.start()
-        while bumper_isc.mqtt_server.state != "started":
-            await asyncio.sleep(0.1)
+        async with asyncio.timeout(5):
+            await bumper_isc.mqtt_server.readiness.wait_ready()
 
         yield bumper_isc.mqtt_server
 
@@ -103,8 +103,8 @@ async def mqtt_server():
 
     try:
         await bumper_isc.mqtt_server.start()
-        while bumper_isc.mqtt_server.state != "started":
-            await asyncio.sleep(0.1)
+        async with asyncio.timeout(5):
+            await bumper_isc.mqtt_server.readiness.wait_ready()
 
         yield bumper_isc.mqtt_server
 
@@ -1,11 +1,14 @@
 import asyncio
 import json
 import time
+from unittest import mock
 
 from aiomqtt import Client
+import pytest
 from testfixtures import LogCapture
 
-from bumper.mqtt.helper_bot import MQTTCommandModel, MQTTHelperBot
+from bumper.mqtt.helper_bot import CommandLimiter, MQTTCommandModel, MQTTHelperBot, new_request_id
+from bumper.utils.settings import config as bumper_isc
 from tests import HOST, MQTT_PORT
 
 
@@ -312,3 +315,248 @@ async def test_helperbot_sendcommand(mqtt_client: Client, helper_bot: MQTTHelper
         },
         "ret": "ok",
     }
+
+
+_GET_BATTERY = {
+    "cmdName": "getBattery",
+    "toId": "bot_serial",
+    "toType": "ls1ok3",
+    "toRes": "wC3g",
+    "payloadType": "j",
+    "payload": {},
+}
+
+
+def _replying_helper_bot(response: bytes) -> MQTTHelperBot:
+    helper_bot = MQTTHelperBot(HOST, MQTT_PORT, True, 0.1)
+    helper_bot.readiness.set_ready()
+
+    async def _publish(topic: str, _: str) -> None:
+        helper_bot._commands[topic.split("/")[10]].add_response(response)
+
+    helper_bot.publish = _publish  # type: ignore[method-assign]
+    return helper_bot
+
+
+async def test_helperbot_sendcommand_passes_json_through() -> None:
+    response = b'{"body":{"data":{"value":100,"isLow":0}},"header":{"ver":"0.0.1"}}'
+    helper_bot = _replying_helper_bot(response)
+    cmdjson = {"apn": "getBattery", "fmt": "j", "eid": "bot_serial", "et": "ls1ok3", "er": "wC3g", "ct": "q", "payload": {}}
+
+    # endpoint/control gets the payload as sent by the bot
+    commandresult = await helper_bot.send_command(MQTTCommandModel(cmdjson, MQTTCommandModel.VERSION_NEW))
+    assert commandresult.body == response
+    assert commandresult.headers["x-ngiot-ret"] == "ok"
+
+    # devmanager.do gets it embedded without being parsed
+    cmd = MQTTCommandModel({**cmdjson, "payloadType": "j", "cmdName": "getBattery", "toId": "bot_serial"})
+    commandresult = await helper_bot.send_command(cmd)
+    assert response in commandresult.body
+    assert json.loads(commandresult.body) == {"id": cmd.request_id, "ret": "ok", "payloadType": "j", "resp": json.loads(response)}
+
+
+async def test_helperbot_sendcommand_translates_p2p() -> None:
+    helper_bot = _replying_helper_bot(b'{"body":{"data":{"value":80}}}')
+    cmdjson = {"cmd": "GetBatteryInfo", "did": "bot_serial", "mid": "ls1ok3", "res": "wC3g"}
+    cmd = MQTTCommandModel(cmdjson, MQTTCommandModel.VERSION_P2P)
+
+    commandresult = await helper_bot.send_command(cmd)
+
+    assert json.loads(commandresult.body)["data"] == {"GetBatteryInfo": {"ret": "ok", "did": "bot_serial", "power": 80}}
+
+
+def test_request_id_unique() -> None:
+    request_ids = {new_request_id() for _ in range(10000)}
+    assert len(request_ids) == 10000
+    assert all(request_id.isalnum() for request_id in request_ids)
+
+
+async def test_helperbot_sendcommand_request_id_in_use() -> None:
+    helper_bot = _replying_helper_bot(b'{"body":{}}')
+    cmdjson = {"apn": "getBattery", "fmt": "j", "eid": "bot_serial", "et": "ls1ok3", "er": "wC3g", "ct": "q", "payload": {}}
+    cmd = MQTTCommandModel(cmdjson, MQTTCommandModel.VERSION_NEW)
+    helper_bot._commands[cmd.request_id] = mock.Mock()
+    request_id = cmd.request_id
+
+    commandresult = await helper_bot.send_command(cmd)
+
+    assert commandresult.headers["x-ngiot-ret"] == "ok"
+    assert cmd.request_id != request_id
+    assert request_id in helper_bot._commands
+
+
+async def test_command_limiter() -> None:
+    limiter = CommandLimiter(max_in_flight=3, max_per_bot=2, queue_timeout=0.05)
+    assert await limiter.acquire("bot1")
+    assert await limiter.acquire("bot1")
+    assert await limiter.acquire("bot2")
+
+    # over the per bot limit and over the total limit
+    assert not await limiter.acquire("bot1")
+    assert not await limiter.acquire("bot3")
+    assert limiter.rejected == 2
+
+    # a waiting command gets the slot freed
+    waiting = asyncio.create_task(limiter.acquire("bot1"))
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+    await limiter.release("bot1")
+    assert await waiting
+    assert limiter.queued == 0
+    assert limiter.in_flight == 3
+
+
+async def test_command_limiter_without_queue() -> None:
+    limiter = CommandLimiter(max_in_flight=0, max_per_bot=1, queue_timeout=0)
+    assert await limiter.acquire("bot1")
+    assert await limiter.acquire("bot2")
+    assert not await limiter.acquire("bot1")
+    await limiter.release("bot1")
+    assert await limiter.acquire("bot1")
+
+
+async def test_helperbot_sendcommand_rejected() -> None:
+    helper_bot = MQTTHelperBot(HOST, MQTT_PORT, True, 0.05)
+    helper_bot.readiness.set_ready()
+    helper_bot.publish = mock.AsyncMock()  # type: ignore[method-assign]
+    helper_bot._limiter = CommandLimiter(max_in_flight=0, max_per_bot=1, queue_timeout=0)
+
+    results = await asyncio.gather(*(helper_bot.send_command(MQTTCommandModel(_GET_BATTERY)) for _ in range(3)))
+
+    assert [json.loads(result.body)["errno"] for result in results] == [500, 500, 500]
+    assert sorted(json.loads(result.body)["debug"] for result in results) == [
+        "too many commands in flight",
+        "too many commands in flight",
+        "wait for response timed out",
+    ]
+    stats = helper_bot.stats()
+    assert {key: stats[key] for key in ("in_flight", "queued", "rejected", "completed", "timeouts", "evictions")} == {
+        "in_flight": 0,
+        "queued": 0,
+        "rejected": 2,
+        "completed": 0,
+        "timeouts": 1,
+        "evictions": 0,
+    }
+
+
+def _offline(monkeypatch: pytest.MonkeyPatch, ttl: float) -> None:
+    monkeypatch.setattr(bumper_isc, "mqtt_server", mock.Mock(is_bot_connected=mock.Mock(return_value=False)))
+    monkeypatch.setattr(bumper_isc, "HELPERBOT_PENDING_TTL", ttl)
+    monkeypatch.setattr(bumper_isc, "HELPERBOT_PENDING_SIZE", 2)
+
+
+async def test_helperbot_dispatch_offline(monkeypatch: pytest.MonkeyPatch) -> None:
+    _offline(monkeypatch, 0)
+    helper_bot = _replying_helper_bot(b'{"body":{}}')
+    helper_bot.publish = mock.AsyncMock()  # type: ignore[method-assign]
+
+    commandresult = await helper_bot.dispatch(MQTTCommandModel(_GET_BATTERY))
+
+    assert json.loads(commandresult.body)["debug"] == "requested bot is offline"
+    helper_bot.publish.assert_not_awaited()
+    assert helper_bot.stats()["offline"] == 1
+
+
+async def test_helperbot_dispatch_pending(monkeypatch: pytest.MonkeyPatch) -> None:
+    _offline(monkeypatch, 60)
+    helper_bot = _replying_helper_bot(b'{"body":{}}')
+
+    for _ in range(3):
+        commandresult = await helper_bot.dispatch(MQTTCommandModel(_GET_BATTERY))
+        assert json.loads(commandresult.body)["debug"] == "requested bot is offline, command queued"
+    # the oldest command is dropped
+    assert helper_bot.stats()["pending"] == 2
+    assert helper_bot.stats()["dropped"] == 1
+
+    helper_bot.on_bot_subscribed("other_bot")
+    helper_bot.on_bot_subscribed("bot_serial")
+    await asyncio.sleep(0.01)
+
+    stats = helper_bot.stats()
+    assert stats["pending"] == 0
+    assert stats["delivered"] == 2
+    assert stats["completed"] == 2
+
+
+async def test_helperbot_dispatch_pending_expired(monkeypatch: pytest.MonkeyPatch) -> None:
+    _offline(monkeypatch, 0.01)
+    helper_bot = _replying_helper_bot(b'{"body":{}}')
+    helper_bot.publish = mock.AsyncMock()  # type: ignore[method-assign]
+
+    await helper_bot.dispatch(MQTTCommandModel(_GET_BATTERY))
+    await asyncio.sleep(0.02)
+    helper_bot.on_bot_subscribed("bot_serial")
+    await asyncio.sleep(0)
+
+    helper_bot.publish.assert_not_awaited()
+    assert helper_bot.stats()["expired"] == 1
+    assert helper_bot.stats()["delivered"] == 0
+    assert helper_bot._pending == {}
+
+
+async def test_helperbot_dispatch_pending_failed(monkeypatch: pytest.MonkeyPatch) -> None:
+    _offline(monkeypatch, 60)
+    helper_bot = MQTTHelperBot(HOST, MQTT_PORT, True, 0.01)
+    helper_bot.readiness.set_ready()
+    helper_bot.publish = mock.AsyncMock()  # type: ignore[method-assign]
+
+    await helper_bot.dispatch(MQTTCommandModel(_GET_BATTERY))
+    helper_bot.on_bot_subscribed("bot_serial")
+    await asyncio.sleep(0.05)
+
+    stats = helper_bot.stats()
+    assert stats["delivered"] == 0
+    assert stats["delivery_failed"] == 1
+
+
+async def test_helperbot_sendcommand_deadline() -> None:
+    helper_bot = MQTTHelperBot(HOST, MQTT_PORT, True, 60)
+    helper_bot.readiness.set_ready()
+    helper_bot.publish = mock.AsyncMock()  # type: ignore[method-assign]
+    helper_bot.latency = mock.Mock(deadline=mock.Mock(return_value=0.01))
+
+    # the deadline from the observed latency
+    commandresult = await helper_bot.send_command(MQTTCommandModel(_GET_BATTERY))
+    assert json.loads(commandresult.body)["debug"] == "wait for response timed out"
+    helper_bot.latency.deadline.assert_called_once_with("ls1ok3", "getBattery")
+    helper_bot.latency.record_timeout.assert_called_once_with("ls1ok3", "getBattery", 0.01)
+
+    # overridden per request, no timeout sample
+    helper_bot.latency = mock.Mock(deadline=mock.Mock(return_value=60))
+    cmd = MQTTCommandModel(_GET_BATTERY)
+    cmd.set_timeout("0.01")
+    commandresult = await helper_bot.send_command(cmd)
+    assert json.loads(commandresult.body)["debug"] == "wait for response timed out"
+    helper_bot.latency.record_timeout.assert_not_called()
+
+
+async def test_helperbot_sendcommand_records_latency() -> None:
+    helper_bot = _replying_helper_bot(b'{"body":{}}')
+
+    await helper_bot.send_command(MQTTCommandModel(_GET_BATTERY))
+
+    assert helper_bot.latency.stats()["ls1ok3/getBattery"]["samples"] == 1
+
+
+def test_command_set_timeout() -> None:
+    cmd = MQTTCommandModel(_GET_BATTERY)
+    for value in ("abc", "-1", "inf", 0):
+        cmd.set_timeout(value)
+        assert cmd.timeout is None
+    cmd.set_timeout("2.5")
+    assert cmd.timeout == 2.5
+
+
+async def test_helperbot_sendcommand_invalid_json_not_embedded() -> None:
+    cmd = MQTTCommandModel(_GET_BATTERY)
+    for response in (b'{"a":1} trailing }', b'{"a":1}{"b":2}'):
+        helper_bot = _replying_helper_bot(response)
+        commandresult = await helper_bot.send_command(cmd)
+        assert json.loads(commandresult.body)["ret"] == "fail"
+
+    # endpoint/control passes the payload on as is
+    helper_bot = _replying_helper_bot(b'{"a":1}{"b":2}')
+    cmdjson = {"apn": "getBattery", "fmt": "j", "eid": "bot_serial", "et": "ls1ok3", "er": "wC3g", "ct": "q", "payload": {}}
+    commandresult = await helper_bot.send_command(MQTTCommandModel(cmdjson, MQTTCommandModel.VERSION_NEW))
+    assert commandresult.body == b'{"a":1}{"b":2}'
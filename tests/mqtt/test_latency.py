@@ -0,0 +1,45 @@
+from bumper.mqtt.latency import MIN_SAMPLES, CommandLatency
+
+
+def test_deadline_from_latency() -> None:
+    latency = CommandLatency(ceiling=60.0, floor=1.0, factor=2.0, adaptive=True)
+
+    # the ceiling until there are enough samples
+    for _ in range(MIN_SAMPLES - 1):
+        latency.record("ls1ok3", "getBattery", 0.5)
+    assert latency.deadline("ls1ok3", "getBattery") == 60.0
+    latency.record("ls1ok3", "getBattery", 0.5)
+    assert 1.0 <= latency.deadline("ls1ok3", "getBattery") < 5.0
+
+    # bounded by the floor and kept per bot class and command
+    for _ in range(MIN_SAMPLES):
+        latency.record("ls1ok3", "getCleanInfo", 0.01)
+        latency.record("ls1ok3", "getMapSet", 20.0)
+    assert latency.deadline("ls1ok3", "getCleanInfo") == 1.0
+    assert latency.deadline("ls1ok3", "getMapSet") == 60.0
+    assert latency.deadline("p95mgv", "getBattery") == 60.0
+
+    stats = latency.stats()["ls1ok3/getBattery"]
+    assert stats["samples"] == MIN_SAMPLES
+    assert stats["smoothed_ms"] == 500.0
+    assert stats["max_ms"] == 500.0
+
+
+def test_deadline_grows_on_timeout() -> None:
+    latency = CommandLatency(ceiling=60.0, floor=1.0, factor=2.0, adaptive=True)
+    for _ in range(MIN_SAMPLES):
+        latency.record("ls1ok3", "getBattery", 0.5)
+
+    deadline = latency.deadline("ls1ok3", "getBattery")
+    latency.record_timeout("ls1ok3", "getBattery", deadline)
+
+    assert latency.deadline("ls1ok3", "getBattery") > deadline
+    assert latency.stats()["ls1ok3/getBattery"]["timeouts"] == 1
+
+
+def test_deadline_not_adaptive() -> None:
+    latency = CommandLatency(ceiling=60.0, floor=1.0, factor=2.0, adaptive=False)
+    for _ in range(MIN_SAMPLES):
+        latency.record("ls1ok3", "getBattery", 0.5)
+
+    assert latency.deadline("ls1ok3", "getBattery") == 60.0
@@ -282,6 +282,21 @@ async def test_mqttserver_default_pw_file_double_start() -> None:
             await mqtt_server.shutdown()
 
 
+async def test_mqttserver_concurrent_start_shutdown() -> None:
+    mqtt_server = MQTTServer(MQTTBinding(HOST, MQTT_PORT, True))
+    assert mqtt_server.readiness.is_stopped
+
+    # the shutdown waits for the running start instead of failing on the starting state
+    await asyncio.gather(mqtt_server.start(), mqtt_server.shutdown())
+    assert mqtt_server.state == "stopped"
+    assert mqtt_server.readiness.is_stopped
+
+    async with asyncio.timeout(5):
+        await asyncio.gather(mqtt_server.readiness.wait_ready(), mqtt_server.start())
+    assert mqtt_server.readiness.is_ready
+    await mqtt_server.shutdown()
+
+
 async def test_mqttserver_shutdown() -> None:
     """Test MQTT server shutdown."""
     with LogCapture() as log:
@@ -329,3 +344,24 @@ async def test_mqttserver_shutdown() -> None:
                 ),
                 order_matters=False,
             )
+
+
+@pytest.mark.usefixtures("clean_database")
+async def test_mqttserver_bot_presence(mqtt_server_anonymous: MQTTServer) -> None:
+    helperbot = mock.Mock()
+    bumper_isc.mqtt_helperbot = helperbot
+    ssl_ctx = ssl.create_default_context()
+    ssl_ctx.check_hostname = False
+    ssl_ctx.verify_mode = ssl.CERT_NONE
+    assert not mqtt_server_anonymous.is_bot_connected("bot_serial")
+
+    try:
+        async with Client(hostname=HOST, port=MQTT_PORT, tls_context=ssl_ctx, identifier="bot_serial@ls1ok3/wC3g") as client:
+            assert mqtt_server_anonymous.is_bot_connected("bot_serial")
+            await client.subscribe("iot/p2p/+/+/+/+/bot_serial/ls1ok3/wC3g/q/+/j")
+            await asyncio.sleep(0.1)
+            helperbot.on_bot_subscribed.assert_called_once_with("bot_serial")
+        await asyncio.sleep(0.1)
+        assert not mqtt_server_anonymous.is_bot_connected("bot_serial")
+    finally:
+        bumper_isc.mqtt_helperbot = None
@@ -48,12 +48,20 @@ async def test_start_stop(debug: bool, proxy: bool) -> None:
         assert bumper_isc.mqtt_helperbot is not None
         assert await bumper_isc.mqtt_helperbot.is_connected is True
         assert bumper_isc.web_server is not None
+        assert bumper_isc.web_server.readiness.is_ready
+        assert bumper_isc.xmpp_server.readiness.is_ready
+        started = [record for record in log.records if record.getMessage().startswith("Services started :: ")]
+        assert len(started) == 1
+        for name in ("XMPP Server", "MQTT Server", "HelperBot", "Web Server"):
+            assert f"{name}: " in started[0].getMessage()
 
         log.clear()
 
         await asyncio.Task(bumper.shutdown())
         log.check_present(("bumper", "INFO", "Shutting down..."), ("bumper", "INFO", "Shutdown complete!"))
         assert bumper_isc.shutting_down is True
+        assert bumper_isc.mqtt_server.readiness.is_stopped
+        assert bumper_isc.web_server.readiness.is_stopped
 
     if proxy:
         bumper_isc.BUMPER_PROXY_MQTT = False
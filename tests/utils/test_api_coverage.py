@@ -0,0 +1,45 @@
+from bumper.utils.api_coverage import ApiCoverage, api_coverage
+
+
+def test_api_coverage_loaded() -> None:
+    assert api_coverage.stats()["patterns"] > 0
+    assert api_coverage.match("/api/appsvr/app.do") is not None
+
+
+def test_api_coverage_match_returns_pattern() -> None:
+    coverage = ApiCoverage(["^/api/users/(.*?)$", "/$", "^/api/appsvr/app.do$"])
+    assert coverage.match("/api/users/user.do") == "^/api/users/(.*?)$"
+    assert coverage.match("/") == "/$"
+    assert coverage.match("/api/appsvr/app.do") == "^/api/appsvr/app.do$"
+    assert coverage.match("/api/unknown") is None
+    assert coverage.match("") is None
+    assert coverage.match(None) is None
+
+
+def test_api_coverage_counters() -> None:
+    coverage = ApiCoverage(["^/api/appsvr/app.do$", "^/api/unused$"], max_unknown_paths=1)
+    assert coverage.check("/api/appsvr/app.do") is True
+    assert coverage.check("/api/appsvr/app.do") is True
+    assert coverage.check("/api/first") is False
+    assert coverage.check("/api/first") is False
+    assert coverage.check("/api/second") is False
+    assert coverage.check(None) is False
+
+    stats = coverage.stats()
+    assert stats["patterns"] == 2
+    assert stats["implemented"] == {"^/api/appsvr/app.do$": 2}
+    assert stats["unused"] == ["^/api/unused$"]
+    assert stats["unknown"] == {"/api/first": 2}
+    assert stats["unknown_overflow"] == 1
+
+    coverage.reset()
+    stats = coverage.stats()
+    assert stats["implemented"] == {}
+    assert stats["unknown"] == {}
+    assert stats["unknown_overflow"] == 0
+
+
+def test_api_coverage_from_missing_file(tmp_path) -> None:
+    coverage = ApiCoverage.from_file(tmp_path / "missing.json")
+    assert coverage.stats()["patterns"] == 0
+    assert coverage.check("/api/appsvr/app.do") is False
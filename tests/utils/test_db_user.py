@@ -109,3 +109,29 @@ def test_user_db() -> None:
     token_repo.add_it_token("testuser", "auth_1234")
     login_result = token_repo.login_by_it_token("auth_1234")
     assert login_result.as_dict() == {"token": "token_1234", "userid": "testuser"}
+
+
+@pytest.mark.usefixtures("clean_database")
+def test_token_reuse_db() -> None:
+    access_id = "token_1234"
+    token_repo.add("testuser", access_id, "dev_1234")
+    assert token_repo.get_valid_for_device("testuser", "dev_1234").token == access_id
+    assert token_repo.get_valid_for_device("testuser", "dev_4321") is None
+
+    # A fresh token is not rewritten on refresh
+    expiration = token_repo.get("testuser", "token_1234").expiration
+    assert token_repo.refresh("testuser", "token_1234")
+    assert token_repo.get("testuser", "token_1234").expiration == expiration
+    assert token_repo.refresh("testuser", "token_4321") is False
+
+    # A token close to its expiration is extended
+    soon = datetime.now(tz=bumper_isc.LOCAL_TIMEZONE) + timedelta(seconds=10)
+    token_repo.table.update({"expiration": soon.isoformat()}, QueryInstance.token == access_id)
+    assert token_repo.refresh("testuser", "token_1234")
+    assert token_repo.get("testuser", "token_1234").expiration > soon + timedelta(seconds=60)
+
+    # An expired token is neither refreshed nor reused
+    expired = datetime.now(tz=bumper_isc.LOCAL_TIMEZONE) - timedelta(seconds=10)
+    token_repo.table.update({"expiration": expired.isoformat()}, QueryInstance.token == access_id)
+    assert token_repo.refresh("testuser", "token_1234") is False
+    assert token_repo.get_valid_for_device("testuser", "dev_1234") is None
@@ -0,0 +1,102 @@
+import asyncio
+import dataclasses
+import time
+from unittest import mock
+
+import pytest
+
+from bumper.utils.dns_cache import AiohttpCachedResolver, CachedResolver
+
+
+def _resolver(monkeypatch: pytest.MonkeyPatch, ttl: float = 60.0, fail: bool = False) -> tuple[CachedResolver, mock.AsyncMock]:
+    async def _query(host: str) -> tuple[tuple[str, ...], float]:
+        await asyncio.sleep(0.01)
+        if fail:
+            msg = "NXDOMAIN"
+            raise OSError(msg)
+        return ("127.0.0.1", "127.0.0.2"), ttl
+
+    resolver = CachedResolver(negative_ttl=30.0, stale_ttl=300.0)
+    query = mock.AsyncMock(side_effect=_query)
+    monkeypatch.setattr(resolver, "_query", query)
+    return resolver, query
+
+
+async def test_resolve_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    resolver, query = _resolver(monkeypatch)
+
+    assert await resolver.resolve("mq-ww.ecouser.net") == "127.0.0.1"
+    assert await resolver.resolve_all("mq-ww.ecouser.net") == ("127.0.0.1", "127.0.0.2")
+
+    query.assert_awaited_once()
+    stats = resolver.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+async def test_resolve_coalesced(monkeypatch: pytest.MonkeyPatch) -> None:
+    resolver, query = _resolver(monkeypatch)
+
+    results = await asyncio.gather(*(resolver.resolve("mq-ww.ecouser.net") for _ in range(50)))
+
+    assert set(results) == {"127.0.0.1"}
+    query.assert_awaited_once()
+    assert resolver.stats()["coalesced"] == 49
+
+
+async def test_resolve_negative_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    resolver, query = _resolver(monkeypatch, fail=True)
+
+    for _ in range(3):
+        with pytest.raises(OSError, match="NXDOMAIN"):
+            await resolver.resolve("unknown.ecouser.net")
+
+    query.assert_awaited_once()
+    assert resolver.stats()["negative_hits"] == 2
+
+
+def _expire(resolver: CachedResolver, host: str, stale: bool = True) -> None:
+    entry = resolver._cache[host]
+    now = time.monotonic()
+    resolver._cache[host] = dataclasses.replace(entry, expires=now - 1, stale_until=now + 300 if stale else now - 1)
+
+
+async def test_resolve_stale_while_revalidate(monkeypatch: pytest.MonkeyPatch) -> None:
+    resolver, query = _resolver(monkeypatch)
+    await resolver.resolve("mq-ww.ecouser.net")
+
+    # expired, but within the stale TTL: served at once and refreshed in the background
+    _expire(resolver, "mq-ww.ecouser.net")
+    assert await resolver.resolve("mq-ww.ecouser.net") == "127.0.0.1"
+    assert resolver.stats()["stale_hits"] == 1
+    assert query.await_count == 1
+    await asyncio.sleep(0.05)
+    assert query.await_count == 2
+    assert resolver._cache["mq-ww.ecouser.net"].expires > time.monotonic()
+
+    # a failed refresh keeps the stale addresses
+    monkeypatch.setattr(resolver, "_query", mock.AsyncMock(side_effect=OSError("timeout")))
+    _expire(resolver, "mq-ww.ecouser.net")
+    assert await resolver.resolve("mq-ww.ecouser.net") == "127.0.0.1"
+    await asyncio.sleep(0)
+    assert await resolver.resolve("mq-ww.ecouser.net") == "127.0.0.1"
+    assert resolver.stats()["failures"] == 1
+
+    # after the stale TTL the lookup is awaited
+    _expire(resolver, "mq-ww.ecouser.net", stale=False)
+    with pytest.raises(OSError, match="timeout"):
+        await resolver.resolve("mq-ww.ecouser.net")
+
+
+async def test_aiohttp_resolver(monkeypatch: pytest.MonkeyPatch) -> None:
+    resolver, query = _resolver(monkeypatch)
+    aiohttp_resolver = AiohttpCachedResolver(resolver)
+
+    results = await aiohttp_resolver.resolve("mq-ww.ecouser.net", 443)
+    await aiohttp_resolver.resolve("mq-ww.ecouser.net", 443)
+    await aiohttp_resolver.close()
+
+    assert [(result["host"], result["port"]) for result in results] == [("127.0.0.1", 443), ("127.0.0.2", 443)]
+    assert results[0]["hostname"] == "mq-ww.ecouser.net"
+    query.assert_awaited_once()
+    assert resolver.stats()["hits"] == 1
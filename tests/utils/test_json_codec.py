@@ -0,0 +1,53 @@
+import pytest
+
+from bumper.utils import json_codec
+
+
+def test_dumps_compact_utf8() -> None:
+    data = {"name": "Bürste", "values": [1, 2.5, None, True]}
+    assert json_codec.dumps(data) == '{"name":"Bürste","values":[1,2.5,null,true]}'
+    assert json_codec.dumpb(data) == '{"name":"Bürste","values":[1,2.5,null,true]}'.encode()
+
+
+def test_dumps_default() -> None:
+    assert json_codec.dumps({"set": {1}}, default=list) == '{"set":[1]}'
+    with pytest.raises(TypeError):
+        json_codec.dumps({"set": {1}})
+
+
+def test_loads() -> None:
+    expected = {"a": [1, "ü"]}
+    assert json_codec.loads('{"a": [1, "ü"]}') == expected
+    assert json_codec.loads('{"a": [1, "ü"]}'.encode()) == expected
+    assert json_codec.loads(memoryview('{"a": [1, "ü"]}'.encode())) == expected
+    with pytest.raises(json_codec.JSONDecodeError):
+        json_codec.loads(b"")
+    with pytest.raises(json_codec.JSONDecodeError):
+        json_codec.loads("{invalid")
+
+
+def test_load(tmp_path) -> None:
+    file = tmp_path / "data.json"
+    file.write_text('{"code": 0}', encoding="utf-8")
+    with file.open(encoding="utf-8") as text_file:
+        assert json_codec.load(text_file) == {"code": 0}
+    with file.open("rb") as binary_file:
+        assert json_codec.load(binary_file) == {"code": 0}
+
+
+def test_json_response() -> None:
+    response = json_codec.json_response({"code": 0, "data": None}, status=201, headers={"x-test": "1"})
+    assert response.status == 201
+    assert response.body == b'{"code":0,"data":null}'
+    assert response.content_type == "application/json"
+    assert response.charset == "utf-8"
+    assert response.headers["x-test"] == "1"
+    assert json_codec.json_response().body == b"null"
+
+
+@pytest.mark.skipif(json_codec.orjson is None, reason="orjson is not installed")
+def test_backends_equal(monkeypatch) -> None:
+    data = {"a": [1, 2.5, "ü"], "b": {"c": None}}
+    fast = json_codec.dumpb(data)
+    monkeypatch.setattr(json_codec, "orjson", None)
+    assert json_codec.dumpb(data) == fast
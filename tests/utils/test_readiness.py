@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+from bumper.utils.readiness import Readiness
+
+
+async def test_readiness() -> None:
+    readiness = Readiness()
+    assert readiness.is_stopped
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.01):
+            await readiness.wait_ready()
+
+    waiter = asyncio.create_task(readiness.wait_ready())
+    await asyncio.sleep(0)
+    readiness.set_ready()
+    await waiter
+    assert readiness.is_ready
+    assert not readiness.is_stopped
+
+    readiness.set_stopped()
+    async with asyncio.timeout(0.01):
+        await readiness.wait_stopped()
+    assert not readiness.is_ready
@@ -0,0 +1,98 @@
+import asyncio
+import os
+from pathlib import Path
+import shutil
+from unittest import mock
+
+import jwt
+import pytest
+
+from bumper.utils.settings import config as bumper_isc
+from bumper.utils.signing_key import SigningKeyManager
+from bumper.web import auth_util
+
+
+@pytest.fixture
+def key_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    key_file = tmp_path / "bumper.key"
+    shutil.copy("tests/_test_files/certs/bumper.key", key_file)
+    monkeypatch.setattr(bumper_isc, "server_key", key_file)
+    return key_file
+
+
+async def test_sign_and_verify(key_file: Path) -> None:
+    manager = SigningKeyManager()
+    token = await manager.sign({"u": "user", "exp": 0}, "ES256", {"typ": "JWT"})
+
+    assert jwt.get_unverified_header(token)["alg"] == "ES256"
+    payload = manager.verify(token, "ES256")
+    assert payload is not None
+    assert payload["u"] == "user"
+
+
+async def test_key_loaded_once(key_file: Path) -> None:
+    manager = SigningKeyManager()
+    with mock.patch.object(SigningKeyManager, "_load_key", wraps=SigningKeyManager._load_key) as load_key:
+        await manager.sign({"u": "user"}, "ES256")
+        await manager.sign({"u": "user"}, "ES256")
+
+    load_key.assert_called_once()
+
+
+async def test_verify_cached(key_file: Path) -> None:
+    manager = SigningKeyManager()
+    token = await manager.sign({"u": "user"}, "ES256")
+
+    with mock.patch("bumper.utils.signing_key.jwt.decode", wraps=jwt.decode) as decode:
+        payload = manager.verify(token, "ES256")
+        assert manager.verify(token, "ES256") is payload
+
+    decode.assert_called_once()
+
+
+async def test_verify_invalid_token(key_file: Path) -> None:
+    manager = SigningKeyManager()
+    token = await manager.sign({"u": "user"}, "ES256")
+
+    assert manager.verify("invalid", "ES256") is None
+    assert manager.verify(f"{token[:-4]}AAAA", "ES256") is None
+    assert manager.verify(jwt.encode({"u": "user"}, "secret", algorithm="HS256"), "ES256") is None
+
+
+def _replace_key(key_file: Path) -> None:
+    shutil.copy("tests/_test_files/certs/ca.key", key_file)
+    stat = key_file.stat()
+    os.utime(key_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+async def test_reload_on_key_change(key_file: Path) -> None:
+    manager = SigningKeyManager(reload_check_interval=0)
+    token = await manager.sign({"u": "user"}, "ES256")
+    assert manager.verify(token, "ES256") is not None
+
+    await asyncio.to_thread(_replace_key, key_file)
+
+    # the verified token cache is dropped with the old key
+    assert manager.verify(token, "ES256") is None
+    assert manager.verify(await manager.sign({"u": "user"}, "ES256"), "ES256") is not None
+
+
+async def test_reload_after_invalidate(key_file: Path) -> None:
+    manager = SigningKeyManager()
+    private_key = manager.keys()[0]
+
+    manager.invalidate()
+
+    assert manager.keys()[0] is not private_key
+
+
+async def test_jwt_details_round_trip(key_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(auth_util, "signing_keys", SigningKeyManager())
+    token, _ = await auth_util.generate_jwt_helper(data={"u": "user", "ac": "code"}, t="a")
+
+    details = auth_util.get_jwt_details(f"Bearer {token}")
+    assert details is not None
+    assert details["user_id"] == "user"
+    assert details["auth_code"] == "code"
+    assert auth_util.get_jwt_details(f"Bearer {jwt.encode({'u': 'user'}, 'secret', algorithm='HS256')}") is None
+    assert auth_util.get_jwt_details("Basic abc") is None
@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+import shutil
+import socket
+import ssl
+import threading
+
+import pytest
+
+from bumper.utils.settings import config as bumper_isc
+from bumper.utils.tls_context import SESSION_TICKETS, TLSContextProvider
+
+
+@pytest.fixture
+def certs_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    for name in ("ca.crt", "bumper.crt", "bumper.key"):
+        shutil.copy(Path("tests/_test_files/certs") / name, tmp_path / name)
+    monkeypatch.setattr(bumper_isc, "ca_cert", tmp_path / "ca.crt")
+    monkeypatch.setattr(bumper_isc, "server_cert", tmp_path / "bumper.crt")
+    monkeypatch.setattr(bumper_isc, "server_key", tmp_path / "bumper.key")
+    return tmp_path
+
+
+def test_server_context_is_cached(certs_dir: Path) -> None:
+    provider = TLSContextProvider()
+    ssl_ctx = provider.server_context()
+
+    assert provider.server_context() is ssl_ctx
+    assert ssl_ctx.verify_mode == ssl.CERT_NONE
+    assert ssl_ctx.num_tickets == SESSION_TICKETS
+    assert not ssl_ctx.options & ssl.OP_NO_TICKET
+    assert ssl_ctx.sni_callback is not None
+
+
+def test_server_context_per_verify_mode(certs_dir: Path) -> None:
+    provider = TLSContextProvider()
+    ssl_ctx_none = provider.server_context()
+    ssl_ctx_optional = provider.server_context(ssl.CERT_OPTIONAL)
+
+    assert ssl_ctx_none is not ssl_ctx_optional
+    assert ssl_ctx_optional.verify_mode == ssl.CERT_OPTIONAL
+    assert provider.server_context(ssl.CERT_OPTIONAL) is ssl_ctx_optional
+
+
+def test_server_context_reload_on_change(certs_dir: Path) -> None:
+    provider = TLSContextProvider(reload_check_interval=0)
+    ssl_ctx = provider.server_context()
+    assert provider.server_context() is ssl_ctx
+
+    stat = (certs_dir / "bumper.crt").stat()
+    os.utime(certs_dir / "bumper.crt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert provider.server_context() is not ssl_ctx
+
+
+def test_server_context_reload_throttled(certs_dir: Path) -> None:
+    provider = TLSContextProvider(reload_check_interval=3600)
+    ssl_ctx = provider.server_context()
+
+    stat = (certs_dir / "bumper.crt").stat()
+    os.utime(certs_dir / "bumper.crt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert provider.server_context() is ssl_ctx
+    provider.invalidate()
+    assert provider.server_context() is not ssl_ctx
+
+
+def test_server_context_missing_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(bumper_isc, "server_cert", tmp_path / "missing.crt")
+    monkeypatch.setattr(bumper_isc, "server_key", tmp_path / "missing.key")
+
+    with pytest.raises(FileNotFoundError):
+        TLSContextProvider().server_context()
+
+
+def test_client_context_is_cached() -> None:
+    provider = TLSContextProvider()
+    ssl_ctx = provider.client_context()
+
+    assert provider.client_context() is ssl_ctx
+    assert ssl_ctx.check_hostname is False
+    assert ssl_ctx.verify_mode == ssl.CERT_NONE
+
+
+def test_server_context_session_resumption(certs_dir: Path) -> None:
+    provider = TLSContextProvider()
+    server_ctx = provider.server_context()
+    client_ctx = provider.client_context()
+
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        port = listener.getsockname()[1]
+
+        def serve(count: int) -> None:
+            for _ in range(count):
+                conn, _ = listener.accept()
+                with server_ctx.wrap_socket(conn, server_side=True) as tls_conn:
+                    tls_conn.sendall(b"ok")
+
+        thread = threading.Thread(target=serve, args=(2,), daemon=True)
+        thread.start()
+
+        session: ssl.SSLSession | None = None
+        reused: list[bool] = []
+        for _ in range(2):
+            with (
+                socket.create_connection(("127.0.0.1", port)) as sock,
+                client_ctx.wrap_socket(sock, server_hostname="bumper", session=session) as tls_sock,
+            ):
+                assert tls_sock.recv(2) == b"ok"
+                reused.append(tls_sock.session_reused)
+                session = tls_sock.session
+        thread.join(timeout=5)
+
+    assert reused == [False, True]
@@ -0,0 +1,53 @@
+from bumper.web.plugins.api.pim import get_product_iot_map
+from bumper.web.plugins.api.pim.catalog import ProductCatalog, product_catalog
+
+
+def test_product_catalog_index() -> None:
+    for botprod in get_product_iot_map()[:20]:
+        product = product_catalog.by_classid(botprod["classid"])
+        assert product is not None
+        assert product.pid == botprod["product"]["_id"]
+        assert product_catalog.by_pid(product.pid) is product
+        assert product.device_fields["deviceName"] == botprod["product"]["name"]
+
+    assert product_catalog.by_classid("unknown") is None
+    assert product_catalog.config("5c19a8f3a1e6ee0001782247") is not None
+    assert product_catalog.config("unknown") is None
+
+
+def test_product_catalog_first_entry_wins() -> None:
+    catalog = ProductCatalog(
+        [
+            {
+                "classid": "abc",
+                "product": {
+                    "_id": "p1",
+                    "materialNo": "",
+                    "name": "DEEBOT 1",
+                    "model": "",
+                    "UILogicId": "",
+                    "ota": True,
+                    "iconUrl": "",
+                },
+            },
+            {
+                "classid": "abc",
+                "product": {
+                    "_id": "p2",
+                    "materialNo": "",
+                    "name": "DEEBOT 2",
+                    "model": "",
+                    "UILogicId": "",
+                    "ota": True,
+                    "iconUrl": "",
+                },
+            },
+        ],
+        [{"pid": "p1", "video": True}],
+    )
+
+    product = catalog.by_classid("abc")
+    assert product is not None
+    assert product.pid == "p1"
+    assert product.scode["video"] is True
+    assert catalog.by_pid("p2") is None
@@ -78,3 +78,28 @@ async def test_getShareInfo(webserver_client) -> None:
     data = await resp.json()
     assert data["code"] == 0
     assert isinstance(data["data"], list)
+
+
+@pytest.mark.usefixtures("clean_database")
+async def test_getConfignetAll_etag(webserver_client) -> None:
+    resp = await webserver_client.post("/api/pim/product/getConfignetAll", headers={"Accept-Encoding": "gzip"})
+    assert resp.status == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    etag = resp.headers["ETag"]
+    assert etag
+
+    resp = await webserver_client.post(
+        "/api/pim/product/getConfignetAll",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert resp.status == 304
+    assert await resp.read() == b""
+
+    # identity variant has its own etag
+    resp = await webserver_client.post(
+        "/api/pim/product/getConfignetAll",
+        headers={"Accept-Encoding": "identity", "If-None-Match": etag},
+    )
+    assert resp.status == 200
+    assert "Content-Encoding" not in resp.headers
+    assert isinstance(await resp.json(), dict)
@@ -8,6 +8,7 @@ from bumper.utils import utils
 from bumper.utils.settings import config as bumper_isc
 from bumper.web.auth_util import _generate_uid
 from bumper.web.plugins.api import appsvr
+from bumper.web.plugins.api.pim.catalog import ProductCatalog
 
 USER_ID = _generate_uid(bumper_isc.USER_USERNAME_DEFAULT)
 
@@ -297,27 +298,31 @@ async def test_akvs_start_watch_api(webserver_client):
     assert jsonresp["channel"].startswith("production-")
 
 
-def test_include_product_iot_map_info():
+def test_include_product_iot_map_info(monkeypatch: pytest.MonkeyPatch) -> None:
     bot = MagicMock()
     bot.class_id = "ls1ok3"
     bot.mqtt_connection = True
     bot.xmpp_connection = False
     bot.as_dict.return_value = {"class_id": "ls1ok3", "mqtt_connection": True, "xmpp_connection": False}
-    # Patch get_product_iot_map to return a matching classid
-    appsvr.get_product_iot_map = lambda: [
-        {
-            "classid": "ls1ok3",
-            "product": {
-                "_id": "pid1",
-                "materialNo": "mat1",
-                "name": "DEEBOT X",
-                "model": "m1",
-                "UILogicId": "ui1",
-                "ota": {},
-                "iconUrl": "icon1",
+    # Patch the product catalog to contain a matching classid
+    catalog = ProductCatalog(
+        [
+            {
+                "classid": "ls1ok3",
+                "product": {
+                    "_id": "pid1",
+                    "materialNo": "mat1",
+                    "name": "DEEBOT X",
+                    "model": "m1",
+                    "UILogicId": "ui1",
+                    "ota": {},
+                    "iconUrl": "icon1",
+                },
             },
-        },
-    ]
+        ],
+        [],
+    )
+    monkeypatch.setattr(appsvr, "product_catalog", catalog)
     result = appsvr._include_product_iot_map_info(bot)
     assert result is not None
     assert result["pid"] == "pid1"
@@ -327,3 +332,7 @@ def test_include_product_iot_map_info():
     assert result["icon"] == "icon1"
     assert result["status"] == 1
     assert result["shareable"] is True
+    assert result["scode"]["battery"] is True
+
+    bot.class_id = "unknown"
+    assert appsvr._include_product_iot_map_info(bot) is None
@@ -7,6 +7,7 @@ import pytest
 
 from bumper.db import bot_repo
 from bumper.mqtt.helper_bot import MQTTHelperBot
+from bumper.utils.settings import config as bumper_isc
 
 
 def async_return(result):
@@ -16,7 +17,7 @@ def async_return(result):
 
 
 @pytest.mark.usefixtures("clean_database", "create_webserver")
-async def test_dim_devmanager(webserver_client, helper_bot: MQTTHelperBot) -> None:
+async def test_dim_devmanager(webserver_client, helper_bot: MQTTHelperBot, monkeypatch: pytest.MonkeyPatch) -> None:
     # Test PollSCResult
     postbody = {"td": "PollSCResult"}
     resp = await webserver_client.post("/api/dim/devmanager.do", json=postbody)
@@ -39,7 +40,15 @@ async def test_dim_devmanager(webserver_client, helper_bot: MQTTHelperBot) -> No
     bot_repo.set_mqtt("did_1234", True)
     postbody = {"toId": "did_1234"}
 
+    # Test return fail offline, without an mqtt session of the bot
+    resp = await webserver_client.post("/api/dim/devmanager.do", json=postbody)
+    assert resp.status == 200
+    test_resp = json.loads(await resp.text())
+    assert test_resp["ret"] == "fail"
+    assert test_resp["debug"] == "requested bot is offline"
+
     # Test return fail timeout
+    monkeypatch.setattr(bumper_isc.mqtt_server, "is_bot_connected", lambda _: True)
     resp = await webserver_client.post("/api/dim/devmanager.do", json=postbody)
     assert resp.status == 200
     text = await resp.text()
@@ -59,7 +68,7 @@ async def test_dim_devmanager(webserver_client, helper_bot: MQTTHelperBot) -> No
 
 
 @pytest.mark.usefixtures("clean_database", "create_webserver")
-async def test_dim_devmanager_faked(webserver_client, helper_bot: MQTTHelperBot) -> None:
+async def test_dim_devmanager_faked(webserver_client, helper_bot: MQTTHelperBot, monkeypatch: pytest.MonkeyPatch) -> None:
     # Test PollSCResult
     postbody = {"td": "PollSCResult"}
     resp = await webserver_client.post("/api/dim/devmanager.do", json=postbody)
@@ -81,6 +90,7 @@ async def test_dim_devmanager_faked(webserver_client, helper_bot: MQTTHelperBot)
     bot_repo.add("sn_1234", "did_1234", "dev_1234", "res_1234", "eco-ng")
     bot_repo.set_mqtt("did_1234", True)
     postbody = {"toId": "did_1234"}
+    monkeypatch.setattr(bumper_isc.mqtt_server, "is_bot_connected", lambda _: True)
 
     # Test return get status
     command_getstatus_resp = {
@@ -7,6 +7,7 @@ import pytest
 
 from bumper.db import bot_repo
 from bumper.mqtt.helper_bot import MQTTHelperBot
+from bumper.utils.settings import config as bumper_isc
 
 
 def async_return(result):
@@ -16,7 +17,7 @@ def async_return(result):
 
 
 @pytest.mark.usefixtures("clean_database", "create_webserver")
-async def test_devmgr(webserver_client, helper_bot: MQTTHelperBot) -> None:
+async def test_devmgr(webserver_client, helper_bot: MQTTHelperBot, monkeypatch: pytest.MonkeyPatch) -> None:
     # Test PollSCResult
     postbody = {"td": "PollSCResult"}
     resp = await webserver_client.post("/api/iot/devmanager.do", json=postbody)
@@ -48,7 +49,15 @@ async def test_devmgr(webserver_client, helper_bot: MQTTHelperBot) -> None:
         "toType": "p95mgv",
     }
 
+    # Test return fail offline, without an mqtt session of the bot
+    resp = await webserver_client.post("/api/iot/devmanager.do", json=postbody)
+    assert resp.status == 200
+    test_resp = json.loads(await resp.text())
+    assert test_resp["ret"] == "fail"
+    assert test_resp["debug"] == "requested bot is offline"
+
     # Test return fail timeout
+    monkeypatch.setattr(bumper_isc.mqtt_server, "is_bot_connected", lambda _: True)
     resp = await webserver_client.post("/api/iot/devmanager.do", json=postbody)
     assert resp.status == 200
     text = await resp.text()
@@ -68,3 +77,9 @@ async def test_devmgr(webserver_client, helper_bot: MQTTHelperBot) -> None:
     text = await resp.text()
     test_resp = json.loads(text)
     assert test_resp["ret"] == "ok"
+
+    # Test timeout override
+    helper_bot.send_command = mock.MagicMock(return_value=async_return(web.json_response(command_getstatus_resp)))
+    resp = await webserver_client.post("/api/iot/devmanager.do", json=postbody, params={"timeout": "2.5"})
+    assert resp.status == 200
+    assert helper_bot.send_command.call_args.args[0].timeout == 2.5
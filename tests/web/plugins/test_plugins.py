@@ -0,0 +1,96 @@
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+from aiohttp.web_urldispatcher import PrefixedSubAppResource
+
+from bumper.utils.settings import config as bumper_isc
+from bumper.web import plugins
+
+
+def _route_table(app: web.Application) -> list[tuple[str, str]]:
+    table: list[tuple[str, str]] = []
+    for resource in app.router.resources():
+        if isinstance(resource, PrefixedSubAppResource):
+            table.extend(_route_table(resource.get_info()["app"]))
+        else:
+            table.extend((route.method, resource.canonical) for route in resource)
+    return table
+
+
+def _app_from(routes: list[plugins.PluginRoute], flat: bool = False) -> web.Application:
+    app = web.Application()
+    plugins._add_routes(app, routes, flat=flat)
+    return app
+
+
+def test_route_manifest_matches_discovery(tmp_path) -> None:
+    manifest_file = tmp_path / "web_routes.json"
+    routes = plugins.discover_routes()
+    assert plugins.write_route_manifest(manifest_file, routes) is True
+
+    manifest_routes = plugins.load_route_manifest(manifest_file)
+    assert manifest_routes is not None
+    assert _route_table(_app_from(manifest_routes)) == _route_table(_app_from(routes))
+    assert ("POST", "/api/appsvr/app.do") in _route_table(_app_from(manifest_routes))
+
+
+async def test_flat_routes_match_nested() -> None:
+    routes = plugins.discover_routes()
+    nested_app = _app_from(routes)
+    flat_app = _app_from(routes, flat=True)
+    assert _route_table(flat_app) == _route_table(nested_app)
+    assert not any(isinstance(resource, PrefixedSubAppResource) for resource in flat_app.router.resources())
+
+    for method, path in [
+        ("POST", "/api/appsvr/app.do"),
+        ("GET", "/api/pim/product/getProductIotMap"),
+        ("GET", "/v2/private/us/en/dev/app/1.0/dt/aid/user/checkLogin"),
+    ]:
+        request = make_mocked_request(method, path)
+        nested_match = await nested_app.router.resolve(request)
+        flat_match = await flat_app.router.resolve(request)
+        assert flat_match.http_exception is None
+        assert flat_match.handler is nested_match.handler
+        assert flat_match.route.resource is not None
+        assert nested_match.route.resource is not None
+        assert flat_match.route.resource.canonical == nested_match.route.resource.canonical
+
+
+def test_route_manifest_outdated(tmp_path) -> None:
+    manifest_file = tmp_path / "web_routes.json"
+    assert plugins.load_route_manifest(manifest_file) is None
+
+    assert plugins.write_route_manifest(manifest_file, plugins.discover_routes()) is True
+    manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    manifest["fingerprint"] = "outdated"
+    manifest_file.write_text(json.dumps(manifest), encoding="utf-8")
+    assert plugins.load_route_manifest(manifest_file) is None
+
+    manifest_file.write_text("no json", encoding="utf-8")
+    assert plugins.load_route_manifest(manifest_file) is None
+
+
+def test_route_manifest_not_written_for_lambda(tmp_path) -> None:
+    manifest_file = tmp_path / "web_routes.json"
+    routes = [plugins.PluginRoute(("api",), web.get("/lambda", lambda _: web.Response()))]
+    assert plugins.write_route_manifest(manifest_file, routes) is False
+    assert not manifest_file.exists()
+
+
+async def test_add_plugins_from_manifest(aiohttp_client, monkeypatch, tmp_path) -> None:
+    manifest_file = tmp_path / "web_routes.json"
+    monkeypatch.setattr(bumper_isc, "WEB_ROUTE_MANIFEST", True)
+    monkeypatch.setattr(bumper_isc, "route_manifest_file", manifest_file)
+
+    plugins.add_plugins(web.Application())
+    assert manifest_file.exists()
+
+    monkeypatch.setattr(plugins, "discover_routes", list)
+    app = web.Application()
+    plugins.add_plugins(app)
+    assert ("POST", "/api/appsvr/app.do") in _route_table(app)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/api/pim/product/getConfignetAll")
+    assert resp.status == 200
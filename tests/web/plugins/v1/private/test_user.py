@@ -77,6 +77,27 @@ async def test_checkLogin(webserver_client) -> None:
     assert "username" in jsonresp["data"]
 
 
+@pytest.mark.usefixtures("clean_database")
+async def test_checkLogin_reuses_token(webserver_client) -> None:
+    tokens = set()
+    for _ in range(10):
+        resp = await webserver_client.get(f"/v1/private/us/en/dev_1234/ios/1/0/0/user/checkLogin?accessToken={None}")
+        assert resp.status == 200
+        tokens.add(json.loads(await resp.text())["data"]["accessToken"])
+
+    access_token = tokens.pop()
+    assert not tokens
+    for _ in range(10):
+        resp = await webserver_client.get(f"/v1/private/us/en/dev_1234/ios/1/0/0/user/checkLogin?accessToken={access_token}")
+        assert json.loads(await resp.text())["data"]["accessToken"] == access_token
+    assert len(token_repo.list_for_user(USER_ID)) == 1
+
+    # Another device gets its own token
+    resp = await webserver_client.get(f"/v1/private/us/en/dev_4321/ios/1/0/0/user/checkLogin?accessToken={None}")
+    assert json.loads(await resp.text())["data"]["accessToken"] != access_token
+    assert len(token_repo.list_for_user(USER_ID)) == 2
+
+
 @pytest.mark.usefixtures("clean_database")
 async def test_getAuthCode(webserver_client) -> None:
     # Test without user or token
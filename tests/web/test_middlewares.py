@@ -0,0 +1,119 @@
+import asyncio
+import gzip
+import logging
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient
+import pytest
+
+from bumper.utils.api_coverage import api_coverage
+from bumper.utils.settings import config as bumper_isc
+from bumper.web import middlewares
+
+_LARGE_BODY = {"data": ["x" * 100] * 50}
+
+
+async def _create_client(aiohttp_client, handler, middleware=middlewares.compress_response) -> TestClient:
+    app = web.Application(middlewares=[middleware])
+    app.router.add_get("/", handler)
+    app.router.add_get("/api", handler)
+    return await aiohttp_client(app)
+
+
+async def test_compress_response(aiohttp_client) -> None:
+    async def handler(_: web.Request) -> web.Response:
+        return web.json_response(_LARGE_BODY)
+
+    client = await _create_client(aiohttp_client, handler)
+
+    resp = await client.get("/", headers={"Accept-Encoding": "gzip"}, auto_decompress=False)
+    assert resp.status == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    compressed = await resp.read()
+    assert len(compressed) < len(gzip.decompress(compressed))
+
+    resp = await client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in resp.headers
+    assert await resp.json() == _LARGE_BODY
+
+
+async def test_compress_response_skipped(aiohttp_client) -> None:
+    bodies = {
+        "small": web.json_response({"code": 0}),
+        "binary": web.Response(body=b"\x00" * 4096, content_type="application/octet-stream"),
+        "encoded": web.Response(body=gzip.compress(b"{}" * 2048), headers={"Content-Encoding": "gzip"}),
+    }
+
+    async def handler(request: web.Request) -> web.Response:
+        return bodies[request.query["type"]]
+
+    client = await _create_client(aiohttp_client, handler)
+
+    for body_type in ("small", "binary"):
+        resp = await client.get(f"/?type={body_type}", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+
+    resp = await client.get("/?type=encoded", headers={"Accept-Encoding": "gzip"}, auto_decompress=False)
+    assert gzip.decompress(await resp.read()) == b"{}" * 2048
+
+
+async def test_log_requests_slow_and_sampled(
+    aiohttp_client,
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def handler(request: web.Request) -> web.Response:
+        if "slow" in request.query:
+            await asyncio.sleep(0.05)
+        return web.json_response({})
+
+    client = await _create_client(aiohttp_client, handler, middlewares.log_all_requests)
+    monkeypatch.setattr(bumper_isc, "WEB_LOG_SLOW_REQUEST_MS", 20)
+    monkeypatch.setattr(bumper_isc, "WEB_LOG_SAMPLE_RATE", 0.0)
+
+    with caplog.at_level(logging.DEBUG, logger="bumper.web.middlewares"):
+        assert (await client.get("/api")).status == 200
+        assert (await client.get("/api?slow=1")).status == 200
+        middlewares.request_log_writer.stop()
+
+    records = [record for record in caplog.records if record.threadName == "bumper-request-log"]
+    assert len(records) == 1
+    assert records[0].levelno == logging.WARNING
+    assert records[0].getMessage().startswith("GET /api (/api) -> 200 in ")
+
+    caplog.clear()
+    monkeypatch.setattr(bumper_isc, "WEB_LOG_SAMPLE_RATE", 1.0)
+    with caplog.at_level(logging.DEBUG, logger="bumper.web.middlewares"):
+        assert (await client.get("/missing")).status == 404
+        assert (await client.get("/")).status == 200  # excluded from logging
+        assert (await client.get("/api")).status == 200
+        middlewares.request_log_writer.stop()
+
+    records = [record for record in caplog.records if record.threadName == "bumper-request-log"]
+    assert [record.levelno for record in records] == [logging.DEBUG]
+    assert " -> 200 in " in records[0].getMessage()
+
+
+async def test_log_requests_counts_coverage(aiohttp_client, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def handler(_: web.Request) -> web.Response:
+        return web.json_response({})
+
+    client = await _create_client(aiohttp_client, handler, middlewares.log_all_requests)
+    api_coverage.reset()
+    for request_logging, missing_logging in ((False, False), (True, False), (False, True)):
+        monkeypatch.setattr(bumper_isc, "DEBUG_LOGGING_API_REQUEST", request_logging)
+        monkeypatch.setattr(bumper_isc, "DEBUG_LOGGING_API_REQUEST_MISSING", missing_logging)
+        assert (await client.get("/api")).status == 200
+    middlewares.request_log_writer.stop()
+
+    assert api_coverage.stats()["unknown"] == {"/api": 3}
+
+
+def test_request_log_writer_drops_when_full() -> None:
+    writer = middlewares.RequestLogWriter(maxsize=1)
+    writer._start = lambda: None  # keep the queue from being drained
+    writer.submit(logging.DEBUG, "first")
+    writer.submit(logging.DEBUG, "second")
+
+    assert writer.dropped == 1
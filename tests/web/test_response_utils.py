@@ -0,0 +1,71 @@
+import json
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from bumper.web.response_utils import EncodedResponse, constant_response, response_success_v1, response_success_v3
+
+
+async def test_constant_response_calls_handler_once() -> None:
+    calls = 0
+
+    @constant_response
+    async def _handle(_: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        return response_success_v3(data=[{"id": 1}], msg_key="msg")
+
+    request = make_mocked_request("GET", "/")
+    first = await _handle(request)
+    second = await _handle(request)
+    assert calls == 1
+    assert first is not second
+    assert first.body == second.body
+    assert json.loads(second.body) == {"code": 0, "msg": "success", "ret": "ok", "data": [{"id": 1}]}
+    assert second.content_type == "application/json"
+    assert second.charset == "utf-8"
+
+
+async def test_constant_response_templates_time() -> None:
+    @constant_response
+    async def _handle(_: web.Request) -> web.Response:
+        return response_success_v1({"time": "data field"}, time=1)
+
+    request = make_mocked_request("GET", "/")
+    with mock.patch("bumper.web.response_utils.utils.get_current_time_as_millis", return_value=1234567890123):
+        response = await _handle(request)
+    body = json.loads(response.body)
+    assert body["time"] == 1234567890123
+    assert body["data"] == {"time": "data field"}
+
+    with mock.patch("bumper.web.response_utils.utils.get_current_time_as_millis", return_value=42):
+        response = await _handle(request)
+    assert json.loads(response.body)["time"] == 42
+
+
+async def test_constant_response_html_and_status() -> None:
+    @constant_response
+    async def _handle(_: web.Request) -> web.Response:
+        return web.Response(text="<p>time</p>", content_type="text/html", status=202)
+
+    response = await _handle(make_mocked_request("GET", "/"))
+    response = await _handle(make_mocked_request("GET", "/"))
+    assert response.status == 202
+    assert response.text == "<p>time</p>"
+    assert response.content_type == "text/html"
+
+
+async def test_constant_response_without_bytes_body() -> None:
+    calls = 0
+
+    @constant_response
+    async def _handle(_: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        return web.Response()
+
+    assert EncodedResponse.from_response(web.Response()) is None
+    await _handle(make_mocked_request("GET", "/"))
+    await _handle(make_mocked_request("GET", "/"))
+    assert calls == 2
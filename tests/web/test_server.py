@@ -2,6 +2,7 @@ import json
 
 import pytest
 
+from bumper.utils.api_coverage import api_coverage
 from bumper.web.server import WebServer, WebserverBinding
 from tests import HOST, WEBSERVER_PORT
 
@@ -61,3 +62,45 @@ async def test_postLookup(webserver_client) -> None:
     text = await resp.text()
     test_resp = json.loads(text)
     assert test_resp["result"] == "ok"
+
+
+@pytest.mark.usefixtures("clean_database")
+async def test_api_coverage(webserver_client) -> None:
+    api_coverage.reset()
+    api_coverage.check("/api/appsvr/app.do")
+    api_coverage.check("/api/not/implemented")
+
+    resp = await webserver_client.get("/api-coverage")
+    assert resp.status == 200
+    stats = json.loads(await resp.text())
+    assert sum(stats["implemented"].values()) == 1
+    assert stats["unknown"] == {"/api/not/implemented": 1}
+
+    resp = await webserver_client.get("/api-coverage", params={"reset": "true"})
+    assert resp.status == 200
+    assert api_coverage.stats()["unknown"] == {}
+
+
+async def test_helperbot_stats(webserver_client, helper_bot) -> None:
+    helper_bot.latency.record("ls1ok3", "getBattery", 0.5)
+
+    resp = await webserver_client.get("/helperbot-stats")
+    assert resp.status == 200
+    stats = json.loads(await resp.text())
+    assert stats["commands"]["in_flight"] == 0
+    assert stats["latency"]["ls1ok3/getBattery"]["samples"] == 1
+
+
+async def test_proxy_stats(aiohttp_client) -> None:
+    webserver = WebServer(WebserverBinding(HOST, WEBSERVER_PORT, False), True)
+    client = await aiohttp_client(webserver._app)
+
+    resp = await client.get("/proxy-stats")
+    assert resp.status == 200
+    stats = json.loads(await resp.text())
+    assert "connections_reused" in stats
+    assert stats["pool"]["in_use"] == 0
+    assert "hits" in stats["dns"]
+    assert stats["mqtt_pool"]["connections"] == 0
+    assert stats["mqtt_forward"].keys() == {"to_robot", "to_ecovacs"}
+    await webserver.shutdown()
@@ -0,0 +1,57 @@
+import gzip
+import json
+from pathlib import Path
+
+from aiohttp.test_utils import make_mocked_request
+
+from bumper.web.static_responses import StaticResponseRegistry
+
+
+def test_register() -> None:
+    registry = StaticResponseRegistry()
+    data = [{"classid": "abc"}]
+    static_response = registry.register("test", data, lambda data: {"code": 0, "data": data})
+
+    assert registry.get("test") is static_response
+    assert registry.data("test") is data
+    assert json.loads(static_response.body) == {"code": 0, "data": data}
+    assert gzip.decompress(static_response.variants["gzip"]) == static_response.body
+    assert registry.register("other", data, lambda data: {"code": 0, "data": data}).etag == static_response.etag
+
+
+def test_register_file(tmp_path: Path) -> None:
+    path = tmp_path / "test.json"
+    path.write_text('{"a": 1}', encoding="utf-8")
+    registry = StaticResponseRegistry()
+
+    assert registry.register_file("test", path).data == {"a": 1}
+
+
+def test_response_encoding() -> None:
+    registry = StaticResponseRegistry()
+    static_response = registry.register("test", {"a": 1})
+
+    response = registry.response(make_mocked_request("GET", "/", headers={"Accept-Encoding": "gzip, deflate"}), "test")
+    assert response.status == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.body is static_response.variants["gzip"]
+
+    response = registry.response(make_mocked_request("GET", "/", headers={"Accept-Encoding": "gzip;q=0"}), "test")
+    assert "Content-Encoding" not in response.headers
+    assert response.body is static_response.body
+    assert response.etag is not None
+    assert response.etag.value == static_response.etag
+
+
+def test_response_not_modified() -> None:
+    registry = StaticResponseRegistry()
+    static_response = registry.register("test", {"a": 1})
+
+    request = make_mocked_request("GET", "/", headers={"If-None-Match": f'"{static_response.etag}"'})
+    response = registry.response(request, "test")
+    assert response.status == 304
+    assert not response.body
+
+    request = make_mocked_request("GET", "/", headers={"If-None-Match": '"outdated"'})
+    assert registry.response(request, "test").status == 200
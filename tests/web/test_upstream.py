@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import socket
+import ssl
+from typing import Any
+
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+import pytest
+
+from bumper.web import server
+from bumper.web.server import WebServer, WebserverBinding
+from bumper.web.upstream import BodyPreview, UpstreamClient, forward_headers
+from tests import HOST, WEBSERVER_PORT
+
+_DOWNLOAD = bytes(range(256)) * 8192  # 2 MiB
+
+
+class _LocalResolver(AbstractResolver):
+    """Resolve every host to the local stand-in server."""
+
+    def __init__(self) -> None:
+        self.lookups = 0
+
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET) -> list[dict[str, Any]]:
+        self.lookups += 1
+        return [{"hostname": host, "host": "127.0.0.1", "port": port, "family": family, "proto": 0, "flags": 0}]
+
+    async def close(self) -> None:
+        pass
+
+
+async def _handle(request: web.Request) -> web.Response:
+    return web.json_response({"path": request.path})
+
+
+async def test_upstream_client_reuses_connections(aiohttp_server) -> None:
+    app = web.Application()
+    app.router.add_get("/{path:.*}", _handle)
+    ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_ctx.load_cert_chain("tests/_test_files/certs/bumper.crt", "tests/_test_files/certs/bumper.key")
+    server = await aiohttp_server(app, ssl=ssl_ctx)
+
+    resolver = _LocalResolver()
+    client = UpstreamClient(resolver_factory=lambda: resolver)
+    session = client.session()
+    for path in ("/api/one", "/api/two", "/api/three"):
+        async with session.get(f"https://ecouser.net:{server.port}{path}") as resp:
+            assert resp.status == 200
+            assert (await resp.json())["path"] == path
+
+    assert client.session() is session
+    stats = client.stats()
+    assert stats["sessions_created"] == 1
+    assert stats["requests"] == 3
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 2
+    assert resolver.lookups == 1
+    assert stats["pool"]["idle"] == 1
+    assert stats["pool"]["in_use"] == 0
+
+    await client.close()
+    assert session.closed
+    assert client.stats()["pool"]["idle"] == 0
+
+    # A new session is created after close
+    assert client.session() is not session
+    assert client.stats()["sessions_created"] == 2
+    await client.close()
+
+
+def test_body_preview() -> None:
+    preview = BodyPreview(limit=4)
+    preview.feed(b"ab")
+    assert str(preview) == "ab"
+    preview.feed(b"cdef")
+    assert str(preview) == "abcd... (6 bytes)"
+
+
+def test_forward_headers() -> None:
+    headers = forward_headers({"Connection": "keep-alive", "Transfer-Encoding": "chunked", "X-Custom": "1"})
+    assert dict(headers) == {"X-Custom": "1"}
+
+
+async def _handle_upload(request: web.Request) -> web.Response:
+    digest = hashlib.sha256()
+    async for chunk in request.content.iter_any():
+        digest.update(chunk)
+    return web.json_response({"sha256": digest.hexdigest(), "custom": request.headers.get("X-Custom")})
+
+
+async def _handle_download(_: web.Request) -> web.StreamResponse:
+    return web.Response(body=_DOWNLOAD, content_type="application/x-firmware", headers={"X-Custom": "1"})
+
+
+async def test_proxy_streams_bodies(aiohttp_server, aiohttp_client, monkeypatch: pytest.MonkeyPatch, caplog) -> None:
+    app = web.Application()
+    app.router.add_post("/upload", _handle_upload)
+    app.router.add_get("/download", _handle_download)
+    upstream = await aiohttp_server(app)
+    monkeypatch.setattr(server, "upstream_client", UpstreamClient(resolver_factory=_LocalResolver))
+
+    webserver = WebServer(WebserverBinding(HOST, WEBSERVER_PORT, False), True)
+    client = await aiohttp_client(webserver._app)
+    host = {"Host": f"ecouser.net:{upstream.port}"}
+    caplog.set_level(logging.INFO, logger="bumper.web.server.proxy")
+
+    resp = await client.get("/download", headers=host)
+    assert resp.status == 200
+    assert resp.content_type == "application/x-firmware"
+    assert resp.headers["X-Custom"] == "1"
+    assert await resp.read() == _DOWNLOAD
+
+    resp = await client.post("/upload", data=_DOWNLOAD, headers={**host, "X-Custom": "2"})
+    assert resp.status == 200
+    assert await resp.json() == {"sha256": hashlib.sha256(_DOWNLOAD).hexdigest(), "custom": "2"}
+
+    assert all(len(record.getMessage()) < 4096 for record in caplog.records)
+    assert any(f"({len(_DOWNLOAD)} bytes)" in record.getMessage() for record in caplog.records)
+    await webserver.shutdown()
@@ -1,10 +1,12 @@
 import asyncio
+from asyncio import transports
+import threading
 from unittest import mock
 
 import pytest
 from testfixtures import LogCapture
 
-from bumper.xmpp.xmpp import XMPPAsyncClient, XMPPServer
+from bumper.xmpp.xmpp import XMPPAsyncClient, XMPPServer, XMPPServerProtocol
 
 
 def return_send_data(data: bytes) -> bytes:
@@ -15,12 +17,14 @@ def mock_transport_extra_info() -> tuple[str, int]:
     return ("127.0.0.1", 5223)
 
 
+class _XMPPAsyncClient(XMPPAsyncClient):
+    """Client with an instance dict, so its methods can be replaced by mocks."""
+
+
 @pytest.fixture(autouse=True)
 def cleanup_clients():
     """Ensure all XMPPAsyncClient instances are cleaned up after each test."""
     yield
-    for client in XMPPServer.clients:
-        client.cleanup()
     XMPPServer.clients.clear()
 
 
@@ -35,7 +39,7 @@ async def test_xmpp_server(xmpp_server) -> None:
         await asyncio.sleep(0.1)
 
         assert len(xmpp_server.clients) == 1  # Client count increased
-        assert xmpp_server.clients[0].address[1] == writer.transport.get_extra_info("sockname")[1]
+        assert next(iter(xmpp_server.clients)).address[1] == writer.transport.get_extra_info("sockname")[1]
 
         writer.close()  # Close connection
         await writer.wait_closed()
@@ -56,7 +60,7 @@ async def test_client_connect_no_starttls() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.CONNECT  # Set client state to CONNECT
     mock_send = xmppclient.send = mock.Mock(side_effect=return_send_data)
 
@@ -88,6 +92,7 @@ async def test_client_connect_no_starttls() -> None:
         b"AGZ1aWRfdG1wdXNlcgAwL0lPU0Y1M0QwN0JBL3VzXzg5ODgwMmZkYmM0NDQxYjBiYzgxNWIxZDFjNjgzMDJl</auth>"
     )
     xmppclient.parse_data(test_data)
+    await XMPPAsyncClient.wait_background_tasks()
 
     assert (
         mock_send.mock_calls[0][1][0] == '<success xmlns="urn:ietf:params:xml:ns:xmpp-sasl"/>'
@@ -99,7 +104,7 @@ async def test_client_end_stream() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.CONNECT  # Set client state to CONNECT
     mock_send = xmppclient.send = mock.Mock(side_effect=return_send_data)
 
@@ -131,7 +136,7 @@ async def test_client_connect_starttls_called() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.CONNECT  # Set client state to CONNECT
     mock_send = xmppclient.send = mock.Mock(side_effect=return_send_data)
 
@@ -157,7 +162,7 @@ async def test_client_connect_starttls_called() -> None:
     # Reset mock calls
     mock_send.reset_mock()
 
-    mock_tls = xmppclient._handle_starttls = mock.Mock()
+    mock_tls = xmppclient._handle_starttls = mock.AsyncMock()
 
     # Send start tls from "client"
     test_data = b"<starttls xmlns='urn:ietf:params:xml:ns:xmpp-tls'/>"
@@ -195,6 +200,7 @@ async def test_client_connect_starttls_called() -> None:
         b"AGZ1aWRfdG1wdXNlcgAwL0lPU0Y1M0QwN0JBL3VzXzg5ODgwMmZkYmM0NDQxYjBiYzgxNWIxZDFjNjgzMDJl</auth>"
     )
     xmppclient.parse_data(test_data)
+    await XMPPAsyncClient.wait_background_tasks()
 
     assert (
         mock_send.mock_calls[0][1][0] == '<success xmlns="urn:ietf:params:xml:ns:xmpp-sasl"/>'
@@ -206,7 +212,7 @@ async def test_client_init() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.INIT  # Set client state to INIT
     xmppclient.uid = "fuid_tmpuser"
     xmppclient.clientresource = "IOSF53D07BA"
@@ -242,6 +248,7 @@ async def test_client_init() -> None:
         b'<bind xmlns="urn:ietf:params:xml:ns:xmpp-bind"><resource>IOSF53D07BA</resource></bind></iq>'
     )
     xmppclient.parse_data(test_data)
+    await XMPPAsyncClient.wait_background_tasks()
 
     assert mock_send.mock_calls[0][1][0] == (
         '<iq type="result" id="5E9872D5-547E-49AF-AE51-9EFAA282F952">'
@@ -277,7 +284,7 @@ async def test_bot_connect() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.CONNECT  # Set client state to CONNECT
     mock_send = xmppclient.send = mock.Mock(side_effect=return_send_data)
 
@@ -310,6 +317,7 @@ async def test_bot_connect() -> None:
         b"AEUwMDAwMDAwMDAwMDAwMDAxMjM0AGVuY3J5cHRlZF9wYXNz</auth>"
     )
     xmppclient.parse_data(test_data)
+    await XMPPAsyncClient.wait_background_tasks()
 
     assert (
         mock_send.mock_calls[0][1][0] == '<success xmlns="urn:ietf:params:xml:ns:xmpp-sasl"/>'
@@ -322,7 +330,7 @@ async def test_bot_init() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.INIT  # Set client state to INIT
     xmppclient.uid = "E0000000000000001234"
     xmppclient.devclass = "159"
@@ -355,6 +363,7 @@ async def test_bot_init() -> None:
     # Send bind from "bot"
     test_data = b"<iq type='set' id='2521'><bind xmlns='urn:ietf:params:xml:ns:xmpp-bind'><resource>atom</resource></bind></iq>"
     xmppclient.parse_data(test_data)
+    await XMPPAsyncClient.wait_background_tasks()
 
     assert mock_send.mock_calls[0][1][0] == (
         '<iq type="result" id="2521"><bind xmlns="urn:ietf:params:xml:ns:xmpp-bind">'
@@ -391,7 +400,7 @@ async def test_ping_server() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.READY  # Set client state to READY
     xmppclient.uid = "E0000000000000001234"
     xmppclient.devclass = "159"
@@ -411,22 +420,22 @@ async def test_ping_client_to_client() -> None:
     test_transport = mock.Mock()
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.READY  # Set client state to READY
     xmppclient.uid = "E0000000000000001234"
     xmppclient.devclass = "159"
     xmppclient.bumper_jid = "E0000000000000001234@159.ecorobot.net/atom"
     mock_send = xmppclient.send = mock.Mock(side_effect=return_send_data)
 
-    xmppclient2 = XMPPAsyncClient(test_transport)
+    xmppclient2 = _XMPPAsyncClient(test_transport)
     xmppclient2.state = xmppclient.READY  # Set client state to READY
     xmppclient2.uid = "fuid_tmpuser"
     xmppclient2.clientresource = "IOSF53D07BA"
     xmppclient2.bumper_jid = "fuid_tmpuser@ecouser.net/IOSF53D07BA"
     mock_send2 = xmppclient2.send = mock.Mock(side_effect=return_send_data)
 
-    XMPPServer.clients.append(xmppclient)
-    XMPPServer.clients.append(xmppclient2)
+    XMPPServer.clients[xmppclient] = None
+    XMPPServer.clients[xmppclient2] = None
 
     # Ping from user to bot
     test_data = b'<iq id="104934615" to="fuid_tmpuser@ecouser.net/IOSF53D07BA" type="get"><ping xmlns="urn:xmpp:ping" /></iq>'
@@ -448,19 +457,20 @@ async def test_ping_client_to_client() -> None:
 
 
 async def test_client_send_iq() -> None:
-    test_transport = mock.Mock()
+    test_transport = mock.Mock(spec=transports.WriteTransport)
+    test_transport.is_closing = mock.Mock(return_value=False)
     test_transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
     test_transport.write = mock.Mock(return_value=return_send_data)
-    xmppclient = XMPPAsyncClient(test_transport)
+    xmppclient = _XMPPAsyncClient(test_transport)
     xmppclient.state = xmppclient.READY  # Set client state to READY
     xmppclient.uid = "fuid_tmpuser"
     xmppclient.clientresource = "IOSF53D07BA"
     xmppclient.bumper_jid = "fuid_tmpuser@ecouser.net/IOSF53D07BA"
     xmppclient.type = xmppclient.CONTROLLER
     mock_send = xmppclient.send = mock.Mock(side_effect=return_send_data)
-    XMPPServer.clients.append(xmppclient)
+    XMPPServer.clients[xmppclient] = None
 
-    xmppclient2 = XMPPAsyncClient(test_transport)
+    xmppclient2 = _XMPPAsyncClient(test_transport)
     xmppclient2.state = xmppclient.READY  # Set client state to READY
     xmppclient2.uid = "E0000000000000001234"
     xmppclient2.devclass = "159"
@@ -468,7 +478,7 @@ async def test_client_send_iq() -> None:
     xmppclient2.type = xmppclient2.BOT
     mock_send2 = xmppclient2.send = mock.Mock(side_effect=return_send_data)
 
-    XMPPServer.clients.append(xmppclient2)
+    XMPPServer.clients[xmppclient2] = None
 
     # Roster IQ - Only seen from Android app so far
     test_data = b'<iq id="EE0XQ-2" type="get"><query xmlns="jabber:iq:roster" ></query></iq>'
@@ -516,9 +526,12 @@ async def test_client_send_iq() -> None:
     test_data = b"<iq type='result' from='E0000000000000001234@159.ecorobot.net/atom' to='ecouser.net' id='s2c1'/>"
     xmppclient2.parse_data(test_data)
 
-    assert mock_send.mock_calls[0][1][0] == (
-        '<iq type="result" from="E0000000000000001234@159.ecorobot.net/atom" to="ecouser.net" id="s2c1" />'
-    )  # result sent to ecouser.net
+    test_transport.write.assert_called_once_with(
+        XMPPAsyncClient.encode(
+            '<iq type="result" from="E0000000000000001234@159.ecorobot.net/atom" to="ecouser.net" id="s2c1" />',
+        ),
+    )  # result broadcast to ecouser.net
+    test_transport.write.reset_mock()
 
     # Reset mock calls
     mock_send.reset_mock()
@@ -559,11 +572,170 @@ async def test_client_send_iq() -> None:
         b" k='DeviceAlert' v='DorpError' f='E0000000000000001234@159.ecorobot.net' g='fuid_tmpuser@ecouser.net'/></query></iq>"
     )
     xmppclient2.parse_data(test_data)
-    assert mock_send.mock_calls[0][1][0] == (
-        '<iq xmlns="com:sf" to="rl.ecorobot.net" type="set" id="1234" from="E0000000000000001234@159.ecorobot.net/atom">'
-        '<query xmlns="com:ctl"><sf td="pub" t="log" ts="1559893796000" tp="p" k="DeviceAlert" v="DorpError"'
-        ' f="E0000000000000001234@159.ecorobot.net" g="fuid_tmpuser@ecouser.net" /></query></iq>'
-    )  # result sent to ecouser.net
+    test_transport.write.assert_called_once_with(
+        XMPPAsyncClient.encode(
+            '<iq xmlns="com:sf" to="rl.ecorobot.net" type="set" id="1234" from="E0000000000000001234@159.ecorobot.net/atom">'
+            '<query xmlns="com:ctl"><sf td="pub" t="log" ts="1559893796000" tp="p" k="DeviceAlert" v="DorpError"'
+            ' f="E0000000000000001234@159.ecorobot.net" g="fuid_tmpuser@ecouser.net" /></query></iq>',
+        ),
+    )  # result broadcast to all clients
 
     # Reset mock calls
     mock_send.reset_mock()
+
+
+def _write_transport(closing: bool = False) -> mock.Mock:
+    transport = mock.Mock(spec=transports.WriteTransport)
+    transport.get_extra_info = mock.Mock(return_value=mock_transport_extra_info())
+    transport.is_closing = mock.Mock(return_value=closing)
+    return transport
+
+
+async def test_broadcast_encodes_once() -> None:
+    transport1 = _write_transport()
+    transport2 = _write_transport()
+    transport3 = _write_transport(closing=True)
+    clients = [XMPPAsyncClient(transport1), XMPPAsyncClient(transport2), XMPPAsyncClient(transport3)]
+
+    assert XMPPServer.broadcast('<iq type="result" id="1" />', clients) == 2
+
+    sent1 = transport1.write.call_args[0][0]
+    sent2 = transport2.write.call_args[0][0]
+    assert sent1 == b"<iq type='result' id='1' />"
+    assert sent1 is sent2  # same immutable bytes object for all targets
+    transport3.write.assert_not_called()
+
+
+async def test_broadcast_de_to_all_clients() -> None:
+    bot_transport = _write_transport()
+    bot = XMPPAsyncClient(bot_transport)
+    bot.state = bot.READY
+    bot.uid = "E0000000000000001234"
+    bot.devclass = "159"
+    bot.bumper_jid = "E0000000000000001234@159.ecorobot.net/atom"
+    bot.type = bot.BOT
+
+    client_transports = [_write_transport() for _ in range(3)]
+    for index, transport in enumerate(client_transports):
+        client = XMPPAsyncClient(transport)
+        client.state = client.READY
+        client.uid = f"fuid_tmpuser{index}"
+        client.bumper_jid = f"fuid_tmpuser{index}@ecouser.net/IOSF53D07BA"
+        client.type = client.CONTROLLER
+        XMPPServer.clients[client] = None
+
+    with mock.patch.object(XMPPServer, "broadcast", wraps=XMPPServer.broadcast) as mock_broadcast:
+        bot.parse_data(
+            b"<iq to='de.ecorobot.net' type='set' id='1'><query xmlns='com:ctl'>"
+            b"<ctl td='BatteryInfo'><battery power='100'/></ctl></query></iq>",
+        )
+
+    # once for "de" and once as the "to" has no user part
+    assert mock_broadcast.call_count == 2
+    written = [call[0][0] for transport in client_transports for call in transport.write.call_args_list]
+    assert len(written) == 6
+    assert len(set(written)) == 1
+    assert b"<battery power='100' />" in written[0]
+
+
+def test_client_is_slotted() -> None:
+    xmppclient = XMPPAsyncClient(_write_transport())
+
+    assert not hasattr(xmppclient, "__dict__")
+    assert xmppclient.memory_size() > 0
+
+
+def test_connection_limits() -> None:
+    xmpp_server = XMPPServer("127.0.0.1", 5223, max_connections=3, max_connections_per_ip=2)
+    transports_ip1 = [_write_transport() for _ in range(3)]
+    transport_ip2 = _write_transport()
+    transport_ip2.get_extra_info = mock.Mock(return_value=("127.0.0.2", 5223))
+
+    protocols = [XMPPServerProtocol(xmpp_server) for _ in range(4)]
+    for protocol, transport in zip(protocols, [*transports_ip1, transport_ip2], strict=True):
+        protocol.connection_made(transport)
+
+    assert xmpp_server.connection_count == 3
+    transports_ip1[0].close.assert_not_called()
+    transports_ip1[2].close.assert_called_once()  # per IP limit reached
+    transport_ip2.close.assert_not_called()
+
+    transport_ip3 = _write_transport()
+    transport_ip3.get_extra_info = mock.Mock(return_value=("127.0.0.3", 5223))
+    XMPPServerProtocol(xmpp_server).connection_made(transport_ip3)
+    transport_ip3.close.assert_called_once()  # total limit reached
+
+    protocols[0].connection_lost(None)
+    assert xmpp_server.connection_count == 2
+    XMPPServerProtocol(xmpp_server).connection_made(transports_ip1[2])
+    assert xmpp_server.connection_count == 3
+    assert xmpp_server.memory_per_connection() > 0
+
+
+def test_reap_idle_clients() -> None:
+    xmpp_server = XMPPServer("127.0.0.1", 5223, idle_timeout=120, ping_interval=30)
+    active = XMPPAsyncClient(_write_transport())
+    quiet = XMPPAsyncClient(_write_transport())
+    dead = XMPPAsyncClient(_write_transport())
+    for client in (active, quiet, dead):
+        client.state = client.READY
+        client.last_activity = 1000.0
+        XMPPServer.clients[client] = None
+    active.last_activity = 1035.0
+    dead.last_activity = 960.0
+
+    assert xmpp_server.reap_idle_clients(now=1040.0) == 0
+    active.transport.write.assert_not_called()  # type: ignore[attr-defined]
+    assert b"urn:xmpp:ping" in quiet.transport.write.call_args[0][0]  # type: ignore[attr-defined]
+    assert b"urn:xmpp:ping" in dead.transport.write.call_args[0][0]  # type: ignore[attr-defined]
+
+    # no second ping within the ping interval
+    quiet.transport.write.reset_mock()  # type: ignore[attr-defined]
+    assert xmpp_server.reap_idle_clients(now=1050.0) == 0
+    quiet.transport.write.assert_not_called()  # type: ignore[attr-defined]
+
+    assert xmpp_server.reap_idle_clients(now=1090.0) == 1
+    dead.transport.abort.assert_called_once()  # type: ignore[attr-defined]
+    quiet.transport.abort.assert_not_called()  # type: ignore[attr-defined]
+    active.transport.abort.assert_not_called()  # type: ignore[attr-defined]
+
+
+async def test_xmpp_server_reaps_idle_connection() -> None:
+    xmpp_server = XMPPServer("127.0.0.1", 5224, idle_timeout=0.2, ping_interval=0)
+    await xmpp_server.start_async_server()
+    try:
+        _, writer = await asyncio.open_connection("127.0.0.1", 5224)
+        writer.write(b"<stream:stream xmlns='jabber:client' xmlns:stream='http://etherx.jabber.org/streams' />")
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        assert xmpp_server.connection_count == 1
+
+        await asyncio.sleep(0.5)
+        assert xmpp_server.connection_count == 0
+        writer.close()
+    finally:
+        await xmpp_server.disconnect()
+
+
+async def test_bot_auth_persists_off_loop() -> None:
+    test_transport = _write_transport()
+    xmppclient = _XMPPAsyncClient(test_transport)
+    xmppclient.state = xmppclient.CONNECT
+    xmppclient.devclass = "159"
+    events: list[str] = []
+    mock_send = xmppclient.send = mock.Mock(side_effect=lambda _: events.append("send"))
+
+    def add_bot(*_: str) -> None:
+        events.append(threading.current_thread().name)
+
+    with mock.patch("bumper.xmpp.xmpp.bot_repo.add", side_effect=add_bot):
+        xmppclient.parse_data(
+            b'<auth xmlns="urn:ietf:params:xml:ns:xmpp-sasl" mechanism="PLAIN">'
+            b"AEUwMDAwMDAwMDAwMDAwMDAxMjM0ADAvY2Y4NTY5NmQvYWI3ZjVjNWNlZDBiMTljNmJhNDc0ZmE0MDljYTc5MGY=</auth>",
+        )
+        mock_send.assert_not_called()  # response is sent after the database step
+        await XMPPAsyncClient.wait_background_tasks()
+
+    assert events[0].startswith("bumper-db")
+    assert events[1] == "send"
+    assert xmppclient.state == xmppclient.INIT